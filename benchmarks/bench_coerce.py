@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк приведения типов полей CSV: полная нормализация против быстрого пути.
+
+Синтетический CSV (generate.py) читается csv.reader, и записи приводятся к словарям-строкам
+двумя наборами функций:
+- baseline — " ".join(value.strip().split()) для каждого текстового поля
+  и .replace(",", ".") перед float();
+- io._COERCERS — проверка «значение уже чистое», общий объект str для одинаковых
+  значений position/team, числа без лишней замены.
+Печатаются rows/s и память, которую занимают все полученные строки (tracemalloc).
+
+Запуск:
+    python benchmarks/bench_coerce.py --rows 500000 --positions 50
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from generate import HEADER, generate_csv  # noqa: E402
+
+from csv_reports import io as csv_io  # noqa: E402
+
+
+def _baseline_text(value: str) -> str:
+    return " ".join(value.strip().split())
+
+
+_BASELINE: dict[str, Callable[[str], Any]] = {
+    "name": _baseline_text,
+    "position": _baseline_text,
+    "completed_tasks": lambda v: int(_baseline_text(v)),
+    "performance": lambda v: float(_baseline_text(v).replace(",", ".")),
+    "skills": _baseline_text,
+    "team": _baseline_text,
+    "experience_years": lambda v: int(_baseline_text(v)),
+}
+
+
+def _coerce_all(path: Path, coercers: dict[str, Callable[[str], Any]]) -> list:
+    plan = [(name, idx, coercers[name]) for idx, name in enumerate(HEADER)]
+    with path.open(encoding="utf-8", newline="") as fh:
+        records = csv.reader(fh)
+        next(records)
+        return [{name: coerce(fields[idx]) for name, idx, coerce in plan} for fields in records]
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _retained_mb(func: Callable[[], Any]) -> tuple[Any, float]:
+    """Результат func() и объём памяти, который он удерживает."""
+    tracemalloc.start()
+    result = func()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained / (1024 * 1024)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=500_000)
+    parser.add_argument("--positions", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_csv(Path(tmp) / "employees.csv", args.rows, args.positions, seed=args.seed)
+        results = {}
+        for label, coercers in (("baseline", _BASELINE), ("fast path", csv_io._COERCERS)):
+            results[label], megabytes = _retained_mb(lambda c=coercers: _coerce_all(path, c))
+            seconds = _best_of(args.repeat, lambda c=coercers: _coerce_all(path, c))
+            print(
+                f"{label:>9}: {seconds:8.3f} s  {args.rows / seconds:14,.0f} rows/s  "
+                f"rows {megabytes:8.1f} MB"
+            )
+
+    if results["baseline"] != results["fast path"]:
+        print("ОШИБКА: результаты приведения различаются", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк движка групповых агрегатов: чистый Python против NumPy.
+
+Запуск:
+    python benchmarks/bench_engine.py --rows 1000000 --groups 12
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from csv_reports.engine import available_backends, group_aggregate  # noqa: E402
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    codes = array("I", (rng.randrange(args.groups) for _ in range(args.rows)))
+    values = array("d", (round(rng.uniform(3.0, 5.0), 1) for _ in range(args.rows)))
+
+    results = {}
+    for backend in available_backends():
+        results[backend] = group_aggregate(codes, values, args.groups, backend=backend)
+        seconds = _best_of(
+            args.repeat, lambda b=backend: group_aggregate(codes, values, args.groups, backend=b)
+        )
+        print(f"{backend:>6}: {seconds:8.3f} s  {args.rows / seconds:14,.0f} rows/s")
+
+    if len(results) > 1 and results["numpy"] != results["python"]:
+        print("ОШИБКА: результаты бэкендов различаются", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк времени запуска CLI.
+
+Измеряет:
+- импорт csv_reports.cli по `python -X importtime` (минимум по --repeat запускам);
+- полное время процесса `main.py --help` и `main.py` с ошибкой аргументов;
+- какие тяжёлые модули загружаются при импорте CLI (их там быть не должно).
+
+Цель (--target-ms, по умолчанию 60 мс) относится к кумулятивному времени импорта
+csv_reports.cli; при превышении цели или при загрузке тяжёлого модуля скрипт
+завершается с кодом 1, поэтому его можно запускать в CI.
+
+Запуск:
+    python benchmarks/bench_import.py --repeat 15
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+
+# Модули, которые не должны импортироваться ради --help и разбора аргументов
+HEAVY_MODULES = (
+    "numpy",
+    "tabulate",
+    "wcwidth",
+    "concurrent.futures",
+    "importlib.metadata",
+    "csv_reports.service",
+    "csv_reports.cache",
+    "csv_reports.reports.performance",
+)
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def import_time_us(module: str) -> int:
+    """Кумулятивное время импорта module (мкс) по одному запуску -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"В выводе -X importtime нет модуля {module}")
+
+
+def loaded_modules(module: str) -> list[str]:
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=_env(), check=True
+    ).stdout
+    return json.loads(out)
+
+
+def process_seconds(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(PROJECT_ROOT / "main.py"), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=_env(),
+    )
+    return time.perf_counter() - start
+
+
+def process_seconds_python(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=_env())
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure csv_reports CLI startup time.")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (min wins).")
+    parser.add_argument("--target-ms", type=float, default=60.0, help="Import-time budget.")
+    parser.add_argument("--module", default="csv_reports.cli")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON.")
+    args = parser.parse_args(argv)
+
+    import_us = min(import_time_us(args.module) for _ in range(args.repeat))
+    help_s = min(process_seconds(["--help"]) for _ in range(args.repeat))
+    bad_args_s = min(process_seconds(["--report", "performance"]) for _ in range(args.repeat))
+    baseline_s = min(process_seconds_python(["-c", "pass"]) for _ in range(args.repeat))
+    heavy = [m for m in loaded_modules(args.module) if m in HEAVY_MODULES]
+
+    print(f"import {args.module}: {import_us / 1000:8.1f} ms (цель {args.target_ms:.0f} ms)")
+    print(f"main.py --help:        {help_s * 1000:8.1f} ms")
+    print(f"main.py (ошибка арг.): {bad_args_s * 1000:8.1f} ms")
+    print(f"python -c pass:        {baseline_s * 1000:8.1f} ms")
+    if heavy:
+        print(f"Тяжёлые модули при импорте: {', '.join(heavy)}")
+
+    if args.output:
+        payload = {
+            "module": args.module,
+            "import_ms": import_us / 1000,
+            "help_ms": help_s * 1000,
+            "bad_args_ms": bad_args_s * 1000,
+            "python_ms": baseline_s * 1000,
+            "heavy_modules": heavy,
+            "target_ms": args.target_ms,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if heavy or import_us / 1000 > args.target_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение двух JSON-результатов benchmarks/run.py (например, до и после коммита).
+
+Для каждой пары (сценарий, число строк) печатается изменение времени и пиковой памяти.
+С --threshold 0.1 скрипт завершается с кодом 1, если какой-то сценарий стал медленнее
+больше чем на 10% — удобно для проверки регрессий в CI.
+
+Запуск:
+    python benchmarks/compare.py base.json head.json --threshold 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _load(path: Path) -> dict[tuple[str, int], dict[str, Any]]:
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {(r["case"], r["rows"]): r for r in payload["results"]}
+
+
+def _ratio(new: float | None, old: float | None) -> float | None:
+    if new is None or not old:
+        return None
+    return new / old - 1.0
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="Fail if any case is slower by more than this fraction (e.g. 0.1).",
+    )
+    args = parser.parse_args(argv)
+
+    base, head = _load(args.base), _load(args.head)
+    regressions = []
+    for key in sorted(base.keys() & head.keys()):
+        old, new = base[key], head[key]
+        time_delta = _ratio(new["seconds"], old["seconds"])
+        mem_delta = _ratio(new.get("peak_rss_mb"), old.get("peak_rss_mb"))
+        mem_str = f"{mem_delta:+7.1%}" if mem_delta is not None else "    n/a"
+        print(
+            f"{key[0]:<30} {key[1]:>11,} rows  "
+            f"{old['seconds']:9.4f} -> {new['seconds']:9.4f} s ({time_delta:+7.1%})  mem {mem_str}"
+        )
+        if args.threshold is not None and time_delta is not None and time_delta > args.threshold:
+            regressions.append(key)
+
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{key[0]:<30} {key[1]:>11,} rows  только в одном из файлов")
+
+    if regressions:
+        print(f"Регрессии больше {args.threshold:.0%}: {len(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Детерминированный генератор синтетических CSV в формате employees*.csv.
+
+Параметры:
+- --rows: число строк данных (1e4 ... 1e8; строки пишутся потоково, память постоянна);
+- --positions: кардинальность колонки position;
+- --quote-ratio: доля строк, где skills содержит запятые и потому берётся в кавычки;
+- --multiline-ratio: доля строк с переводом строки внутри skills (проверка разбиения файлов);
+- --seed: зерно генератора — одинаковые параметры дают побайтно одинаковый файл.
+
+Запуск:
+    python benchmarks/generate.py --rows 1000000 --output /tmp/employees_1m.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from pathlib import Path
+
+HEADER = [
+    "name",
+    "position",
+    "completed_tasks",
+    "performance",
+    "skills",
+    "team",
+    "experience_years",
+]
+
+_BASE_POSITIONS = [
+    "Backend Developer",
+    "Frontend Developer",
+    "Data Scientist",
+    "DevOps Engineer",
+    "QA Engineer",
+    "Mobile Developer",
+    "Fullstack Developer",
+    "Data Engineer",
+    "Security Engineer",
+    "ML Engineer",
+    "Product Designer",
+    "Site Reliability Engineer",
+]
+_TEAMS = [
+    "API Team",
+    "Web Team",
+    "AI Team",
+    "Infrastructure Team",
+    "Testing Team",
+    "Mobile Team",
+    "Data Team",
+    "Security Team",
+]
+_FIRST = ["Alex", "Maria", "John", "Anna", "Mike", "Sarah", "David", "Elena", "Chris", "Olga"]
+_LAST = ["Ivanov", "Petrova", "Smith", "Lee", "Brown", "Johnson", "Chen", "Popova", "Wilson"]
+_SKILLS = [
+    "Python", "Django", "PostgreSQL", "Docker", "React", "TypeScript", "Redux", "CSS",
+    "ML", "SQL", "Pandas", "AWS", "Kubernetes", "Terraform", "Ansible", "Selenium",
+    "Swift", "Kotlin", "React Native", "iOS", "Java", "Spring Boot", "Redis", "Go",
+]  # fmt: skip
+
+_BATCH = 10_000
+
+
+def positions_for(cardinality: int) -> list[str]:
+    """Список должностей заданной кардинальности (реальные названия, затем синтетические)."""
+    if cardinality < 1:
+        raise ValueError("Кардинальность должностей должна быть положительной")
+    extra = [f"Position {i}" for i in range(len(_BASE_POSITIONS), cardinality)]
+    return (_BASE_POSITIONS + extra)[:cardinality]
+
+
+def _make_row(
+    rng: random.Random, positions: list[str], quote_ratio: float, multiline_ratio: float
+) -> list[object]:
+    position_idx = rng.randrange(len(positions))
+    if rng.random() < quote_ratio:
+        skills = ", ".join(rng.sample(_SKILLS, rng.randint(2, 4)))
+    else:
+        skills = rng.choice(_SKILLS)
+    if rng.random() < multiline_ratio:
+        # Перевод строки и кавычки внутри поля: csv.writer удвоит кавычки и возьмёт поле в кавычки
+        skills = f'{skills},\n"{rng.choice(_SKILLS)}"'
+    return [
+        f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+        positions[position_idx],
+        rng.randint(0, 120),
+        f"{rng.randint(30, 50) / 10:.1f}",
+        skills,
+        _TEAMS[position_idx % len(_TEAMS)],
+        rng.randint(0, 20),
+    ]
+
+
+def generate_csv(
+    path: Path,
+    rows: int,
+    positions: int = 12,
+    quote_ratio: float = 0.5,
+    multiline_ratio: float = 0.0,
+    seed: int = 42,
+) -> Path:
+    """Пишет файл path с rows строками данных; возвращает path."""
+    rng = random.Random(seed)
+    names = positions_for(positions)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh, lineterminator="\n")
+        writer.writerow(HEADER)
+        for start in range(0, rows, _BATCH):
+            count = min(_BATCH, rows - start)
+            writer.writerows(
+                _make_row(rng, names, quote_ratio, multiline_ratio) for _ in range(count)
+            )
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic employees CSV.")
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=10_000)
+    parser.add_argument("--positions", type=int, default=12)
+    parser.add_argument("--quote-ratio", type=float, default=0.5)
+    parser.add_argument("--multiline-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    generate_csv(
+        args.output,
+        rows=args.rows,
+        positions=args.positions,
+        quote_ratio=args.quote_ratio,
+        multiline_ratio=args.multiline_ratio,
+        seed=args.seed,
+    )
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
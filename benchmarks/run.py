@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Воспроизводимый набор бенчмарков csv_reports.
+
+Для каждого размера входа (--rows) генерируется синтетический CSV (generate.py),
+после чего каждый сценарий запускается в отдельном свежем процессе: так время
+не искажается прогретыми кэшами, а пиковая память (ru_maxrss) относится к сценарию.
+
+Сценарии:
+- io.read_csv_files          — чтение в список словарей (только до --max-materialize строк);
+- io.iter_csv_rows           — потоковое чтение всех колонок;
+- io.iter_csv_rows[projected] — потоковое чтение колонок отчёта performance;
+- io.iter_csv_rows[projected,skip] — то же со стоком отклонённых строк (--on-error skip):
+                               на входе без ошибок должно идти вровень с [projected];
+- io.read_csv_table          — чтение в колоночную EmployeeTable;
+- io.iter_csv_rows[gzip|bz2|xz|zstd] — потоковое чтение того же входа, сжатого кодеком
+                               (zstd — только если установлен zstandard);
+- report.performance.run     — расчёт отчёта по заранее прочитанному списку строк;
+- report.performance.table   — расчёт отчёта по EmployeeTable (движок агрегатов);
+- render.render_table        — рендер таблицы из --render-rows строк;
+- cli.main                   — полный запуск CLI без кэша;
+- cli.main[cache-hit]        — полный запуск CLI при прогретом кэше разобранных файлов.
+
+Результаты печатаются таблицей и сохраняются в JSON (--output) вместе с метаданными
+(коммит, версия Python, платформа), чтобы сравнивать прогоны между коммитами
+(см. compare.py).
+
+Запуск:
+    python benchmarks/run.py --rows 10000,100000 --output benchmarks/results/local.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+for _path in (PROJECT_ROOT / "src", BENCH_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from generate import generate_csv  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+CaseResult = tuple[int, float]  # (обработано строк, секунд)
+
+
+def _best_of(repeat: int, func: Callable[[], int]) -> CaseResult:
+    best = float("inf")
+    processed = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processed = func()
+        best = min(best, time.perf_counter() - start)
+    return processed, best
+
+
+# --- сценарии (выполняются в дочернем процессе) ---
+
+
+def _case_read_csv_files(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import read_csv_files
+
+    return _best_of(params["repeat"], lambda: len(read_csv_files([Path(params["path"])])))
+
+
+def _case_iter_csv_rows(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import iter_csv_rows
+
+    return _best_of(
+        params["repeat"], lambda: sum(1 for _ in iter_csv_rows([Path(params["path"])]))
+    )
+
+
+def _case_iter_csv_rows_projected(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import iter_csv_rows
+    from csv_reports.reports.performance import PerformanceReport
+
+    columns = PerformanceReport().columns
+    return _best_of(
+        params["repeat"],
+        lambda: sum(1 for _ in iter_csv_rows([Path(params["path"])], columns)),
+    )
+
+
+def _case_iter_csv_rows_projected_skip(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import iter_csv_rows
+    from csv_reports.rejects import RejectSink
+    from csv_reports.reports.performance import PerformanceReport
+
+    columns = PerformanceReport().columns
+
+    def run() -> int:
+        return sum(1 for _ in iter_csv_rows([Path(params["path"])], columns, rejects=RejectSink()))
+
+    return _best_of(params["repeat"], run)
+
+
+def _case_read_csv_table(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import read_csv_table
+
+    return _best_of(params["repeat"], lambda: len(read_csv_table([Path(params["path"])])))
+
+
+def _compress(source: Path, codec: str) -> Path:
+    """Сжатая копия входа рядом с ним (создаётся один раз, вне замера)."""
+    target = source.with_name(f"{source.name}.{codec}")
+    if target.exists():
+        return target
+    partial = target.with_name(target.name + ".tmp")
+    with source.open("rb") as src:
+        if codec == "zstd":
+            import zstandard
+
+            with partial.open("wb") as raw:
+                zstandard.ZstdCompressor().copy_stream(src, raw)
+        else:
+            import bz2
+            import gzip
+            import lzma
+            import shutil
+
+            opener = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}[codec]
+            with opener(partial, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+    partial.replace(target)
+    return target
+
+
+def _codec_case(codec: str) -> Callable[[dict[str, Any]], CaseResult]:
+    def case(params: dict[str, Any]) -> CaseResult:
+        from csv_reports.io import iter_csv_rows
+
+        path = _compress(Path(params["path"]), codec)
+        return _best_of(params["repeat"], lambda: sum(1 for _ in iter_csv_rows([path])))
+
+    return case
+
+
+def _case_report_run(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import read_csv_files
+    from csv_reports.reports.performance import PerformanceReport
+
+    report = PerformanceReport()
+    rows = read_csv_files([Path(params["path"])], report.columns)
+
+    def run() -> int:
+        report.run(rows)
+        return len(rows)
+
+    return _best_of(params["repeat"], run)
+
+
+def _case_report_table(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.io import read_csv_table
+    from csv_reports.reports.performance import PerformanceReport
+
+    report = PerformanceReport()
+    table = read_csv_table([Path(params["path"])], report.columns)
+
+    def run() -> int:
+        report.finalize(report.update_table(report.create_state(), table))
+        return len(table)
+
+    return _best_of(params["repeat"], run)
+
+
+def _case_render(params: dict[str, Any]) -> CaseResult:
+    from csv_reports.render import render_table
+
+    count = params["render_rows"]
+    rows = [
+        {"position": f"Position {i % 997} {i}", "performance": (i % 50) / 10}
+        for i in range(count)
+    ]
+
+    def run() -> int:
+        render_table(["position", "performance"], rows)
+        return count
+
+    return _best_of(params["repeat"], run)
+
+
+def _run_cli(argv: list[str]) -> None:
+    from csv_reports.cli import main as cli_main
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            cli_main(argv)
+        except SystemExit as exc:
+            if exc.code not in (0, None):
+                raise RuntimeError(f"CLI завершился с кодом {exc.code}") from exc
+
+
+def _case_cli(params: dict[str, Any]) -> CaseResult:
+    argv = ["--files", params["path"], "--report", "performance", "--no-cache"]
+
+    def run() -> int:
+        _run_cli(argv)
+        return params["rows"]
+
+    return _best_of(params["repeat"], run)
+
+
+def _case_cli_cache_hit(params: dict[str, Any]) -> CaseResult:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        argv = ["--files", params["path"], "--report", "performance", "--cache-dir", cache_dir]
+        _run_cli(argv)  # прогрев кэша
+
+        def run() -> int:
+            _run_cli(argv)
+            return params["rows"]
+
+        return _best_of(params["repeat"], run)
+
+
+CASES: dict[str, Callable[[dict[str, Any]], CaseResult]] = {
+    "io.read_csv_files": _case_read_csv_files,
+    "io.iter_csv_rows": _case_iter_csv_rows,
+    "io.iter_csv_rows[projected]": _case_iter_csv_rows_projected,
+    "io.iter_csv_rows[projected,skip]": _case_iter_csv_rows_projected_skip,
+    "io.read_csv_table": _case_read_csv_table,
+    "io.iter_csv_rows[gzip]": _codec_case("gzip"),
+    "io.iter_csv_rows[bz2]": _codec_case("bz2"),
+    "io.iter_csv_rows[xz]": _codec_case("xz"),
+    "io.iter_csv_rows[zstd]": _codec_case("zstd"),
+    "report.performance.run": _case_report_run,
+    "report.performance.table": _case_report_table,
+    "render.render_table": _case_render,
+    "cli.main": _case_cli,
+    "cli.main[cache-hit]": _case_cli_cache_hit,
+}
+
+# Сценарии, которые держат все строки входа списком словарей
+_MATERIALIZING = {"io.read_csv_files", "report.performance.run"}
+
+# Сценарии с необязательными зависимостями: пропускаются, если модуль не установлен
+_REQUIRES = {"io.iter_csv_rows[zstd]": "zstandard"}
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _child(name: str, params: dict[str, Any]) -> dict[str, Any]:
+    baseline = _peak_rss_mb()
+    processed, seconds = CASES[name](params)
+    return {
+        "rows_processed": processed,
+        "seconds": seconds,
+        "rows_per_s": processed / seconds if seconds else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline,
+    }
+
+
+def run_case(name: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Запускает сценарий в свежем процессе (spawn) и возвращает его метрики."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_child, name, params).result()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _metadata(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        import numpy
+
+        numpy_version: str | None = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "params": {
+            "positions": args.positions,
+            "quote_ratio": args.quote_ratio,
+            "repeat": args.repeat,
+            "render_rows": args.render_rows,
+            "seed": args.seed,
+        },
+    }
+
+
+def _parse_rows(value: str) -> list[int]:
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run csv_reports benchmarks.")
+    parser.add_argument("--rows", type=_parse_rows, default=[10_000, 100_000])
+    parser.add_argument("--positions", type=int, default=12)
+    parser.add_argument("--quote-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing per case.")
+    parser.add_argument("--render-rows", type=int, default=100_000)
+    parser.add_argument(
+        "--max-materialize",
+        type=lambda v: int(float(v)),
+        default=2_000_000,
+        help="Skip list-of-dict cases above this many rows.",
+    )
+    parser.add_argument("--cases", default="", help="Comma-separated substrings to select cases.")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Keep generated CSVs here.")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON.")
+    args = parser.parse_args(argv)
+
+    selected = [s.strip() for s in args.cases.split(",") if s.strip()]
+    names = [n for n in CASES if not selected or any(s in n for s in selected)]
+    missing = [n for n in names if n in _REQUIRES and find_spec(_REQUIRES[n]) is None]
+    for name in missing:
+        print(f"{name}: пропущен, не установлен {_REQUIRES[name]}")
+    names = [n for n in names if n not in missing]
+
+    results: list[dict[str, Any]] = []
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        for rows in args.rows:
+            path = data_dir / f"employees_{rows}_{args.positions}_{args.seed}.csv"
+            if not path.exists():
+                generate_csv(path, rows, args.positions, args.quote_ratio, seed=args.seed)
+            params = {
+                "path": str(path),
+                "rows": rows,
+                "repeat": args.repeat,
+                "render_rows": args.render_rows,
+            }
+            for name in names:
+                if name in _MATERIALIZING and rows > args.max_materialize:
+                    continue
+                metrics = run_case(name, params)
+                result = {"case": name, "rows": rows, "file_bytes": path.stat().st_size, **metrics}
+                results.append(result)
+                print(
+                    f"{name:<30} {rows:>11,} rows  {metrics['seconds']:9.4f} s  "
+                    f"{metrics['rows_per_s'] or 0:>13,.0f} rows/s  "
+                    f"peak {metrics['peak_rss_mb'] or 0:8.1f} MB",
+                    flush=True,
+                )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"meta": _metadata(args), "results": results}
+        args.output.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Результаты сохранены: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,10 @@
 """
 Инициализация пакета csv_reports.
 
-Задача: обеспечить регистрацию всех доступных отчётов при импорте пакета.
+Отчёты не импортируются при импорте пакета: реестр (reports.registry) знает их имена
+из манифеста и entry points и загружает модуль отчёта только при выборе отчёта.
+Так `csv-reports --help` и ошибки аргументов не платят за импорт расчётной части.
 """
 from __future__ import annotations
-from .reports import performance as _perf  # noqa: F401
 
 __all__: list[str] = []
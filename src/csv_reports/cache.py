@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+Постоянный кэш разобранных CSV-файлов.
+
+Для каждого входного файла в каталоге кэша хранится бинарный колоночный «сайдкар» —
+сериализованная EmployeeTable со всеми колонками, уже приведёнными к типам:
+- числовые колонки — сырые байты array('q') / array('d');
+- строковые — словарное кодирование: таблица уникальных значений + array('I') кодов.
+
+Формат файла записи: MAGIC, длина JSON-заголовка (4 байта, little-endian),
+JSON-заголовок с метаданными, затем блоки по block_rows строк и нулевая длина
+в конце. Блок — длина JSON-описания, описание (число строк, колонки, новые значения
+словарей) и байты массивов подряд. Формат не исполняет код при чтении (в отличие от pickle).
+
+При промахе строки пишутся во временный файл поблочно, поэтому память не растёт
+с размером файла: держится текущий блок и словари строковых колонок. Словарь
+переходит в следующий блок (блок хранит только новые значения), пока он не больше
+блока; словарь крупнее (уникальные name) начинается заново, и коды такого блока
+при чтении перекодируются.
+
+Запись считается актуальной, если совпадают размер и mtime_ns исходного файла,
+а при verify_hash=True — ещё и хэш содержимого (blake2b). Общий размер каталога
+ограничен max_bytes: при превышении удаляются давно не использованные записи (LRU
+по mtime записи, которое обновляется при каждом попадании).
+
+Кэш — оптимизация «по возможности»: ошибки записи и повреждённые записи
+не прерывают формирование отчёта, а приводят к обычному разбору CSV.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from .models import DictionaryColumn, EmployeeRow, EmployeeTable
+
+__all__ = ["ParsedFileCache", "default_cache_dir", "DEFAULT_MAX_BYTES"]
+
+MAGIC = b"CSVRC\x02\n"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Строк в блоке записи: столько строк промаха держится в памяти до записи на диск
+BLOCK_ROWS = 64 * 1024
+_SUFFIX = ".colcache"
+_HASH_BLOCK = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    """Каталог кэша: $CSV_REPORTS_CACHE_DIR, иначе $XDG_CACHE_HOME/csv-reports, иначе ~/.cache."""
+    explicit = os.environ.get("CSV_REPORTS_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "csv-reports"
+
+
+def _read_exact(fh: Any, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise ValueError("truncated entry")
+    return data
+
+
+def _next_block(table: EmployeeTable, max_values: int) -> EmployeeTable:
+    """Пустая таблица следующего блока; словари не крупнее max_values переходят в неё."""
+    columns: dict[str, Any] = {}
+    for name in table.columns:
+        col = table.column(name)
+        if isinstance(col, DictionaryColumn):
+            if len(col.values) <= max_values:
+                col.codes = array(col.codes.typecode)
+            else:
+                col = DictionaryColumn()
+            columns[name] = col
+        else:
+            columns[name] = array(col.typecode)
+    return EmployeeTable.from_columns(columns)
+
+
+class _EntryWriter:
+    """Поблочная запись во временный файл; запись видна только после commit()."""
+
+    def __init__(self, directory: Path, header: dict[str, Any]) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        self.path = Path(tmp_name)
+        self.blocks = 0
+        self._fh = os.fdopen(fd, "wb")
+        # Словарь, которому соответствуют коды колонки, и сколько его значений уже записано
+        self._dictionaries: dict[str, tuple[list[str], int]] = {}
+        raw_header = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._fh.write(MAGIC + struct.pack("<I", len(raw_header)) + raw_header)
+
+    def write_block(self, table: EmployeeTable) -> None:
+        columns: list[dict[str, Any]] = []
+        blobs: list[bytes] = []
+        for name in table.columns:
+            col = table.column(name)
+            if isinstance(col, DictionaryColumn):
+                values = col.codes
+                known, written = self._dictionaries.get(name, (None, 0))
+                reset = known is not col.values
+                if reset:
+                    written = 0
+                columns.append(
+                    {
+                        "name": name,
+                        "typecode": values.typecode,
+                        "values": col.values[written:],
+                        "reset": reset,
+                    }
+                )
+                self._dictionaries[name] = (col.values, len(col.values))
+            else:
+                values = col
+                columns.append({"name": name, "typecode": values.typecode})
+            columns[-1]["itemsize"] = values.itemsize
+            blobs.append(values.tobytes())
+
+        raw = json.dumps({"rows": len(table), "columns": columns}, ensure_ascii=False)
+        encoded = raw.encode("utf-8")
+        self._fh.write(struct.pack("<I", len(encoded)))
+        self._fh.write(encoded)
+        for blob in blobs:
+            self._fh.write(blob)
+        self.blocks += 1
+
+    def commit(self, entry: Path) -> None:
+        self._fh.write(struct.pack("<I", 0))
+        self._fh.close()
+        os.replace(self.path, entry)
+
+    def abort(self) -> None:
+        self._fh.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def _content_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParsedFileCache:
+    """Кэш разобранных файлов в каталоге directory с ограничением размера max_bytes."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        verify_hash: bool = False,
+        block_rows: int = BLOCK_ROWS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.block_rows = max(block_rows, 1)
+
+    # --- ключи и метаданные ---
+
+    def _entry_path(self, source: Path) -> Path:
+        key = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def fingerprint(self, source: Path) -> dict[str, Any]:
+        """Отпечаток исходного файла: путь, размер, mtime_ns и (опционально) хэш."""
+        st = source.stat()
+        meta: dict[str, Any] = {
+            "path": str(source.resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        if self.verify_hash:
+            meta["hash"] = _content_hash(source)
+        return meta
+
+    # --- чтение ---
+
+    def _read_header(self, fh: Any) -> dict[str, Any]:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError("bad magic")
+        (header_len,) = struct.unpack("<I", fh.read(4))
+        return json.loads(fh.read(header_len).decode("utf-8"))
+
+    def _matches(self, header: dict[str, Any], meta: dict[str, Any]) -> bool:
+        if header.get("byteorder") != sys.byteorder:
+            return False
+        return all(header.get(key) == value for key, value in meta.items())
+
+    def is_fresh(self, source: Path) -> bool:
+        """Есть ли для source актуальная запись (читается только заголовок записи)."""
+        try:
+            meta = self.fingerprint(source)
+            with self._entry_path(source).open("rb") as fh:
+                return self._matches(self._read_header(fh), meta)
+        except (OSError, ValueError, struct.error):
+            return False
+
+    def load(self, source: Path, meta: dict[str, Any] | None = None) -> EmployeeTable | None:
+        """
+        Таблица файла source из кэша или None при промахе.
+
+        Промахом считаются отсутствие записи, несовпадение отпечатка файла (meta,
+        по умолчанию вычисляется заново) и повреждённая запись.
+        """
+        if meta is None:
+            meta = self.fingerprint(source)
+        entry = self._entry_path(source)
+        try:
+            with entry.open("rb") as fh:
+                header = self._read_header(fh)
+                if not self._matches(header, meta):
+                    return None
+                decoded = self._decode(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            self._discard(entry)
+            return None
+
+        self._touch(entry)
+        return decoded
+
+    def _decode(self, fh: Any) -> EmployeeTable:
+        """Блоки записи -> таблица; коды словаря, начатого заново, перекодируются."""
+        arrays: dict[str, array] = {}
+        values: dict[str, list[str]] = {}
+        # Для колонок, чей словарь начинался заново: индекс значений и коды текущего словаря
+        lookups: dict[str, dict[str, int]] = {}
+        remaps: dict[str, list[int]] = {}
+        while True:
+            (size,) = struct.unpack("<I", _read_exact(fh, 4))
+            if not size:
+                break
+            block = json.loads(_read_exact(fh, size).decode("utf-8"))
+            if arrays and [c["name"] for c in block["columns"]] != list(arrays):
+                raise ValueError("columns mismatch")
+            for column in block["columns"]:
+                name = column["name"]
+                data = array(column["typecode"])
+                if data.itemsize != column["itemsize"]:
+                    raise ValueError("itemsize mismatch")
+                data.frombytes(_read_exact(fh, data.itemsize * block["rows"]))
+                target = arrays.setdefault(name, array(data.typecode))
+                if "values" not in column:
+                    target.extend(data)
+                    continue
+                known = values.setdefault(name, [])
+                if column["reset"] and known and name not in lookups:
+                    lookups[name] = {v: i for i, v in enumerate(known)}
+                lookup = lookups.get(name)
+                if lookup is None:
+                    known.extend(column["values"])
+                    target.extend(data)
+                    continue
+                remap = [] if column["reset"] else remaps[name]
+                for value in column["values"]:
+                    code = lookup.get(value)
+                    if code is None:
+                        code = lookup[value] = len(known)
+                        known.append(value)
+                    remap.append(code)
+                remaps[name] = remap
+                target.extend(map(remap.__getitem__, data))
+        return EmployeeTable.from_columns(
+            {
+                name: DictionaryColumn(values[name], codes) if name in values else codes
+                for name, codes in arrays.items()
+            }
+        )
+
+    def capture(
+        self,
+        source: Path,
+        rows: Iterable[EmployeeRow],
+        meta: dict[str, Any],
+        columns: Iterable[str] | None = None,
+        complete: Callable[[], bool] | None = None,
+    ) -> Iterator[EmployeeRow]:
+        """
+        Пропускает полностью разобранные строки насквозь (с проекцией columns),
+        записывая их в кэш блоками по block_rows строк; после полного прохода запись
+        становится видимой — если complete() (при его наличии) подтверждает, что в rows
+        есть все строки файла. Недоступный каталог кэша не мешает проходу.
+        """
+        table = EmployeeTable()
+        wanted = None if columns is None else set(columns)
+        names = None if wanted is None else [c for c in table.columns if c in wanted]
+        writer = self._open(meta)
+        try:
+            for row in rows:
+                if writer is not None:
+                    table.append(row)
+                    if len(table) >= self.block_rows:
+                        writer = self._write_block(writer, table)
+                        table = _next_block(table, self.block_rows)
+                yield row if names is None else {name: row[name] for name in names}  # type: ignore
+            if writer is not None and (complete is None or complete()):
+                self._commit(writer, source, table)
+                writer = None
+        finally:
+            if writer is not None:
+                writer.abort()
+
+    # --- запись ---
+
+    def store(self, source: Path, table: EmployeeTable, meta: dict[str, Any]) -> None:
+        """Сохраняет таблицу файла; meta — отпечаток файла на момент начала разбора."""
+        writer = self._open(meta)
+        if writer is not None:
+            self._commit(writer, source, table)
+
+    # Кэш необязателен: ошибка записи (OSError) прекращает запись, но не мешает отчёту
+
+    def _open(self, meta: dict[str, Any]) -> _EntryWriter | None:
+        try:
+            return _EntryWriter(self.directory, dict(meta, byteorder=sys.byteorder))
+        except OSError:
+            return None
+
+    def _write_block(self, writer: _EntryWriter, table: EmployeeTable) -> _EntryWriter | None:
+        try:
+            writer.write_block(table)
+        except OSError:
+            writer.abort()
+            return None
+        return writer
+
+    def _commit(self, writer: _EntryWriter, source: Path, table: EmployeeTable) -> None:
+        """Дописывает последний блок (пустой — если блоков ещё нет) и публикует запись."""
+        try:
+            if len(table) or not writer.blocks:
+                writer.write_block(table)
+            writer.commit(self._entry_path(source))
+            self._evict()
+        except OSError:
+            writer.abort()
+
+    # --- обслуживание ---
+
+    def _touch(self, entry: Path) -> None:
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    def _discard(self, entry: Path) -> None:
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Удаляет самые давно использованные записи, пока размер кэша больше max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(_SUFFIX) and item.is_file():
+                    st = item.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, Path(item.path)))
+                    total += st.st_size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            self._discard(entry)
+            total -= size
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        if not self.directory.is_dir():
+            return
+        for entry in self.directory.glob(f"*{_SUFFIX}"):
+            self._discard(entry)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Разбиение одного большого CSV на независимые байтовые диапазоны.
+
+Граница диапазона обязана совпадать с началом записи: перевод строки внутри поля
+в кавычках (например, в колонке skills) границей не является. По RFC 4180 кавычки
+внутри поля удваиваются, поэтому перевод строки завершает запись тогда и только тогда,
+когда число символов '"' от начала файла до него чётно. В UTF-8 байты '"' и '\\n'
+не встречаются внутри многобайтовых символов, так что считать можно прямо по байтам.
+
+Алгоритм:
+1) файл делится на равные «сырые» отрезки, и в каждом через mmap считается число
+   кавычек (при наличии пула — параллельно, каждый процесс отображает файл сам);
+2) префиксные суммы дают чётность кавычек на каждой сырой границе;
+3) от каждой границы вперёд ищется первый перевод строки с чётной чётностью.
+В родительский процесс копируются только короткие окна вокруг границ.
+
+Каждый фрагмент несёт заголовок файла; валидация REQUIRED_COLUMNS повторяется
+в рабочем процессе перед разбором.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import mmap
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from .errors import ValidationError
+from .io import parse_records, read_errors, validate_header
+from .models import EmployeeRow
+
+if TYPE_CHECKING:
+    from .filters import RowFilter
+    from .rejects import RejectSink
+
+__all__ = [
+    "CsvChunk",
+    "split_csv",
+    "iter_chunk_rows",
+    "lines_before",
+    "count_quotes",
+    "next_record_start",
+    "parse_header",
+]
+
+_QUOTE = ord('"')
+_WINDOW = 1 << 20  # размер окна при подсчёте кавычек
+_READ_BUFFER = 1 << 20
+
+
+@dataclass(frozen=True)
+class CsvChunk:
+    """Байтовый диапазон [start, end) файла path, начинающийся с границы записи."""
+
+    path: Path
+    start: int
+    end: int
+    header: tuple[str, ...]
+
+
+def count_quotes(mm: mmap.mmap, start: int, end: int) -> int:
+    """Число кавычек в байтах mm[start:end] (считается окнами, без копии всего диапазона)."""
+    total = 0
+    for pos in range(start, end, _WINDOW):
+        total += mm[pos : min(pos + _WINDOW, end)].count(_QUOTE)
+    return total
+
+
+def _count_quotes_in_file(path: Path, start: int, end: int) -> int:
+    """Рабочая функция пула: число кавычек в диапазоне файла."""
+    with read_errors(path), path.open("rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return count_quotes(mm, start, end)
+
+
+def next_record_start(mm: mmap.mmap, pos: int, odd: bool) -> int:
+    """
+    Смещение начала первой записи не раньше pos.
+
+    odd — нечётно ли число кавычек до pos (т.е. находится ли pos внутри поля в кавычках).
+    """
+    size = len(mm)
+    while pos < size:
+        newline = mm.find(b"\n", pos)
+        if newline == -1:
+            return size
+        odd ^= bool(mm[pos:newline].count(_QUOTE) & 1)
+        pos = newline + 1
+        if not odd:
+            return pos
+    return size
+
+
+def parse_header(raw: bytes, path: Path) -> tuple[str, ...]:
+    """
+    Заголовок CSV из байтов первой записи файла path.
+
+    Raises
+    ------
+    DataReadError
+        Байты не в UTF-8.
+    ValidationError
+        Нет заголовка или обязательных колонок.
+    """
+    with read_errors(path):
+        text = raw.decode("utf-8")
+    header = next(csv.reader(io.StringIO(text, newline="")), None)
+    validate_header(header, path)
+    return tuple(header or ())
+
+
+def split_csv(path: Path, parts: int, executor: Executor | None = None) -> list[CsvChunk]:
+    """
+    Делит файл на не более чем parts фрагментов, выровненных по границам записей.
+
+    Parameters
+    ----------
+    path : Path
+        Путь к CSV-файлу.
+    parts : int
+        Желаемое число фрагментов.
+    executor : Executor | None
+        Пул для параллельного подсчёта кавычек; без него подсчёт идёт в текущем процессе.
+
+    Returns
+    -------
+    list[CsvChunk]
+        Фрагменты в порядке следования в файле (без строки заголовка).
+
+    Raises
+    ------
+    DataReadError
+        Проблемы с чтением файла.
+    ValidationError
+        Нет заголовка или обязательных колонок.
+    """
+    with read_errors(path), path.open("rb") as fh:
+        size = fh.seek(0, io.SEEK_END)
+        if size == 0:
+            raise ValidationError(f"В файле {path} отсутствуют заголовки столбцов.")
+
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data_start = next_record_start(mm, 0, odd=False)
+            header = parse_header(mm[:data_start], path)
+
+            span = size - data_start
+            parts = max(1, min(parts, span))
+            bounds = [data_start + span * i // parts for i in range(parts + 1)]
+
+            if executor is None:
+                counts = [count_quotes(mm, a, b) for a, b in zip(bounds, bounds[1:-1])]
+            else:
+                counts = list(
+                    executor.map(_count_quotes_in_file, repeat(path), bounds[:-2], bounds[1:-1])
+                )
+
+            starts = [data_start]
+            quotes = 0
+            for raw_bound, count in zip(bounds[1:-1], counts):
+                quotes += count
+                start = next_record_start(mm, raw_bound, odd=bool(quotes & 1))
+                if start > starts[-1]:
+                    starts.append(start)
+
+    ends = starts[1:] + [size]
+    return [CsvChunk(path, a, b, header) for a, b in zip(starts, ends) if a < b]
+
+
+class _RangeReader(io.RawIOBase):
+    """Сырой поток, ограниченный диапазоном [start, end) файла."""
+
+    def __init__(self, path: Path, start: int, end: int) -> None:
+        super().__init__()
+        self._raw = open(path, "rb", buffering=0)
+        self._raw.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        read = self._raw.readinto(view) or 0
+        self._remaining -= read
+        return read
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def iter_chunk_rows(
+    chunk: CsvChunk,
+    columns: Iterable[str] | None = None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> Iterator[EmployeeRow]:
+    """
+    Лениво отдаёт нормализованные строки одного фрагмента.
+
+    Заголовок фрагмента повторно проверяется на наличие обязательных колонок;
+    columns, where и rejects — проекция колонок, фильтр строк и сток некорректных
+    строк, как в io.iter_csv_rows(). Номера строк в rejects отсчитываются от начала
+    фрагмента (в номер строки файла их переводит lines_before()).
+    """
+    validate_header(chunk.header, chunk.path)
+    with read_errors(chunk.path):
+        raw = io.BufferedReader(_RangeReader(chunk.path, chunk.start, chunk.end), _READ_BUFFER)
+        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as fh:
+            reader = csv.reader(fh)
+            yield from parse_records(reader, chunk.header, columns, where, rejects, chunk.path)
+
+
+def lines_before(chunk: CsvChunk) -> int:
+    """Число строк файла до начала фрагмента (считается только при необходимости)."""
+    with read_errors(chunk.path), chunk.path.open("rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return sum(
+                mm[pos : min(pos + _WINDOW, chunk.start)].count(b"\n")
+                for pos in range(0, chunk.start, _WINDOW)
+            )
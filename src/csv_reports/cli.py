@@ -5,95 +5,726 @@
 
 Требования:
 - --files: один или несколько путей к .csv
-- --report: имя отчёта (берётся динамически из реестра)
+- --input-dir DIR [--pattern GLOB] [--recursive] / --files-from PATH|-: каталоги с шаблонами
+  имён и манифест путей (по пути на строку) — для десятков тысяч файлов (см. inputs.py)
+- --report: имя отчёта (берётся динамически из реестра) или несколько имён через запятую
+- --all-reports: все зарегистрированные отчёты; данные читаются один раз для всех отчётов
+- --group-by KEYS [--agg SPECS]: отчёт-группировка без собственного кода (см. groupby.py),
+  например: --group-by team,experience_years:5 --agg count,mean:performance,stddev:performance;
+  совместим с --report / --all-reports (всё считается за один проход)
+- --top K / --limit K: только первые K строк каждого отчёта в его порядке (например,
+  K лучших позиций по performance); отбираются частичной выборкой, без полной сортировки
+- --where EXPR: считать отчёты только по строкам, прошедшим фильтр (см. filters.py),
+  например: team == "API Team" and experience_years >= 5
+- --dedupe {none,first,last} [--dedupe-key COLS] [--dedupe-memory SIZE]: учитывать
+  повторяющуюся между файлами запись (ключ по умолчанию — name) один раз: первое или
+  последнее вхождение; индекс отпечатков ключей в пределах SIZE, сверх — на диске
+  (см. dedupe.py)
+- --on-error {fail,skip,quarantine} [--reject-file PATH] [--max-errors N]: строка
+  с некорректным значением прерывает запуск (fail, по умолчанию) или пропускается;
+  quarantine пишет её с файлом, номером строки и причиной в PATH (CSV или JSONL);
+  больше N отклонённых строк -> ошибка (см. rejects.py)
+- --memory-limit SIZE: бюджет памяти состояния отчётов; отчёты-группировки сверх него
+  сбрасывают группы на диск сортированными сериями и сливают их при выводе (см. spill.py)
+- --jobs: число процессов для параллельного разбора файлов (по умолчанию 1)
+- --cache-dir / --no-cache / --cache-verify: кэш разобранных файлов (включён по умолчанию)
+- --format {table,csv,jsonl,json} / --output PATH: формат и место вывода
+- --width-sample N: ширины колонок таблицы по первым N строкам (для очень больших отчётов)
+- --stats / --stats-json PATH: время по стадиям, строки, байты и пиковая память запуска
+- --profile PATH: профиль cProfile всего запуска (читается pstats / snakeviz)
+- --watch / --watch-interval SECONDS: следить за дописываемыми файлами и перепечатывать
+  отчёт, разбирая только новые байты (см. watch.py)
+- serve: долгоживущий HTTP-сервер отчётов с данными в памяти (см. server.py)
 
 Ошибки пользователя:
 - отсутствие обязательных аргументов или неверное имя отчёта -> argparse завершит с кодом 2
+  (нужен хотя бы один источник файлов: --files, --input-dir или --files-from, и хотя бы
+  один отчёт: --report, --all-reports или --group-by)
+- некорректные --group-by / --agg или --agg без --group-by -> argparse завершит с кодом 2
+- --format csv с несколькими отчётами -> argparse завершит с кодом 2
+- некорректное выражение --where -> argparse завершит с кодом 2
+- --top не положительное целое -> argparse завершит с кодом 2
+- неизвестная колонка --dedupe-key, --dedupe, --memory-limit или --on-error skip|quarantine
+  вместе с --watch -> argparse завершит с кодом 2
+- quarantine без --reject-file, --reject-file или --max-errors без подходящего
+  --on-error -> argparse завершит с кодом 2
 - несуществующие файлы -> выводим сообщение и завершаем с кодом 1
 - пустой результат -> выводим сообщение и завершаем с кодом 1
+  (для нескольких отчётов остальные таблицы всё равно печатаются)
 """
 from __future__ import annotations
 
 import argparse
+import os
 import sys
-from pathlib import Path
-from typing import Iterable
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import TYPE_CHECKING, Iterator
 
-import csv_reports as _pkg  # noqa: F401
-
-from .errors import CsvReportsError, ReportNotFound
-from .render import render_table
-from .service import build_report
+from .errors import CsvReportsError, InvalidArguments
+from .output import FORMATS
 from .reports.registry import registry
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from . import stats
+    from .cache import ParsedFileCache
+    from .dedupe import Deduplicator
+    from .filters import RowFilter
+    from .rejects import RejectSink
+    from .service import ReportResult, ReportSpec
+
+# Модули расчёта и вывода (service, cache, render, stats) и даже pathlib импортируются
+# после разбора аргументов: --help и ошибки аргументов не платят за их импорт
+# (см. benchmarks/bench_import.py)
+
+
+# Сколько отсутствующих путей перечислять в сообщении об ошибке
+_MAX_LISTED_MISSING = 10
+
+
+def _path(value: str) -> Path:
+    from pathlib import Path
+
+    return Path(value)
+
+
+def _non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается целое число, получено '{value}'") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError("значение не может быть отрицательным")
+    return number
+
 
-def _existing_files(paths: Iterable[Path]) -> tuple[list[Path], list[Path]]:
-    ok, missing = [], []
-    for p in paths:
-        (ok if p.exists() else missing).append(p)
-    return ok, missing
+def _positive_int(value: str) -> int:
+    number = _non_negative_int(value)
+    if number == 0:
+        raise argparse.ArgumentTypeError("значение должно быть положительным")
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается число, получено '{value}'") from None
+    if not number >= 0:
+        raise argparse.ArgumentTypeError("значение не может быть отрицательным")
+    return number
+
+
+_SIZE_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def _byte_size(value: str) -> int:
+    """Размер в байтах: число с необязательным суффиксом K, M, G или T (степени 1024)."""
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    unit = _SIZE_UNITS.get(text[-1:], 1)
+    number = text[:-1] if unit > 1 else text
+    try:
+        size = float(number) * unit
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"ожидается размер (например, 512M или 2G), получено '{value}'"
+        ) from None
+    if not 0 < size < float("inf"):
+        raise argparse.ArgumentTypeError("размер должен быть положительным")
+    return int(size)
+
+
+def _report_list(value: str) -> list[str]:
+    """Тип аргумента --report: одно или несколько имён через запятую."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError("не указано ни одного отчёта")
+    unknown = [name for name in names if name not in registry]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"неизвестный отчёт: {', '.join(unknown)} (доступны: {', '.join(registry.choices())})"
+        )
+    return names
+
+
+def _row_filter(value: str) -> RowFilter:
+    """Тип аргумента --where: выражение проверяется и компилируется при разборе аргументов."""
+    from .filters import compile_filter
+
+    try:
+        return compile_filter(value)
+    except InvalidArguments as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+class _HelpFormatter(argparse.HelpFormatter):
+    """Дописывает список отчётов в справку --report только при выводе справки."""
+
+    def _get_help_string(self, action: argparse.Action) -> str:
+        help_text = super()._get_help_string(action) or ""
+        if action.dest == "report":
+            choices = registry.choices()
+            help_text += f" (choices: {', '.join(choices)})." if choices else "."
+        return help_text
+
+
+def _add_input_arguments(parser: argparse.ArgumentParser, files_help: str) -> None:
+    """Источники входных файлов; хотя бы один обязателен (проверяет _resolve_inputs)."""
+    inputs = parser.add_argument_group(
+        "input files", "At least one of --files, --input-dir or --files-from is required."
+    )
+    inputs.add_argument("--files", metavar="PATH", nargs="+", type=_path, help=files_help)
+    inputs.add_argument(
+        "--input-dir",
+        metavar="DIR",
+        type=_path,
+        action="append",
+        default=[],
+        help="Read every file in DIR whose name matches --pattern (repeatable).",
+    )
+    inputs.add_argument(
+        "--pattern",
+        metavar="GLOB",
+        action="append",
+        default=[],
+        help="File name pattern for --input-dir (repeatable; default: *.csv and "
+        "compressed *.csv.gz, *.csv.bz2, *.csv.xz, *.csv.zst).",
+    )
+    inputs.add_argument(
+        "--recursive", action="store_true", help="Also descend into subdirectories of --input-dir."
+    )
+    inputs.add_argument(
+        "--files-from",
+        metavar="PATH",
+        default=None,
+        help="Read file paths from PATH, one per line ('-' = stdin; '#' starts a comment).",
+    )
 
 
 def _build_parser() -> argparse.ArgumentParser:
-    choices = registry.choices()
     parser = argparse.ArgumentParser(
         prog="csv-reports",
         description="Generate console reports from one or more CSV files.",
+        epilog="Run 'csv-reports serve --help' to serve reports over HTTP from memory.",
+        formatter_class=_HelpFormatter,
+    )
+    _add_input_arguments(parser, "CSV files to read.")
+    reports = parser.add_argument_group(
+        "reports", "At least one of --report, --all-reports or --group-by is required."
+    )
+    selection = reports.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--report",
+        metavar="NAME[,NAME...]",
+        type=_report_list,
+        help="Report name(s) to generate, comma-separated",
+    )
+    selection.add_argument(
+        "--all-reports",
+        action="store_true",
+        help="Generate every registered report in a single pass over the data.",
+    )
+    reports.add_argument(
+        "--group-by",
+        metavar="COL[:WIDTH][,...]",
+        default=None,
+        help="Ad-hoc report grouped by these columns; COL:WIDTH buckets a numeric column, "
+        "e.g. 'team,experience_years:5'.",
+    )
+    reports.add_argument(
+        "--agg",
+        metavar="OP[:COL][,...]",
+        default=None,
+        help="Aggregates for --group-by: count, sum, mean, min, max, stddev over numeric "
+        "columns, e.g. 'count,mean:performance,sum:completed_tasks' (default: count).",
+    )
+    reports.add_argument(
+        "--top",
+        "--limit",
+        metavar="K",
+        dest="top",
+        type=_positive_int,
+        default=None,
+        help="Output only the first K rows of each report, in report order (e.g. the top "
+        "K positions by performance); selected without sorting every row.",
     )
     parser.add_argument(
-        "--files",
+        "--where",
+        metavar="EXPR",
+        type=_row_filter,
+        default=None,
+        help="Only use rows matching EXPR, e.g. 'team == \"API Team\" and experience_years >= 5'. "
+        "Supports ==, !=, <, <=, >, >=, in (...), not in (...), and, or, not and parentheses.",
+    )
+    parser.add_argument(
+        "--dedupe",
+        choices=("none", "first", "last"),
+        default="none",
+        help="Count an employee repeated across files once: keep the first or the last "
+        "record per --dedupe-key (default: none). Files are then read sequentially.",
+    )
+    parser.add_argument(
+        "--dedupe-key",
+        metavar="COL[,COL...]",
+        default="name",
+        help="Columns identifying an employee for --dedupe (default: name).",
+    )
+    parser.add_argument(
+        "--dedupe-memory",
+        metavar="SIZE",
+        type=_byte_size,
+        default="256M",
+        help="Memory budget for the --dedupe key index, e.g. 512M or 2G; larger key sets "
+        "are partitioned to temporary files (default: 256M).",
+    )
+    parser.add_argument(
+        "--on-error",
+        choices=("fail", "skip", "quarantine"),
+        default="fail",
+        help="What to do with a row whose values cannot be parsed: stop with an error "
+        "(default), skip it, or skip it and write it to --reject-file.",
+    )
+    parser.add_argument(
+        "--reject-file",
         metavar="PATH",
-        nargs="+",
-        type=Path,
-        required=True,
-        help="One or more CSV files to read.",
-    )
-    if choices:
-        parser.add_argument(
-            "--report",
-            required=True,
-            choices=choices,
-            help="Report name to generate (dynamic choices).",
-        )
-    else:
-        parser.add_argument(
-            "--report",
-            required=True,
-            help="Report name to generate.",
-        )
+        type=_path,
+        default=None,
+        help="File for rows rejected by --on-error quarantine, with file, line and reason: "
+        "JSON Lines if PATH ends with .jsonl or .ndjson, otherwise CSV.",
+    )
+    parser.add_argument(
+        "--max-errors",
+        metavar="N",
+        type=_non_negative_int,
+        default=None,
+        help="With --on-error skip or quarantine, abort once more than N rows were rejected "
+        "(default: no limit).",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        metavar="SIZE",
+        type=_byte_size,
+        default=None,
+        help="Memory budget for report state, e.g. 512M or 4G. Group-by reports with more "
+        "groups spill sorted runs to temporary files and merge them while printing "
+        "(default: no limit; per worker process with --jobs).",
+    )
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=_non_negative_int,
+        default=1,
+        help="Parse files in N worker processes (0 = one per CPU, default: 1).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        type=_path,
+        default=None,
+        help="Directory for the parsed-file cache "
+        "(default: $CSV_REPORTS_CACHE_DIR or ~/.cache/csv-reports).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse CSV files; do not read or write the cache.",
+    )
+    parser.add_argument(
+        "--cache-verify",
+        action="store_true",
+        help="Also validate cache entries by content hash, not only size and mtime.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="table",
+        help="Output format (default: table). csv supports a single report.",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="PATH",
+        type=_path,
+        default=None,
+        help="Write the report to PATH instead of stdout.",
+    )
+    parser.add_argument(
+        "--width-sample",
+        metavar="N",
+        type=_non_negative_int,
+        default=None,
+        help="Compute table column widths from the first N rows only "
+        "(faster for huge results; longer values may misalign columns).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running: re-read only bytes appended to the files and re-print the report "
+        "on every change (Ctrl+C to stop).",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        metavar="SECONDS",
+        type=_non_negative_float,
+        default=2.0,
+        help="How often --watch checks the files (default: 2).",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-stage timings, rows, bytes and peak memory to stderr.",
+    )
+    parser.add_argument(
+        "--stats-json",
+        metavar="PATH",
+        type=_path,
+        default=None,
+        help="Write the run statistics as JSON to PATH.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        type=_path,
+        default=None,
+        help="Profile the run with cProfile and dump the stats to PATH.",
+    )
     return parser
 
 
-def main(argv: list[str] | None = None) -> None:
-    """Точка входа CLI. Завершает процесс через sys.exit с кодом возврата."""
-    parser = _build_parser()
+def _build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="csv-reports serve",
+        description="Load CSV files once and serve reports over HTTP from memory. "
+        "GET /report?report=NAME[,NAME...]&files=PATH[,PATH...]&format=FMT&where=EXPR, "
+        "GET /reports, GET /health.",
+    )
+    _add_input_arguments(parser, "CSV files to load and serve.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1).")
+    parser.add_argument(
+        "--port", type=_non_negative_int, default=8765, help="TCP port (default: 8765)."
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        type=_path,
+        default=None,
+        help="Listen on a Unix socket instead of TCP.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        metavar="SECONDS",
+        type=_non_negative_float,
+        default=1.0,
+        help="Check files for changes every SECONDS (0 = never reload, default: 1).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        type=_path,
+        default=None,
+        help="Directory for the parsed-file cache "
+        "(default: $CSV_REPORTS_CACHE_DIR or ~/.cache/csv-reports).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse CSV files; do not read or write the cache.",
+    )
+    parser.add_argument(
+        "--cache-verify",
+        action="store_true",
+        help="Also validate cache entries by content hash, not only size and mtime.",
+    )
+    return parser
+
+
+def _group_by_report(parser: argparse.ArgumentParser, args: argparse.Namespace) -> ReportSpec:
+    """Отчёт из --group-by / --agg; ошибки спецификации -> код 2, как у argparse."""
+    from .reports.groupby import GroupByReport
+
     try:
-        args = parser.parse_args(argv)
-    except SystemExit:
-        raise
+        return GroupByReport(args.group_by, args.agg or "count")
+    except InvalidArguments as e:
+        parser.error(str(e))
+
+
+def _deduplicator(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> Deduplicator | None:
+    """Deduplicator из --dedupe*; None — повторы не удаляются."""
+    if args.dedupe == "none":
+        return None
+    if args.watch:
+        parser.error("--dedupe is not supported with --watch")
+    from .dedupe import Deduplicator
+
+    key = [column.strip() for column in args.dedupe_key.split(",") if column.strip()]
+    try:
+        return Deduplicator(args.dedupe, key, memory_limit=args.dedupe_memory)
+    except InvalidArguments as e:
+        parser.error(str(e))
+
+
+def _reject_sink(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> RejectSink | None:
+    """RejectSink из --on-error / --reject-file / --max-errors; None — режим fail."""
+    if args.reject_file is not None and args.on_error != "quarantine":
+        parser.error("--reject-file requires --on-error quarantine")
+    if args.on_error == "fail":
+        if args.max_errors is not None:
+            parser.error("--max-errors requires --on-error skip or quarantine")
+        return None
+    if args.watch:
+        parser.error("--on-error is not supported with --watch")
+    if args.on_error == "quarantine" and args.reject_file is None:
+        parser.error("--on-error quarantine requires --reject-file")
+    from .rejects import RejectSink
+
+    return RejectSink(args.on_error, args.max_errors, args.reject_file)
+
+
+def _make_cache(args: argparse.Namespace) -> ParsedFileCache | None:
+    if args.no_cache:
+        return None
+    from .cache import ParsedFileCache, default_cache_dir
 
-    _, missing = _existing_files(args.files)
+    return ParsedFileCache(args.cache_dir or default_cache_dir(), verify_hash=args.cache_verify)
+
+
+def _resolve_inputs(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    Собирает входные файлы из --files, --files-from и --input-dir (в этом порядке, без
+    повторов) в args.files, их размеры — в args.sizes. Отсутствующие файлы -> код 1.
+    """
+    if not (args.files or args.input_dir or args.files_from):
+        parser.error("one of the arguments --files --input-dir --files-from is required")
+
+    from . import inputs
+
+    explicit = list(args.files or [])
+    if args.files_from is not None:
+        try:
+            if args.files_from == "-":
+                explicit.extend(inputs.read_manifest(sys.stdin))
+            else:
+                with open(args.files_from, encoding="utf-8") as fh:
+                    explicit.extend(inputs.read_manifest(fh))
+        except (OSError, UnicodeDecodeError) as e:
+            print(
+                f"Ошибка: не удалось прочитать список файлов {args.files_from}: {e}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    found, missing = inputs.stat_files(list(dict.fromkeys(explicit)))
     if missing:
-        missing_str = ", ".join(str(p) for p in missing)
-        print(f"Ошибка: файл(ы) не найдены: {missing_str}", file=sys.stderr)
+        listed = ", ".join(str(p) for p in missing[:_MAX_LISTED_MISSING])
+        more = len(missing) - _MAX_LISTED_MISSING
+        suffix = f" и ещё {more}" if more > 0 else ""
+        print(f"Ошибка: файл(ы) не найдены: {listed}{suffix}", file=sys.stderr)
         sys.exit(1)
 
+    if args.input_dir:
+        try:
+            found += inputs.discover(
+                args.input_dir, args.pattern or inputs.DEFAULT_PATTERNS, args.recursive
+            )
+        except OSError as e:
+            print(f"Ошибка: не удалось прочитать каталог: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    sizes = dict(found)  # повторы схлопываются, порядок — первого появления
+    if not sizes:
+        print("Ошибка: не найдено ни одного входного файла", file=sys.stderr)
+        sys.exit(1)
+    args.files = list(sizes)
+    args.sizes = sizes
+
+
+def serve_main(argv: list[str]) -> None:
+    """Точка входа `csv-reports serve`: работает до Ctrl+C."""
+    parser = _build_serve_parser()
+    args = parser.parse_args(argv)
+    _resolve_inputs(parser, args)
+
+    import asyncio
+
+    from .server import ReportServer
+
+    server = ReportServer(args.files, cache=_make_cache(args), poll_interval=args.poll_interval)
     try:
-        headers, rows = build_report(report_name=args.report, files=args.files)
-    except ReportNotFound:
-        print(f"Ошибка: неизвестный отчёт '{args.report}'", file=sys.stderr)
+        server.load()
+        asyncio.run(server.serve(args.host, args.port, args.socket))
+    except CsvReportsError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
         sys.exit(1)
+    except OSError as e:
+        print(f"Ошибка: не удалось открыть сокет: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+
+@contextmanager
+def _profiled(path: Path) -> Iterator[None]:
+    """Профилирует блок через cProfile и сохраняет результат в path (формат pstats)."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def _emit_stats(run_stats: stats.RunStats, args: argparse.Namespace) -> None:
+    if args.stats:
+        print(run_stats.format(), file=sys.stderr)
+    if args.stats_json is not None:
+        import json
+
+        payload = json.dumps(run_stats.summary(), indent=2, ensure_ascii=False)
+        args.stats_json.write_text(payload + "\n", encoding="utf-8")
+
+
+def _generate(
+    report_names: list[ReportSpec], args: argparse.Namespace, cache: ParsedFileCache | None
+) -> int:
+    """Считает и печатает отчёты; возвращает код возврата."""
+    from .service import build_reports
+
+    rejects = args.rejects
+    try:
+        with rejects if rejects is not None else nullcontext():
+            results = build_reports(
+                report_names,
+                files=args.files,
+                jobs=args.jobs,
+                cache=cache,
+                sizes=args.sizes,
+                where=args.where,
+                dedupe=args.deduplicator,
+                memory_limit=args.memory_limit,
+                top=args.top,
+                rejects=rejects,
+            )
     except CsvReportsError as e:
         print(f"Ошибка: {e}", file=sys.stderr)
         sys.exit(1)
 
-    if not rows:
-        print(f"Нет данных для отчёта '{args.report}'.", file=sys.stderr)
+    if rejects is not None and rejects.count:
+        saved = f" (записаны в {rejects.path})" if rejects.path is not None else ""
+        print(f"Пропущено некорректных строк: {rejects.count:,}{saved}", file=sys.stderr)
+    return _write(results, args, args.output)
+
+
+def _write(results: list[ReportResult], args: argparse.Namespace, target: Path | None) -> int:
+    """Печатает результаты в stdout или в файл target; возвращает код возврата."""
+    from .output import write_results
+
+    exit_code = 0
+    for name, _, rows in results:
+        if not rows:
+            print(f"Нет данных для отчёта '{name}'.", file=sys.stderr)
+            exit_code = 1
+
+    with ExitStack() as stack:
+        out = sys.stdout
+        if target is not None:
+            try:
+                out = stack.enter_context(target.open("w", encoding="utf-8", newline=""))
+            except OSError as e:
+                print(f"Ошибка: не удалось открыть {target}: {e}", file=sys.stderr)
+                sys.exit(1)
+        try:
+            write_results(results, out, args.format, sample_rows=args.width_sample)
+            out.flush()
+        except BrokenPipeError:
+            # Потребитель закрыл канал раньше времени (например, `| head`): не печатаем трассу
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+    return exit_code
+
+
+def _watch(report_names: list[ReportSpec], args: argparse.Namespace) -> int:
+    """Режим --watch: перепечатывает отчёт после каждого изменения файлов до Ctrl+C."""
+    import time
+
+    from .watch import TailAggregator
+
+    try:
+        tail = TailAggregator(report_names, args.files, args.where, top=args.top)
+        while True:
+            if tail.poll():
+                print(f"--- {time.strftime('%H:%M:%S')}: строк {tail.rows:,} ---", file=sys.stderr)
+                if args.output is None:
+                    _write(tail.results(), args, None)
+                else:
+                    # Читатели файла видят либо прежний, либо новый отчёт целиком
+                    partial = args.output.with_name(args.output.name + ".tmp")
+                    _write(tail.results(), args, partial)
+                    os.replace(partial, args.output)
+            time.sleep(args.watch_interval)
+    except CsvReportsError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
         sys.exit(1)
+    except KeyboardInterrupt:
+        return 0
 
-    table = render_table(headers=headers, rows=rows)
-    print(table)
-    sys.exit(0)
+
+def main(argv: list[str] | None = None) -> None:
+    """Точка входа CLI. Завершает процесс через sys.exit с кодом возврата."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        serve_main(argv[1:])
+
+    parser = _build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        raise
+
+    report_names: list[ReportSpec] = list(
+        dict.fromkeys(registry.choices() if args.all_reports else args.report or [])
+    )
+    if args.agg is not None and args.group_by is None:
+        parser.error("--agg requires --group-by")
+    if args.group_by is not None:
+        report_names.append(_group_by_report(parser, args))
+    if not report_names:
+        parser.error("one of the arguments --report --all-reports --group-by is required")
+    args.deduplicator = _deduplicator(parser, args)
+    args.rejects = _reject_sink(parser, args)
+    if args.memory_limit is not None and args.watch:
+        parser.error("--memory-limit is not supported with --watch")
+
+    _resolve_inputs(parser, args)
+    cache = _make_cache(args)
+
+    if args.format == "csv" and len(report_names) > 1:
+        parser.error("--format csv supports a single report; use jsonl or json")
+
+    with ExitStack() as stack:
+        run_stats = None
+        if args.stats or args.stats_json is not None:
+            from . import stats
+
+            run_stats = stack.enter_context(stats.collect())
+        if args.profile is not None:
+            stack.enter_context(_profiled(args.profile))
+        if args.watch:
+            exit_code = _watch(report_names, args)
+        else:
+            exit_code = _generate(report_names, args, cache)
+
+    if run_stats is not None:
+        _emit_stats(run_stats, args)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
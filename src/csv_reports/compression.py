@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Прозрачное чтение сжатых CSV.
+
+Сжатие определяется по сигнатуре (magic bytes) первых байтов файла, а не по расширению:
+- gzip  — 1f 8b                 (модуль gzip);
+- bzip2 — "BZh"                 (модуль bz2);
+- xz    — fd "7zXZ" 00          (модуль lzma);
+- zstd  — 28 b5 2f fd           (пакет zstandard, если установлен).
+
+Распаковка потоковая: файл не распаковывается на диск и не читается в память целиком.
+Распакованный поток оборачивается в BufferedReader с большим буфером (READ_BUFFER),
+чтобы csv.reader получал данные крупными блоками.
+
+Сжатый файл нельзя делить на байтовые диапазоны, поэтому parallel обрабатывает его
+одним заданием (параллелизм — между файлами), а режим --watch сжатые файлы не читает.
+"""
+from __future__ import annotations
+
+import io
+import sys
+from pathlib import Path
+from typing import IO, Optional
+
+from .errors import DataReadError
+
+__all__ = ["CODECS", "READ_BUFFER", "detect", "is_stream_error", "open_binary", "open_text"]
+
+READ_BUFFER = 1 << 20
+
+# Сигнатура -> имя кодека
+_MAGIC: tuple[tuple[bytes, str], ...] = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+_MAGIC_LEN = max(len(magic) for magic, _ in _MAGIC)
+
+CODECS: tuple[str, ...] = tuple(codec for _, codec in _MAGIC)
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def detect(path: Path) -> Optional[str]:
+    """Имя кодека сжатия path по сигнатуре или None для несжатого файла."""
+    with open(path, "rb") as fh:
+        return _sniff(fh.read(_MAGIC_LEN))
+
+
+def is_stream_error(exc: BaseException) -> bool:
+    """Ошибка распаковки повреждённого или оборванного сжатого потока."""
+    if isinstance(exc, EOFError):
+        return True
+    # Модули кодеков импортируются лениво: их ошибки возможны, только если модуль загружен
+    lzma = sys.modules.get("lzma")
+    zstandard = sys.modules.get("zstandard")
+    return (lzma is not None and isinstance(exc, lzma.LZMAError)) or (
+        zstandard is not None and isinstance(exc, zstandard.ZstdError)
+    )
+
+
+def _open_codec(path: Path, codec: str) -> IO[bytes]:
+    if codec == "gzip":
+        import gzip
+
+        return gzip.open(path, "rb")
+    if codec == "bz2":
+        import bz2
+
+        return bz2.open(path, "rb")
+    if codec == "xz":
+        import lzma
+
+        return lzma.open(path, "rb")
+    try:
+        import zstandard
+    except ImportError:
+        raise DataReadError(
+            f"Файл {path} сжат zstd: установите пакет zstandard (pip install zstandard)"
+        ) from None
+    raw = open(path, "rb")
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_size=READ_BUFFER, closefd=True)
+
+
+def open_binary(path: Path) -> IO[bytes]:
+    """
+    Открывает path для чтения байтов; сжатые файлы распаковываются на лету.
+
+    Raises
+    ------
+    OSError
+        Ошибки открытия файла (переводятся в доменные вызывающим кодом).
+    DataReadError
+        Файл сжат zstd, а пакет zstandard не установлен.
+    """
+    raw = open(path, "rb", buffering=READ_BUFFER)
+    codec = _sniff(raw.peek(_MAGIC_LEN))
+    if codec is None:
+        return raw
+    raw.close()
+    # Распаковщик отдаёт данные блоками по READ_BUFFER, а не по 8 КБ
+    return io.BufferedReader(_open_codec(path, codec), READ_BUFFER)  # type: ignore[arg-type]
+
+
+def open_text(path: Path) -> IO[str]:
+    """Текстовый поток UTF-8 для csv.reader (newline="" — как требует модуль csv)."""
+    return io.TextIOWrapper(open_binary(path), encoding="utf-8", newline="")
@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+Удаление повторяющихся записей сотрудников между файлами (--dedupe).
+
+Запись — повтор, если её ключ (по умолчанию name) уже встречался: режим "first"
+оставляет первое вхождение в порядке файлов и строк, "last" — последнее.
+Ключ записи хранится не целиком, а 64-битным отпечатком (hash() кортежа значений
+ключа; значения уже нормализованы читателем). Вероятность ложного совпадения двух
+разных ключей — порядка n² / 2⁶⁵, для 100 млн различных ключей ~3·10⁻⁴.
+
+Память ограничена бюджетом memory_limit:
+- "first" сначала пробует один проход с множеством отпечатков в памяти. Если различных
+  ключей больше, чем помещается в бюджет, проход прерывается (IndexOverflow) и отчёт
+  считается заново по двухпроходной схеме ниже;
+- двухпроходная схема (всегда для "last"): первый проход читает только колонки ключа
+  и пишет пары (отпечаток, номер строки) в array('Q'). Переполненный буфер
+  раскладывается на диск по _FANOUT хэш-разделам; каждый раздел обрабатывается
+  отдельно (слишком большой — рекурсивно делится по следующим битам отпечатка).
+  Номера строк-повторов копятся отсортированными сериями (в памяти — не больше
+  capacity номеров). Второй проход читает данные для отчёта и пропускает эти строки,
+  сливая серии (heapq.merge) потоково.
+
+Номера строк сквозные по всем файлам и считаются после фильтра --where, поэтому оба
+прохода должны читать одни и те же файлы с тем же фильтром. Строки и таблицы из кэша
+нумеруются одинаково, так что проходы могут по-разному попадать в кэш.
+"""
+from __future__ import annotations
+
+import heapq
+import tempfile
+from array import array
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Union
+
+from .errors import InvalidArguments
+from .models import EMPLOYEE_COLUMNS, EmployeeRow, EmployeeTable
+
+__all__ = [
+    "DEDUPE_MODES",
+    "DEFAULT_KEY",
+    "DEFAULT_MEMORY_LIMIT",
+    "Deduplicator",
+    "DuplicateIndex",
+    "IndexOverflow",
+]
+
+DEDUPE_MODES: tuple[str, ...] = ("none", "first", "last")
+DEFAULT_KEY: tuple[str, ...] = ("name",)
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Память на отпечаток в множестве Python: объект int и слот хэш-таблицы
+_ENTRY_BYTES = 80
+# Разделов первого уровня (по 6 старшим битам отпечатка); при повторном делении —
+# не больше стольких же
+_FANOUT_BITS = 6
+_FANOUT = 1 << _FANOUT_BITS
+# Элементов array('Q') в одном чтении/записи файла раздела
+_IO_BLOCK = 1 << 16
+_MASK = (1 << 64) - 1
+# Нечётный множитель (2⁶⁴/φ): перемешивает младшие биты hash() в старшие, по которым
+# выбирается раздел (hash() небольших целых чисел равен самому числу)
+_MIX = 0x9E3779B97F4A7C15
+
+Batch = Union[EmployeeTable, Iterator[EmployeeRow]]
+
+
+def _fingerprint(key: Any) -> int:
+    return (hash(key) * _MIX) & _MASK
+
+
+class IndexOverflow(Exception):
+    """Различных ключей больше, чем помещается в бюджет памяти однопроходного режима."""
+
+
+class DuplicateIndex:
+    """
+    Номера строк-повторов по потоку отпечатков, поданных в порядке строк.
+
+    Пока пары (отпечаток, номер) помещаются в capacity, они держатся в памяти;
+    дальше буфер сбрасывается в файлы хэш-разделов во временном каталоге tmp_dir.
+    Использовать как контекстный менеджер: при выходе временные файлы удаляются.
+    """
+
+    def __init__(self, keep: str, capacity: int, tmp_dir: Optional[Path] = None) -> None:
+        self.keep = keep
+        self.capacity = max(capacity, 1)
+        self.rows = 0
+        self._tmp_dir = tmp_dir
+        self._buffer = array("Q")
+        self._workdir: Optional[tempfile.TemporaryDirectory[str]] = None
+        self._partitions: list[Path] = []
+        self._pending = array("Q")
+        self._runs: list[Path] = []
+
+    def __enter__(self) -> "DuplicateIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._workdir is not None:
+            self._workdir.cleanup()
+            self._workdir = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._workdir is not None
+
+    def extend(self, fingerprints: Iterable[int]) -> None:
+        limit, row, buffer = 2 * self.capacity, self.rows, self._buffer
+        for fp in fingerprints:
+            if len(buffer) >= limit:
+                self._spill()
+                buffer = self._buffer
+            buffer.append(fp)
+            buffer.append(row)
+            row += 1
+        self.rows = row
+
+    def _spill(self) -> None:
+        if self._workdir is None:
+            self._workdir = tempfile.TemporaryDirectory(
+                prefix="csv-reports-dedupe-", dir=self._tmp_dir
+            )
+            root = Path(self._workdir.name)
+            self._partitions = [root / f"p{i:02d}" for i in range(_FANOUT)]
+        _scatter(self._buffer, self._partitions, 0, _FANOUT_BITS)
+        self._buffer = array("Q")
+
+    def dropped(self) -> Iterator[int]:
+        """Номера строк-повторов по возрастанию."""
+        if not self.spilled:
+            return iter(_dedupe_pairs(self._buffer, self.keep))
+        if self._buffer:
+            self._spill()
+        # Повторы копятся в памяти (8 байт на номер) и сбрасываются отсортированными
+        # сериями, чтобы число файлов серий не зависело от числа разделов
+        for path in self._partitions:
+            self._dedupe_file(path, _FANOUT_BITS)
+        if not self._runs:
+            return iter(sorted(self._pending))
+        self._flush_run()
+        return heapq.merge(*(_read_run(path) for path in self._runs))
+
+    def _dedupe_file(self, path: Path, offset: int) -> None:
+        """Повторы раздела path, чьи отпечатки совпадают в старших offset битах."""
+        if not path.exists():
+            return
+        pairs = path.stat().st_size // 16
+        if pairs > self.capacity and offset < 64:
+            # Делим на столько частей, чтобы каждая с запасом помещалась в бюджет
+            bits = min(_FANOUT_BITS, 64 - offset, (-(-pairs // self.capacity)).bit_length())
+            parts = [path.with_name(f"{path.name}.{i:02d}") for i in range(1 << bits)]
+            with path.open("rb") as fh:
+                for block in _read_blocks(fh):
+                    _scatter(block, parts, offset, bits)
+            path.unlink()
+            for part in parts:
+                self._dedupe_file(part, offset + bits)
+            return
+
+        with path.open("rb") as fh:
+            buffer = array("Q")
+            buffer.fromfile(fh, pairs * 2)
+        path.unlink()
+        self._pending.extend(_dedupe_pairs(buffer, self.keep))
+        if len(self._pending) >= self.capacity:
+            self._flush_run()
+
+    def _flush_run(self) -> None:
+        run = self._partitions[0].with_name(f"run{len(self._runs):04d}")
+        with run.open("wb") as fh:
+            array("Q", sorted(self._pending)).tofile(fh)
+        self._runs.append(run)
+        self._pending = array("Q")
+
+
+def _scatter(pairs: array, partitions: Sequence[Path], offset: int, bits: int) -> None:
+    """Дописывает пары в разделы по bits битам отпечатка после старших offset бит."""
+    shift = 64 - offset - bits
+    mask = (1 << bits) - 1
+    parts = [array("Q") for _ in partitions]
+    it = iter(pairs)
+    for fp, row in zip(it, it):
+        part = parts[(fp >> shift) & mask]
+        part.append(fp)
+        part.append(row)
+    for path, part in zip(partitions, parts):
+        if part:
+            with path.open("ab") as fh:
+                part.tofile(fh)
+
+
+def _dedupe_pairs(pairs: array, keep: str) -> list[int]:
+    """Номера повторов (по возрастанию) среди пар (отпечаток, номер) в порядке номеров."""
+    fps, rows = pairs[0::2], pairs[1::2]
+    seen: set[int] = set()
+    add = seen.add
+    dropped = []
+    order = range(len(fps)) if keep == "first" else range(len(fps) - 1, -1, -1)
+    for i in order:
+        fp = fps[i]
+        if fp in seen:
+            dropped.append(rows[i])
+        else:
+            add(fp)
+    if keep != "first":
+        dropped.reverse()
+    return dropped
+
+
+def _read_blocks(fh: BinaryIO) -> Iterator[array]:
+    while True:
+        block = array("Q")
+        try:
+            block.fromfile(fh, _IO_BLOCK)
+        except EOFError:
+            # Последний неполный блок: fromfile уже дописал прочитанное
+            pass
+        if not block:
+            return
+        yield block
+
+
+def _read_run(path: Path) -> Iterator[int]:
+    with path.open("rb") as fh:
+        for block in _read_blocks(fh):
+            yield from block
+
+
+class Deduplicator:
+    """
+    Настройки удаления повторов и фильтры пакетов io.iter_csv_batches().
+
+    Parameters
+    ----------
+    keep : str
+        "first" или "last" — какое из вхождений ключа оставить.
+    key : Sequence[str]
+        Колонки ключа записи.
+    memory_limit : int
+        Бюджет памяти индекса отпечатков, байт.
+    tmp_dir : Path | None
+        Каталог для разделов на диске; None — системный (TMPDIR).
+
+    Raises
+    ------
+    InvalidArguments
+        Неизвестный режим или колонка ключа.
+    """
+
+    def __init__(
+        self,
+        keep: str,
+        key: Sequence[str] = DEFAULT_KEY,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        tmp_dir: Optional[Path] = None,
+    ) -> None:
+        if keep not in ("first", "last"):
+            raise InvalidArguments(f"Неизвестный режим удаления повторов '{keep}'")
+        if not key:
+            raise InvalidArguments("Не указаны колонки ключа для удаления повторов")
+        unknown = [c for c in key if c not in EMPLOYEE_COLUMNS]
+        if unknown:
+            raise InvalidArguments(
+                f"Неизвестная колонка ключа: {', '.join(unknown)} "
+                f"(доступны: {', '.join(EMPLOYEE_COLUMNS)})"
+            )
+        self.keep = keep
+        self.key = tuple(dict.fromkeys(key))
+        self.columns = frozenset(self.key)
+        self.memory_limit = memory_limit
+        self.tmp_dir = tmp_dir
+        self._key_of: Callable[[EmployeeRow], Any] = itemgetter(*self.key)  # type: ignore
+
+    @property
+    def capacity(self) -> int:
+        """Сколько отпечатков помещается в бюджет памяти."""
+        return max(self.memory_limit // _ENTRY_BYTES, 1)
+
+    def fingerprints(self, batch: Batch) -> Iterator[int]:
+        """Отпечатки ключей строк пакета по порядку."""
+        if isinstance(batch, EmployeeTable):
+            columns = [batch.column(c) for c in self.key]
+            keys: Iterable[Any] = columns[0] if len(columns) == 1 else zip(*columns)
+        else:
+            keys = map(self._key_of, batch)
+        return map(_fingerprint, keys)
+
+    def index(self, batches: Iterable[Batch]) -> DuplicateIndex:
+        """Первый проход: индекс повторов по пакетам с колонками ключа."""
+        index = DuplicateIndex(self.keep, self.capacity, self.tmp_dir)
+        try:
+            for batch in batches:
+                index.extend(self.fingerprints(batch))
+        except BaseException:
+            index.close()
+            raise
+        return index
+
+    def first_pass(self, batches: Iterable[Batch]) -> Iterator[Batch]:
+        """
+        Однопроходный режим "first": пропускает повторы по множеству отпечатков.
+
+        Raises
+        ------
+        IndexOverflow
+            Различных ключей больше capacity (при потреблении пакетов).
+        """
+        seen: set[int] = set()
+        capacity, key_of = self.capacity, self._key_of
+
+        def admit(fp: int) -> bool:
+            if fp in seen:
+                return False
+            if len(seen) >= capacity:
+                raise IndexOverflow(capacity)
+            seen.add(fp)
+            return True
+
+        for batch in batches:
+            if isinstance(batch, EmployeeTable):
+                keep = [i for i, fp in enumerate(self.fingerprints(batch)) if admit(fp)]
+                yield batch if len(keep) == len(batch) else batch.take(keep)
+            else:
+                yield filter(lambda row: admit(_fingerprint(key_of(row))), batch)
+
+    def skip(self, batches: Iterable[Batch], dropped: Iterator[int]) -> Iterator[Batch]:
+        """Второй проход: пакеты без строк с номерами из dropped (по возрастанию)."""
+        cursor = _Cursor(dropped)
+        for batch in batches:
+            if isinstance(batch, EmployeeTable):
+                drops = cursor.advance(len(batch))
+                if drops:
+                    skip = set(drops)
+                    batch = batch.take([i for i in range(len(batch)) if i not in skip])
+                yield batch
+            else:
+                yield cursor.filter_rows(batch)
+
+
+class _Cursor:
+    """Сквозной номер строки и следующий номер повтора."""
+
+    __slots__ = ("row", "_next", "_dropped")
+
+    def __init__(self, dropped: Iterator[int]) -> None:
+        self.row = 0
+        self._dropped = dropped
+        self._next = next(dropped, None)
+
+    def advance(self, count: int) -> list[int]:
+        """Смещения повторов среди следующих count строк."""
+        start, end = self.row, self.row + count
+        drops = []
+        while self._next is not None and self._next < end:
+            drops.append(self._next - start)
+            self._next = next(self._dropped, None)
+        self.row = end
+        return drops
+
+    def filter_rows(self, rows: Iterator[EmployeeRow]) -> Iterator[EmployeeRow]:
+        for row in rows:
+            if self.row == self._next:
+                self._next = next(self._dropped, None)
+            else:
+                yield row
+            self.row += 1
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Движок групповых агрегатов по колонкам EmployeeTable.
+
+Вход — коды групп (например, DictionaryColumn.codes) и числовая колонка одинаковой
+длины. Выход — по группе: count, sum, mean, min, max.
+
+Бэкенды:
+- "numpy": векторизованный расчёт (bincount / reduceat); выбирается автоматически,
+  если NumPy установлен (pip install "csv-reports[fast]");
+- "python": чистый Python, всегда доступен.
+Явно выбрать бэкенд можно аргументом backend или переменной окружения CSV_REPORTS_ENGINE.
+NumPy импортируется при первом векторизованном расчёте, а не при импорте модуля:
+импорт NumPy стоит ~0.1 с, поэтому при автоматическом выборе небольшие колонки
+(меньше NUMPY_MIN_ROWS значений) считаются в чистом Python.
+
+Суммы в обоих бэкендах точные (как у MeanAccumulator): NumPy-бэкенд раскладывает
+каждое число на целую мантиссу и показатель и суммирует мантиссы в целых числах.
+Поэтому результаты бэкендов совпадают побитно, а не только с точностью до погрешности,
+и не зависят от того, каким путём (построчно или по колонкам) считался отчёт.
+"""
+from __future__ import annotations
+
+import os
+from fractions import Fraction
+from importlib.util import find_spec
+from typing import Any, Iterable, Sequence
+
+from .errors import InvalidArguments
+from .reports.accumulators import MeanAccumulator
+
+# NumPy — необязательная зависимость; модуль импортируется лениво (см. _numpy())
+_HAS_NUMPY = find_spec("numpy") is not None
+np: Any = None
+
+__all__ = [
+    "GroupStats",
+    "available_backends",
+    "resolve_backend",
+    "group_stats",
+    "group_aggregate",
+    "AGGREGATES",
+    "NUMPY_MIN_ROWS",
+]
+
+AGGREGATES: tuple[str, ...] = ("count", "sum", "mean", "min", "max")
+
+# Строк в блоке при суммировании мантисс: частичные суммы остаются точными в float64
+_BLOCK = 1 << 24
+_MANTISSA_BITS = 53
+_SPLIT_BITS = 27
+
+# При автоматическом выборе бэкенда меньшие колонки не окупают импорт NumPy
+NUMPY_MIN_ROWS = 50_000
+
+
+def _numpy() -> Any:
+    global np
+    if np is None:
+        import numpy
+
+        np = numpy
+    return np
+
+
+class GroupStats:
+    """Статистика одной группы: точная сумма и количество (MeanAccumulator), min и max."""
+
+    __slots__ = ("acc", "min", "max")
+
+    def __init__(self) -> None:
+        self.acc = MeanAccumulator()
+        self.min: float | None = None
+        self.max: float | None = None
+
+    @property
+    def count(self) -> int:
+        return self.acc.count
+
+    @property
+    def sum(self) -> float:
+        return self.acc.total
+
+    @property
+    def mean(self) -> float | None:
+        return self.acc.mean if self.acc.count else None
+
+    def get(self, op: str) -> Any:
+        return getattr(self, op)
+
+    def add(self, value: float) -> None:
+        """Учитывает одно значение (построчный путь отчётов)."""
+        self.acc.add(value)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "GroupStats") -> None:
+        """Вливает статистику другой группы (other не изменяется)."""
+        self.acc.merge(other.acc)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def copy(self) -> "GroupStats":
+        clone = GroupStats()
+        clone.acc = self.acc.copy()
+        clone.min, clone.max = self.min, self.max
+        return clone
+
+    def __getstate__(self) -> tuple[MeanAccumulator, Any, Any]:
+        return self.acc, self.min, self.max
+
+    def __setstate__(self, state: tuple[MeanAccumulator, Any, Any]) -> None:
+        self.acc, self.min, self.max = state
+
+
+def available_backends() -> list[str]:
+    return ["numpy", "python"] if _HAS_NUMPY else ["python"]
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Имя бэкенда: явное, из CSV_REPORTS_ENGINE или автоматически (numpy, если есть)."""
+    name = backend or os.environ.get("CSV_REPORTS_ENGINE") or "auto"
+    if name == "auto":
+        return available_backends()[0]
+    if name not in ("numpy", "python"):
+        raise InvalidArguments(f"Неизвестный движок агрегации '{name}'")
+    if name not in available_backends():
+        raise InvalidArguments("Движок 'numpy' недоступен: NumPy не установлен")
+    return name
+
+
+def _python_stats(codes: Iterable[int], values: Iterable[float], n_groups: int) -> list[GroupStats]:
+    stats = [GroupStats() for _ in range(n_groups)]
+    for code, value in zip(codes, values):
+        group = stats[code]
+        group.acc.add(value)
+        if group.min is None or value < group.min:
+            group.min = value
+        if group.max is None or value > group.max:
+            group.max = value
+    return stats
+
+
+def _numpy_exact_sums(codes: Any, values: Any) -> dict[int, tuple[int, int]]:
+    """
+    Точные суммы по группам: {код: (целый числитель N, показатель e)}, сумма = N * 2**e.
+
+    value = m * 2**(exp - 53), где m — целое, |m| < 2**53. Мантисса делится на старшую
+    и младшую части, которые суммируются bincount'ом по ключу (группа, exp) блоками
+    такого размера, что суммы в float64 остаются точными целыми.
+    """
+    np = _numpy()
+    mant, exp = np.frexp(values)
+    m = np.ldexp(mant, _MANTISSA_BITS).astype(np.int64)
+    hi = m >> _SPLIT_BITS
+    lo = m - (hi << _SPLIT_BITS)
+
+    exp = exp.astype(np.int64)
+    exp_min = int(exp.min())
+    span = int(exp.max()) - exp_min + 1
+    keys, inverse = np.unique(codes * span + (exp - exp_min), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = [0] * len(keys)
+    for start in range(0, len(values), _BLOCK):
+        part = slice(start, start + _BLOCK)
+        hi_sum = np.bincount(inverse[part], weights=hi[part], minlength=len(totals))
+        lo_sum = np.bincount(inverse[part], weights=lo[part], minlength=len(totals))
+        for k, (h, low) in enumerate(zip(hi_sum.tolist(), lo_sum.tolist())):
+            totals[k] += (int(h) << _SPLIT_BITS) + int(low)
+
+    sums: dict[int, tuple[int, int]] = {}
+    for key, total in zip(keys.tolist(), totals):
+        code, offset = divmod(key, span)
+        e = exp_min + offset - _MANTISSA_BITS
+        if code in sums:
+            n, e0 = sums[code]
+            low_e = min(e, e0)
+            sums[code] = ((n << (e0 - low_e)) + (total << (e - low_e)), low_e)
+        else:
+            sums[code] = (total, e)
+    return sums
+
+
+def _numpy_stats(codes: Sequence[int], values: Sequence[float], n_groups: int) -> list[GroupStats]:
+    np = _numpy()
+    codes_np = np.asarray(codes, dtype=np.int64)
+    values_np = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(values_np).all():
+        # inf/nan не раскладываются на мантиссу — считаем в чистом Python
+        return _python_stats(codes, values, n_groups)
+
+    stats = [GroupStats() for _ in range(n_groups)]
+    if not len(values_np):
+        return stats
+
+    counts = np.bincount(codes_np, minlength=n_groups).tolist()
+    for code, (numerator, exponent) in _numpy_exact_sums(codes_np, values_np).items():
+        stats[code].acc.add_exact_sum(Fraction(numerator) * Fraction(2) ** exponent, counts[code])
+
+    order = np.argsort(codes_np, kind="stable")
+    sorted_codes = codes_np[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sorted_values = values_np[order]
+    mins = np.minimum.reduceat(sorted_values, starts).tolist()
+    maxs = np.maximum.reduceat(sorted_values, starts).tolist()
+    for code, lo, hi in zip(sorted_codes[starts].tolist(), mins, maxs):
+        stats[code].min, stats[code].max = lo, hi
+    return stats
+
+
+def group_stats(
+    codes: Sequence[int],
+    values: Sequence[float],
+    n_groups: int,
+    backend: str | None = None,
+) -> list[GroupStats]:
+    """
+    Статистика по группам 0..n_groups-1.
+
+    Parameters
+    ----------
+    codes : Sequence[int]
+        Код группы для каждой строки (array('I'), список или массив NumPy).
+    values : Sequence[float]
+        Значения той же длины (array('d'/'q'), список или массив NumPy).
+    n_groups : int
+        Число групп; коды должны лежать в диапазоне [0, n_groups).
+    backend : str | None
+        "numpy", "python" или None — автоматический выбор (NumPy для колонок
+        от NUMPY_MIN_ROWS значений, если он установлен).
+    """
+    if len(codes) != len(values):
+        raise ValueError("Коды групп и значения должны иметь одинаковую длину")
+    name = resolve_backend(backend)
+    explicit = (backend or os.environ.get("CSV_REPORTS_ENGINE") or "auto") != "auto"
+    if name == "numpy" and (explicit or len(values) >= NUMPY_MIN_ROWS):
+        return _numpy_stats(codes, values, n_groups)
+    return _python_stats(codes, values, n_groups)
+
+
+def group_aggregate(
+    codes: Sequence[int],
+    values: Sequence[float],
+    n_groups: int,
+    ops: Sequence[str] = AGGREGATES,
+    backend: str | None = None,
+) -> dict[str, list[Any]]:
+    """
+    Групповые агрегаты в виде {операция: [значение для группы 0, 1, ...]}.
+
+    Для пустых групп count = 0, sum = 0.0, а mean/min/max = None.
+    """
+    unknown = set(ops).difference(AGGREGATES)
+    if unknown:
+        raise InvalidArguments(f"Неизвестные агрегаты: {', '.join(sorted(unknown))}")
+    stats = group_stats(codes, values, n_groups, backend)
+    return {op: [group.get(op) for group in stats] for op in ops}
+
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Фильтр строк (--where): небольшой безопасный язык выражений над колонками EmployeeRow.
+
+Синтаксис — подмножество выражений Python:
+- сравнения ==, !=, <, <=, >, >=, в том числе цепочки: 1 <= experience_years < 5;
+- in / not in со списком литералов: team in ("API Team", "QA Team");
+- and, or, not и скобки;
+- литералы — строки в кавычках и числа, имена — только колонки EmployeeRow.
+
+Выражение разбирается модулем ast и проверяется по белому списку узлов: вызовы,
+атрибуты, индексы и любые другие конструкции отклоняются. Типы литералов сверяются
+с колонками при компиляции (числа — для числовых колонок, строки — для текстовых);
+пробелы в строковых литералах нормализуются так же, как значения при чтении CSV.
+
+Проверенное дерево компилируется один раз в функцию над словарём строки — дальше
+фильтр выполняется байткодом CPython, без обхода дерева на каждую строку.
+RowFilter.columns — колонки, на которые ссылается фильтр: io сначала приводит
+к типам только их, а остальные колонки разбирает лишь у прошедших фильтр строк.
+"""
+from __future__ import annotations
+
+import ast
+from typing import Any, Callable, Mapping
+
+from .errors import InvalidArguments
+from .models import EMPLOYEE_COLUMNS, NUMERIC_TYPECODES, EmployeeTable
+
+__all__ = ["RowFilter", "compile_filter"]
+
+Predicate = Callable[[Mapping[str, Any]], bool]
+
+# Имя аргумента скомпилированной функции; колонки читаются как row["name"]
+_ROW = "row"
+
+_ORDER_OPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_MEMBERSHIP_OPS = (ast.In, ast.NotIn)
+_CONTAINERS = (ast.Tuple, ast.List, ast.Set)
+
+
+class RowFilter:
+    """
+    Скомпилированный фильтр: вызывается со словарём строки, содержащим columns.
+
+    Экземпляр передаётся в рабочие процессы parallel: при pickle сохраняется
+    только текст выражения, функция компилируется заново на месте.
+    """
+
+    __slots__ = ("expression", "columns", "_predicate")
+
+    def __init__(self, expression: str, columns: frozenset[str], predicate: Predicate) -> None:
+        self.expression = expression
+        self.columns = columns
+        self._predicate = predicate
+
+    def __call__(self, row: Mapping[str, Any]) -> bool:
+        return self._predicate(row)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return compile_filter, (self.expression,)
+
+    def __repr__(self) -> str:
+        return f"RowFilter({self.expression!r})"
+
+    def select(self, table: EmployeeTable) -> EmployeeTable:
+        """Строки таблицы, прошедшие фильтр; если прошли все — сама таблица."""
+        names = [name for name in table.columns if name in self.columns]
+        predicate = self._predicate
+        rows = zip(*(table.column(name) for name in names))
+        keep = [i for i, values in enumerate(rows) if predicate(dict(zip(names, values)))]
+        return table if len(keep) == len(table) else table.take(keep)
+
+
+def _fail(expression: str, reason: str) -> InvalidArguments:
+    return InvalidArguments(f"Некорректный фильтр {expression!r}: {reason}")
+
+
+class _Checker:
+    """Проверка дерева по белому списку; собирает колонки, на которые ссылается фильтр."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.columns: set[str] = set()
+
+    def check(self, node: ast.expr) -> None:
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self.check(value)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self.check(node.operand)
+        elif isinstance(node, ast.Compare):
+            self._compare(node)
+        else:
+            raise self._error(f"ожидается сравнение, получено '{ast.unparse(node)}'")
+
+    def _error(self, reason: str) -> InvalidArguments:
+        return _fail(self.expression, reason)
+
+    def _compare(self, node: ast.Compare) -> None:
+        operands = [node.left, *node.comparators]
+        if not any(isinstance(op, ast.Name) for op in operands):
+            raise self._error(f"сравнение без колонки: '{ast.unparse(node)}'")
+        membership = any(isinstance(op, _MEMBERSHIP_OPS) for op in node.ops)
+        if membership and len(node.ops) > 1:
+            raise self._error("in / not in нельзя объединять в цепочку сравнений")
+
+        for left, op, right in zip(operands, node.ops, operands[1:]):
+            kind = self._kind(left)
+            if isinstance(op, _MEMBERSHIP_OPS):
+                if not isinstance(right, _CONTAINERS) or not right.elts:
+                    raise self._error("после in ожидается непустой список литералов в скобках")
+                kinds = {self._literal(elt) for elt in right.elts}
+            elif isinstance(op, _ORDER_OPS):
+                kinds = {self._kind(right)}
+            else:
+                raise self._error(f"недопустимый оператор в '{ast.unparse(node)}'")
+            if kinds != {kind}:
+                raise self._error(f"несовместимые типы в '{ast.unparse(node)}'")
+
+    def _kind(self, node: ast.expr) -> str:
+        """Тип операнда сравнения: 'number' или 'text'."""
+        if isinstance(node, ast.Name):
+            if node.id not in EMPLOYEE_COLUMNS:
+                raise self._error(
+                    f"неизвестная колонка '{node.id}' (доступны: {', '.join(EMPLOYEE_COLUMNS)})"
+                )
+            self.columns.add(node.id)
+            return "number" if node.id in NUMERIC_TYPECODES else "text"
+        return self._literal(node)
+
+    def _literal(self, node: ast.expr) -> str:
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            if self._literal(node.operand) == "number":
+                return "number"
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, bool):
+            if isinstance(node.value, (int, float)):
+                return "number"
+            if isinstance(node.value, str):
+                return "text"
+        raise self._error(f"ожидается колонка, число или строка, получено '{ast.unparse(node)}'")
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Колонки -> row["name"], списки после in -> множества, строки -> нормализованные."""
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        access = ast.Subscript(ast.Name(_ROW, ast.Load()), ast.Constant(node.id), ast.Load())
+        return ast.copy_location(access, node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, str):
+            return ast.copy_location(ast.Constant(" ".join(node.value.split())), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.ops[0], _MEMBERSHIP_OPS):
+            # Множество литералов CPython сворачивает в константу frozenset
+            elts = node.comparators[0].elts  # type: ignore[attr-defined]
+            node.comparators = [ast.copy_location(ast.Set(elts), node.comparators[0])]
+        return node
+
+
+def compile_filter(expression: str) -> RowFilter:
+    """
+    Проверяет и компилирует выражение фильтра.
+
+    Parameters
+    ----------
+    expression : str
+        Выражение, например: team == "API Team" and experience_years >= 5.
+
+    Returns
+    -------
+    RowFilter
+        Фильтр для io.iter_csv_rows(where=...) и других читателей.
+
+    Raises
+    ------
+    InvalidArguments
+        Синтаксическая ошибка, недопустимая конструкция, неизвестная колонка
+        или несовместимые типы.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise _fail(expression, f"синтаксическая ошибка ({exc.msg})") from None
+    checker = _Checker(expression)
+    checker.check(tree.body)
+
+    function = ast.parse(f"lambda {_ROW}: None", mode="eval")
+    function.body.body = _Rewriter().visit(tree.body)  # type: ignore[attr-defined]
+    ast.fix_missing_locations(function)
+    # В дереве остались только проверенные узлы: сравнения, логика, литералы и row[...]
+    predicate = eval(compile(function, "<where>", "eval"), {"__builtins__": {}})
+    return RowFilter(expression, frozenset(checker.columns), predicate)
+
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Сбор списка входных файлов: явные пути, каталоги с шаблонами и файлы-манифесты.
+
+Рассчитано на десятки тысяч файлов:
+- каталоги обходятся через os.scandir: имя и тип берутся из записей каталога, поэтому
+  stat() (ради размера) делается только для файлов, подходящих под шаблон (discover);
+- пути из --files и манифестов проверяются одним os.stat() на путь (stat_files) —
+  чтение каталога целиком этого не заменяет: размер из записи каталога на Linux
+  всё равно требует stat() на каждый файл;
+- манифест (--files-from) читается построчно, поэтому список путей не упирается в ARG_MAX.
+
+Все функции возвращают пары (путь, размер в байтах): размеры нужны планировщику
+parallel, который раздаёт файлы процессам от больших к меньшим.
+"""
+from __future__ import annotations
+
+import os
+from fnmatch import fnmatchcase
+from pathlib import Path
+from stat import S_ISDIR
+from typing import IO, Iterable, Iterator, Sequence
+
+__all__ = ["DEFAULT_PATTERNS", "SizedPath", "discover", "read_manifest", "stat_files"]
+
+# Шаблоны имён по умолчанию для --input-dir: CSV и его сжатые варианты
+DEFAULT_PATTERNS: tuple[str, ...] = ("*.csv", "*.csv.gz", "*.csv.bz2", "*.csv.xz", "*.csv.zst")
+
+SizedPath = tuple[Path, int]
+
+
+def _matches(name: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _walk(directory: str, patterns: Sequence[str], recursive: bool) -> Iterator[SizedPath]:
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if recursive:
+                    subdirs.append(entry.path)
+            elif _matches(entry.name, patterns) and entry.is_file():
+                yield Path(entry.path), entry.stat().st_size
+    for subdir in sorted(subdirs):
+        yield from _walk(subdir, patterns, recursive)
+
+
+def discover(
+    directories: Iterable[Path],
+    patterns: Sequence[str] = DEFAULT_PATTERNS,
+    recursive: bool = False,
+) -> list[SizedPath]:
+    """
+    Файлы каталогов, имена которых подходят под один из шаблонов (fnmatch).
+
+    Тип записи берётся из os.scandir без stat(); размер — одним stat() на
+    подходящий файл.
+
+    Parameters
+    ----------
+    directories : Iterable[Path]
+        Каталоги для обхода.
+    patterns : Sequence[str]
+        Шаблоны имён файлов (сравниваются с именем, не с путём).
+    recursive : bool
+        Обходить подкаталоги.
+
+    Returns
+    -------
+    list[tuple[Path, int]]
+        Пути и размеры, отсортированные по пути (порядок не зависит от файловой системы).
+
+    Raises
+    ------
+    OSError
+        Каталог не существует или недоступен.
+    """
+    found: list[SizedPath] = []
+    for directory in directories:
+        found.extend(_walk(str(directory), patterns, recursive))
+    found.sort(key=lambda item: str(item[0]))
+    return found
+
+
+def read_manifest(stream: IO[str]) -> list[Path]:
+    """Пути из манифеста: по одному на строку; пустые строки и строки с '#' пропускаются."""
+    paths = []
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            paths.append(Path(line))
+    return paths
+
+
+def _stat_one(path: Path) -> int | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # Не только обычные файлы: --files /dev/stdin и именованные каналы тоже читаются
+    return None if S_ISDIR(st.st_mode) else st.st_size
+
+
+def stat_files(paths: Sequence[Path]) -> tuple[list[SizedPath], list[Path]]:
+    """
+    Проверяет существование и размеры файлов: один os.stat() на путь.
+
+    Returns
+    -------
+    tuple[list[tuple[Path, int]], list[Path]]
+        (найденные файлы с размерами в исходном порядке, отсутствующие пути).
+    """
+    sizes = [_stat_one(path) for path in paths]
+    found = [(p, size) for p, size in zip(paths, sizes) if size is not None]
+    missing = [p for p, size in zip(paths, sizes) if size is None]
+    return found, missing
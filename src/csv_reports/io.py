@@ -2,67 +2,316 @@
 """
 Чтение и валидация CSV-файлов стандартной библиотекой.
 
-Функция read_csv_files(paths) объединяет данные со всех переданных путей,
+Функция iter_csv_rows(paths) лениво отдаёт строки со всех переданных путей по одной,
 валидирует наличие обязательных колонок и приводит типы к контракту EmployeeRow.
+Память не зависит от размера входа: в каждый момент времени в памяти одна строка.
+
+Функция read_csv_files(paths) — обёртка для небольших входов, собирающая всё в список;
+read_csv_table(paths) собирает данные в компактную колоночную EmployeeTable.
+
+Обе функции принимают columns — проекцию колонок: заголовок по-прежнему проверяется
+на все REQUIRED_COLUMNS, но значения разбираются и приводятся только для запрошенных
+колонок, по индексам полей csv.reader, без промежуточного словаря на строку.
+
+Сжатые файлы (gzip, bz2, xz, zstd) распознаются по сигнатуре и распаковываются
+потоково (см. compression.py).
+
+Параметр where (filters.RowFilter) отбирает строки прямо при разборе: сначала
+приводятся к типам только колонки фильтра, остальные — лишь у прошедших его строк.
+Строки из кэша фильтруются по колонкам таблицы (RowFilter.select).
+
+Параметр rejects (rejects.RejectSink, --on-error skip|quarantine): строка с некорректным
+значением не прерывает чтение, а передаётся в сток с файлом и номером строки.
+Функция приведения вызывает сток только в ветке обработки исключения. Со стоком строки
+по-прежнему разбираются с проекцией, а незапрошенные колонки лишь дёшево проверяются
+(число полей, разбор чисел) — какие строки отклонены, не зависит от проекции, фильтра
+и кэша. Файл с отклонёнными строками не кэшируется.
 """
 from __future__ import annotations
 
 import csv
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
+from . import compression, stats
 from .errors import DataReadError, ValidationError
-from .models import EmployeeRow
-
-__all__ = ["read_csv_files"]
-
-REQUIRED_COLUMNS: set[str] = {
-    "name",
-    "position",
-    "completed_tasks",
-    "performance",
-    "skills",
-    "team",
-    "experience_years",
-}
+from .models import EMPLOYEE_COLUMNS, NUMERIC_TYPECODES, EmployeeRow, EmployeeTable
+
+if TYPE_CHECKING:
+    from .cache import ParsedFileCache
+    from .filters import RowFilter
+    from .rejects import RejectSink
+
+__all__ = [
+    "iter_csv_rows",
+    "iter_csv_batches",
+    "read_csv_files",
+    "read_csv_table",
+    "read_errors",
+    "row_builder",
+    "parse_records",
+    "validate_header",
+    "RowBuilder",
+]
+
+REQUIRED_COLUMNS: set[str] = set(EMPLOYEE_COLUMNS)
+
+
+# Размер словаря значений одной категориальной колонки (см. _categorical)
+CATEGORY_CACHE_SIZE = 4096
 
 
 def _normalize_text(value: str) -> str:
     """Нормализация пробелов: обрезка по краям и схлопывание подряд идущих пробелов."""
-    return " ".join(value.strip().split())
+    # Быстрый путь: strip() без изменений возвращает тот же объект, а в печатаемой
+    # строке из пробельных символов бывает только обычный пробел
+    if value.strip() is value and value.isprintable() and "  " not in value:
+        return value
+    return " ".join(value.split())
 
 
-def _coerce_row(raw: dict[str, str]) -> EmployeeRow:
+def _categorical(size: int = CATEGORY_CACHE_SIZE) -> Callable[[str], str]:
     """
-    Приведение типов строки CSV к контракту EmployeeRow.
-    Предполагается, что колонки существуют и содержат валидные значения.
+    Нормализация для колонок с небольшим числом различных значений (position, team).
+
+    Словарь «исходное значение -> нормализованное» заменяет разбор поиском, а все
+    строки с одинаковым значением получают один и тот же объект str (в том числе
+    записанные с разными пробелами). Словарь ограничен size записями: после
+    заполнения новые значения нормализуются без запоминания.
     """
+    cache: dict[str, str] = {}
+    lookup = cache.get
+
+    def coerce(value: str) -> str:
+        text = lookup(value)
+        if text is None:
+            text = _normalize_text(value)
+            if len(cache) < size:
+                text = cache.setdefault(text, text)
+                cache[value] = text
+        return text
+
+    return coerce
+
+
+def _to_int(value: str) -> int:
+    # int() сам отбрасывает пробелы по краям; нормализация — только ради текста ошибки
     try:
-        name = _normalize_text(raw["name"])
-        position = _normalize_text(raw["position"])
-        skills = _normalize_text(raw["skills"])
-        team = _normalize_text(raw["team"])
-
-        completed_tasks = int(_normalize_text(raw["completed_tasks"]))
-        perf_str = _normalize_text(raw["performance"]).replace(",", ".")
-        performance = float(perf_str)
-
-        experience_years = int(_normalize_text(raw["experience_years"]))
-    except (KeyError, ValueError) as exc:
-        raise ValidationError(f"Некорректные значения полей: {exc}") from exc
-
-    return EmployeeRow(
-        name=name,
-        position=position,
-        completed_tasks=completed_tasks,
-        performance=performance,
-        skills=skills,
-        team=team,
-        experience_years=experience_years,
+        return int(value)
+    except ValueError:
+        return int(_normalize_text(value))
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value.replace(",", ".") if "," in value else value)
+    except ValueError:
+        return float(_normalize_text(value).replace(",", "."))
+
+
+# Функции приведения типов по колонкам контракта EmployeeRow
+_COERCERS: dict[str, Callable[[str], Any]] = {
+    "name": _normalize_text,
+    "position": _categorical(),
+    "completed_tasks": _to_int,
+    "performance": _to_float,
+    "skills": _normalize_text,
+    "team": _categorical(),
+    "experience_years": _to_int,
+}
+
+# None — строка отклонена фильтром (или передана в сток отклонённых строк)
+RowBuilder = Callable[[Sequence[str]], Optional[EmployeeRow]]
+# Обработчик некорректной записи: (поля, причина)
+BadRowHandler = Callable[[Sequence[str], str], None]
+
+
+def _resolve_columns(columns: Iterable[str] | None) -> tuple[str, ...]:
+    """Запрошенные колонки в каноническом порядке; None — все колонки."""
+    if columns is None:
+        return EMPLOYEE_COLUMNS
+    wanted = set(columns)
+    unknown = wanted.difference(EMPLOYEE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Неизвестные колонки: {', '.join(sorted(unknown))}")
+    return tuple(c for c in EMPLOYEE_COLUMNS if c in wanted)
+
+
+def _describe_bad_field(fields: Sequence[str], plan: Sequence[tuple[str, int, Any]]) -> str:
+    """Медленный путь: находит первое поле, которое не удалось привести к типу."""
+    for name, idx, coerce in plan:
+        if idx >= len(fields):
+            return f"в строке нет значения для колонки '{name}'"
+        try:
+            coerce(fields[idx])
+        except ValueError as exc:
+            return f"{name}: {exc}"
+    return "неизвестная ошибка"
+
+
+def row_builder(
+    header: Sequence[str],
+    columns: Iterable[str] | None = None,
+    where: RowFilter | None = None,
+    on_bad: BadRowHandler | None = None,
+) -> RowBuilder:
+    """
+    Строит функцию приведения списка полей csv.reader к EmployeeRow.
+
+    Индексы колонок вычисляются один раз по заголовку; для каждой строки
+    приводятся только запрошенные колонки (проекция). С фильтром where сначала
+    приводятся колонки фильтра: отклонённая строка даёт None, и остальные её поля
+    не разбираются (и не проверяются). В прошедших строках есть и колонки фильтра.
+
+    Некорректная запись — ValidationError, а с on_bad — вызов on_bad(поля, причина)
+    и None вместо строки. С on_bad проверяются все колонки записи, в том числе не
+    запрошенные и отброшенные фильтром: для них только число полей и разбор чисел
+    (текстовые колонки не бывают некорректными), без построения строки. Причина
+    берётся по первой некорректной колонке контракта, независимо от проекции.
+    """
+    positions = {name: idx for idx, name in enumerate(header)}
+    wanted = _resolve_columns(columns)
+    if where is not None:
+        wanted = _resolve_columns(where.columns.union(wanted))
+    plan = tuple((name, positions[name], _COERCERS[name]) for name in wanted)
+    full_plan = tuple((name, positions[name], _COERCERS[name]) for name in EMPLOYEE_COLUMNS)
+
+    def fail(fields: Sequence[str]) -> Optional[ValidationError]:
+        """Ошибка для записи; с on_bad запись передаётся обработчику, и ошибки нет."""
+        if on_bad is not None:
+            on_bad(fields, _describe_bad_field(fields, full_plan))
+            return None
+        return ValidationError(f"Некорректные значения полей: {_describe_bad_field(fields, plan)}")
+
+    if where is None:
+
+        def build(fields: Sequence[str]) -> Optional[EmployeeRow]:
+            try:
+                row = {name: coerce(fields[idx]) for name, idx, coerce in plan}
+                return row  # type: ignore[return-value]
+            except (IndexError, ValueError) as exc:
+                error = fail(fields)
+                if error is None:
+                    return None
+                raise error from exc
+
+        return build if on_bad is None else _checked(build, fail, full_plan, wanted)
+
+    head = tuple(step for step in plan if step[0] in where.columns)
+    rest = tuple(step for step in plan if step[0] not in where.columns)
+
+    def build_filtered(fields: Sequence[str]) -> Optional[EmployeeRow]:
+        try:
+            row = {name: coerce(fields[idx]) for name, idx, coerce in head}
+            if not where(row):
+                return None
+            for name, idx, coerce in rest:
+                row[name] = coerce(fields[idx])
+            return row  # type: ignore[return-value]
+        except (IndexError, ValueError) as exc:
+            error = fail(fields)
+            if error is None:
+                return None
+            raise error from exc
+
+    if on_bad is None:
+        return build_filtered
+    # Колонки после фильтра разбираются не у всех строк — их тоже нужно проверить
+    return _checked(build_filtered, fail, full_plan, where.columns)
+
+
+def _checked(
+    build: RowBuilder,
+    fail: Callable[[Sequence[str]], Any],
+    full_plan: Sequence[tuple[str, int, Any]],
+    coerced: Iterable[str],
+) -> RowBuilder:
+    """
+    build с предварительной дешёвой проверкой колонок, которые build разбирает
+    не у каждой записи (не входят в coerced): хватает ли полей и разбираются ли числа.
+    """
+    coerced = set(coerced)
+    width = max(idx for _, idx, _ in full_plan) + 1
+    checks = tuple(
+        (idx, coerce)
+        for name, idx, coerce in full_plan
+        if name in NUMERIC_TYPECODES and name not in coerced
     )
 
+    def build_checked(fields: Sequence[str]) -> Optional[EmployeeRow]:
+        try:
+            if len(fields) < width:
+                raise IndexError
+            for idx, coerce in checks:
+                value = fields[idx]
+                if not value.isdecimal():  # цифры без знака и пробелов — заведомо корректны
+                    coerce(value)
+        except (IndexError, ValueError):
+            fail(fields)
+            return None
+        return build(fields)
+
+    return build_checked
+
 
-def _validate_header(fieldnames: Iterable[str] | None, source: Path) -> None:
+def _build_rows(
+    records: Iterable[list[str]], build: RowBuilder, skips: bool
+) -> Iterator[EmployeeRow]:
+    """
+    Строки из записей csv.reader: пустые записи пропускаются; skips — build может
+    вернуть None (фильтр where или сток отклонённых строк), такие строки тоже пропускаются.
+    """
+    rows = map(build, filter(None, records))
+    if not skips:
+        return rows  # type: ignore[return-value]
+    return (row for row in rows if row is not None)
+
+
+def parse_records(
+    reader: Any,
+    header: Sequence[str],
+    columns: Iterable[str] | None,
+    where: RowFilter | None,
+    rejects: RejectSink | None,
+    source: Path,
+) -> Iterator[EmployeeRow]:
+    """
+    Строки из записей csv.reader (после заголовка): проекция columns, фильтр where,
+    некорректные записи — в rejects с номером строки (reader.line_num).
+
+    Приводятся только нужные колонки; со стоком остальные колонки записи дёшево
+    проверяются (см. row_builder), так что какие строки отклонены, не зависит
+    от набора отчётов, --where и кэша (при заполнении кэша разбираются все колонки).
+    """
+    if rejects is None:
+        return _build_rows(reader, row_builder(header, columns, where), where is not None)
+
+    def on_bad(fields: Sequence[str], reason: str) -> None:
+        rejects.reject(source, reader.line_num, fields, reason)
+
+    return _build_rows(reader, row_builder(header, columns, where, on_bad), skips=True)
+
+
+def validate_header(fieldnames: Iterable[str] | None, source: Path) -> None:
+    """
+    Проверяет заголовок файла source.
+
+    Raises
+    ------
+    ValidationError
+        Заголовка нет или в нём нет обязательных колонок (REQUIRED_COLUMNS).
+    """
     if not fieldnames:
         raise ValidationError(f"В файле {source} отсутствуют заголовки столбцов.")
     missing = REQUIRED_COLUMNS.difference(fieldnames)
@@ -72,14 +321,181 @@ def _validate_header(fieldnames: Iterable[str] | None, source: Path) -> None:
         )
 
 
-def read_csv_files(paths: List[Path]) -> list[EmployeeRow]:
+@contextmanager
+def read_errors(path: Path) -> Iterator[None]:
+    """Переводит ошибки ввода-вывода при чтении path в доменные исключения."""
+    try:
+        yield
+    except FileNotFoundError as exc:
+        raise DataReadError(f"Файл не найден: {path}") from exc
+    except UnicodeDecodeError as exc:
+        raise DataReadError(f"Ошибка декодирования файла {path}: ожидается UTF-8") from exc
+    except OSError as exc:
+        raise DataReadError(f"Ошибка чтения файла {path}: {exc}") from exc
+    except Exception as exc:
+        if not compression.is_stream_error(exc):
+            raise
+        raise DataReadError(f"Сжатый файл {path} повреждён или оборван: {exc}") from exc
+
+
+def _iter_file_rows(
+    path: Path,
+    columns: Iterable[str] | None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> Iterator[EmployeeRow]:
+    with compression.open_text(path) as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        validate_header(header, path)
+        yield from parse_records(reader, header, columns, where, rejects, path)
+
+
+def iter_csv_rows(
+    paths: Iterable[Path],
+    columns: Iterable[str] | None = None,
+    cache: ParsedFileCache | None = None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> Iterator[EmployeeRow]:
+    """
+    Лениво читает файлы по порядку и отдаёт нормализованные строки по одной.
+
+    Файл открывается только при переходе к нему, поэтому ошибки чтения и валидации
+    возникают в момент потребления соответствующих строк.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        Пути к CSV-файлам.
+    columns : Iterable[str] | None
+        Колонки, которые нужно разобрать; None — все колонки EmployeeRow.
+    cache : ParsedFileCache | None
+        Кэш разобранных файлов: при попадании CSV не разбирается, при промахе файл
+        разбирается целиком (все колонки) и сохраняется в кэш.
+    where : RowFilter | None
+        Фильтр строк (filters.compile_filter); None — все строки.
+    rejects : RejectSink | None
+        Сток некорректных строк; None — первая такая строка вызывает ValidationError.
+
+    Yields
+    ------
+    EmployeeRow
+        Нормализованная строка данных.
+
+    Raises
+    ------
+    DataReadError
+        Проблемы с чтением файлов (I/O, кодировка).
+    ValidationError
+        Нарушение схемы — отсутствие колонок или неверные значения
+        (с rejects — превышен порог max_errors).
+    """
+    for batch in iter_csv_batches(paths, columns, cache, where, rejects):
+        if isinstance(batch, EmployeeTable):
+            yield from batch.iter_rows(columns)
+        else:
+            yield from batch
+
+
+def _no_new_rejects(rejects: RejectSink) -> Callable[[], bool]:
+    """Проверка «с этого момента строки не отклонялись»."""
+    seen = rejects.seen
+    return lambda: rejects.seen == seen
+
+
+def _guarded(path: Path, rows: Iterator[EmployeeRow]) -> Iterator[EmployeeRow]:
+    with read_errors(path):
+        yield from rows
+
+
+def iter_csv_batches(
+    paths: Iterable[Path],
+    columns: Iterable[str] | None = None,
+    cache: ParsedFileCache | None = None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> Iterator[Union[EmployeeTable, Iterator[EmployeeRow]]]:
+    """
+    По одному пакету на файл: EmployeeTable, если файл взят из кэша целиком,
+    иначе ленивый итератор строк (с проекцией columns).
+
+    Пакеты нужно потреблять по порядку: итератор строк файла следует исчерпать
+    до запроса следующего пакета (при промахе кэша запись сохраняется в его конце).
+    Параметры и исключения — как у iter_csv_rows().
+    """
+    for path in paths:
+        if cache is None:
+            rows = _iter_file_rows(path, columns, where, rejects)
+            yield stats.track_rows(_guarded(path, rows), path, "csv")
+            continue
+
+        with read_errors(path), stats.stage("cache.load"):
+            meta = cache.fingerprint(path)
+            table = cache.load(path, meta)
+        if table is not None:
+            stats.record_file(path, "cache", len(table), meta["size"])
+            yield table if where is None else where.select(table)
+            continue
+        parsed = _iter_file_rows(path, None, rejects=rejects)
+        # Файл с отклонёнными строками не кэшируется: иначе режим fail их бы не увидел
+        complete = None if rejects is None else _no_new_rejects(rejects)
+        if where is None:
+            rows = cache.capture(path, parsed, meta, columns, complete)
+        else:
+            # В кэш попадают все строки файла, дальше идут только прошедшие фильтр
+            wanted = where.columns.union(_resolve_columns(columns))
+            rows = filter(where, cache.capture(path, parsed, meta, wanted, complete))
+        yield stats.track_rows(_guarded(path, rows), path, "csv", meta["size"])
+
+
+def read_csv_table(
+    paths: Iterable[Path],
+    columns: Iterable[str] | None = None,
+    cache: ParsedFileCache | None = None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> EmployeeTable:
+    """
+    Считывает все файлы в компактную колоночную таблицу EmployeeTable.
+
+    Память — несколько десятков байт на строку плюс уникальные строки, вместо
+    полноценного словаря на каждую строку у read_csv_files().
+    Параметры и исключения — как у iter_csv_rows().
+    """
+    table = EmployeeTable(columns)
+    for batch in iter_csv_batches(paths, columns, cache, where, rejects):
+        if isinstance(batch, EmployeeTable):
+            table.extend_table(batch)
+        else:
+            table.extend(batch)
+    return table
+
+
+def read_csv_files(
+    paths: List[Path],
+    columns: Iterable[str] | None = None,
+    cache: ParsedFileCache | None = None,
+    where: RowFilter | None = None,
+    rejects: RejectSink | None = None,
+) -> list[EmployeeRow]:
     """
     Считывает все файлы целиком в память и возвращает объединённый список строк.
 
+    Подходит для небольших входов; для больших используйте iter_csv_rows().
+
     Parameters
     ----------
     paths : list[Path]
         Пути к CSV-файлам.
+    columns : Iterable[str] | None
+        Колонки, которые нужно разобрать; None — все колонки EmployeeRow.
+    cache : ParsedFileCache | None
+        Кэш разобранных файлов (см. iter_csv_rows).
+    where : RowFilter | None
+        Фильтр строк; None — все строки.
+    rejects : RejectSink | None
+        Сток некорректных строк (см. iter_csv_rows).
 
     Returns
     -------
@@ -93,22 +509,4 @@ def read_csv_files(paths: List[Path]) -> list[EmployeeRow]:
     ValidationError
         Нарушение схемы — отсутствие колонок или неверные значения.
     """
-    rows: list[EmployeeRow] = []
-
-    for path in paths:
-        try:
-            with path.open("r", encoding="utf-8", newline="") as fh:
-                reader = csv.DictReader(fh)
-                _validate_header(reader.fieldnames, path)
-
-                for raw in reader:
-                    rows.append(_coerce_row(raw))
-
-        except FileNotFoundError as exc:
-            raise DataReadError(f"Файл не найден: {path}") from exc
-        except UnicodeDecodeError as exc:
-            raise DataReadError(f"Ошибка декодирования файла {path}: ожидается UTF-8") from exc
-        except OSError as exc:
-            raise DataReadError(f"Ошибка чтения файла {path}: {exc}") from exc
-
-    return rows
+    return list(iter_csv_rows(paths, columns, cache, where, rejects))
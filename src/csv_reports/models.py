@@ -3,13 +3,27 @@
 Типы и модели данных для пакета csv_reports.
 
 После чтения CSV все строки приводятся к этому контракту.
+
+EmployeeRow — строка-словарь; EmployeeTable — компактное колоночное представление
+того же набора данных для больших объёмов.
 """
 from __future__ import annotations
 
-from typing import TypedDict
+from array import array
+from typing import Any, Iterable, Iterator, Sequence, TypedDict, Union
 
+__all__ = ["EmployeeRow", "EmployeeTable", "DictionaryColumn", "EMPLOYEE_COLUMNS"]
 
-__all__ = ["EmployeeRow"]
+# Колонки входного CSV в каноническом порядке
+EMPLOYEE_COLUMNS: tuple[str, ...] = (
+    "name",
+    "position",
+    "completed_tasks",
+    "performance",
+    "skills",
+    "team",
+    "experience_years",
+)
 
 
 class EmployeeRow(TypedDict):
@@ -24,6 +38,9 @@ class EmployeeRow(TypedDict):
     - skills: Список навыков в виде строки.
     - team: Команда/подразделение.
     - experience_years: Количество лет опыта.
+
+    При чтении с проекцией колонок (см. Report.columns) строка содержит
+    только запрошенные ключи.
     """
     name: str
     position: str
@@ -32,3 +49,176 @@ class EmployeeRow(TypedDict):
     skills: str
     team: str
     experience_years: int
+
+
+# Числовые колонки и typecode их массивов; остальные колонки кодируются словарём
+NUMERIC_TYPECODES: dict[str, str] = {
+    "completed_tasks": "q",
+    "performance": "d",
+    "experience_years": "q",
+}
+CODE_TYPECODE = "I"
+
+
+class DictionaryColumn:
+    """
+    Строковая колонка со словарным кодированием.
+
+    values — уникальные значения в порядке первого появления, codes — array('I')
+    индексов в values. Одинаковые строки хранятся один раз, что особенно выгодно
+    для колонок с низкой кардинальностью (position, team).
+    """
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self, values: list[str] | None = None, codes: array | None = None) -> None:
+        self.values: list[str] = values if values is not None else []
+        self.codes: array = codes if codes is not None else array(CODE_TYPECODE)
+        self._lookup: dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value: str) -> int:
+        """Код значения; новое значение добавляется в словарь."""
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.encode(value))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[self.codes[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.values.__getitem__, self.codes)
+
+
+Column = Union[array, DictionaryColumn]
+
+
+class EmployeeTable:
+    """
+    Колоночный набор строк EmployeeRow.
+
+    Числовые колонки хранятся в array('q') / array('d'), строковые — в DictionaryColumn.
+    Таблица может содержать только часть колонок (проекция): columns задаёт их состав.
+    Отчёты могут читать колонки напрямую (Report.update_table), не создавая словарь
+    на каждую строку.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns: Iterable[str] | None = None) -> None:
+        wanted = EMPLOYEE_COLUMNS if columns is None else set(columns)
+        self._columns: dict[str, Column] = {
+            name: array(NUMERIC_TYPECODES[name]) if name in NUMERIC_TYPECODES
+            else DictionaryColumn()
+            for name in EMPLOYEE_COLUMNS
+            if name in wanted
+        }
+        self._length = 0
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[EmployeeRow], columns: Iterable[str] | None = None
+    ) -> "EmployeeTable":
+        table = cls(columns)
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Column]) -> "EmployeeTable":
+        """Собирает таблицу из готовых колонок одинаковой длины."""
+        lengths = {len(col) for col in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Колонки таблицы должны иметь одинаковую длину")
+        table = cls(columns)
+        table._columns = {name: columns[name] for name in table._columns}
+        table._length = lengths.pop() if lengths else 0
+        return table
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    def column(self, name: str) -> Column:
+        """Колонка по имени: array для чисел, DictionaryColumn для строк."""
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, row: EmployeeRow) -> None:
+        for name, col in self._columns.items():
+            col.append(row[name])  # type: ignore[literal-required]
+        self._length += 1
+
+    def extend(self, rows: Iterable[EmployeeRow]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def extend_table(self, other: "EmployeeTable") -> None:
+        """Дописывает строки другой таблицы (коды словарей перекодируются)."""
+        for name, col in self._columns.items():
+            src = other.column(name)
+            if isinstance(col, DictionaryColumn):
+                remap = [col.encode(v) for v in src.values]  # type: ignore[union-attr]
+                col.codes.extend(remap[c] for c in src.codes)  # type: ignore[union-attr]
+            else:
+                col.extend(src)  # type: ignore[arg-type]
+        self._length += len(other)
+
+    def take(self, indices: Sequence[int]) -> "EmployeeTable":
+        """
+        Новая таблица из строк с номерами indices (в их порядке).
+
+        Словари строковых колонок перестраиваются: в них остаются только встреченные
+        значения в порядке первого появления, как при чтении тех же строк из CSV.
+        """
+        columns: dict[str, Column] = {}
+        for name, col in self._columns.items():
+            if isinstance(col, DictionaryColumn):
+                remap: dict[int, int] = {}
+                picked = map(col.codes.__getitem__, indices)
+                codes = array(CODE_TYPECODE, [remap.setdefault(c, len(remap)) for c in picked])
+                columns[name] = DictionaryColumn([col.values[c] for c in remap], codes)
+            else:
+                columns[name] = array(col.typecode, map(col.__getitem__, indices))
+        return EmployeeTable.from_columns(columns)
+
+    def iter_rows(self, columns: Iterable[str] | None = None) -> Iterator[EmployeeRow]:
+        """Строки-словари (с проекцией columns) — для отчётов без колоночного пути."""
+        wanted = None if columns is None else set(columns)
+        names = [n for n in self._columns if wanted is None or n in wanted]
+        if not names:
+            for _ in range(self._length):
+                yield {}  # type: ignore[misc]
+            return
+        for fields in zip(*(iter(self._columns[n]) for n in names)):
+            yield dict(zip(names, fields))  # type: ignore[misc]
+
+    def __iter__(self) -> Iterator[EmployeeRow]:
+        return self.iter_rows()
+
+    def nbytes(self) -> int:
+        """Приблизительный объём данных колонок в байтах (без служебных объектов Python)."""
+        total = 0
+        for col in self._columns.values():
+            if isinstance(col, DictionaryColumn):
+                total += col.codes.itemsize * len(col.codes)
+                total += sum(len(v.encode("utf-8")) for v in col.values)
+            else:
+                total += col.itemsize * len(col)
+        return total
+
+    def __repr__(self) -> str:
+        return f"EmployeeTable(rows={self._length}, columns={list(self._columns)})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EmployeeTable):
+            return NotImplemented
+        return self.columns == other.columns and list(self) == list(other)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Форматы вывода результатов отчётов.
+
+- "table": GitHub-таблица (render.write_table) — для человека в консоли;
+- "csv":   заголовок + строки, csv.writer (только один отчёт за запуск);
+- "jsonl": по JSON-объекту на строку отчёта;
+- "json":  массив объектов; для нескольких отчётов — объект {имя отчёта: массив}.
+
+Все писатели потоковые: каждая строка отчёта форматируется и сразу пишется в out,
+без сборки всего вывода в одну строку.
+
+Форматирование значений задаётся по формату (CELL_FORMATS): в table и csv
+performance и дробные значения остальных колонок (агрегаты --group-by) печатаются
+строкой с двумя знаками, в JSON остаются числами, округлёнными до двух знаков.
+Писатели принимают cell_formats для переопределения.
+NaN и ±inf (например, mean по данным с inf) в JSON недопустимы и пишутся как null.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+from contextlib import nullcontext
+from typing import IO, Any, Iterable, Mapping, Optional, Sequence
+
+from . import stats
+from .errors import InvalidArguments
+from .render import (
+    ANY_COLUMN,
+    TABLE_CELL_FORMATS,
+    CellFormats,
+    column_formats,
+    float_two_decimals,
+    two_decimals,
+    write_table,
+)
+
+__all__ = [
+    "FORMATS",
+    "CELL_FORMATS",
+    "write_csv",
+    "write_jsonl",
+    "write_json",
+    "write_results",
+    "round_two",
+]
+
+FORMATS: tuple[str, ...] = ("table", "csv", "jsonl", "json")
+
+# (имя отчёта, заголовки, строки) — как service.ReportResult
+Result = tuple[str, Sequence[str], Sequence[Mapping[str, Any]]]
+
+
+def round_two(value: Any) -> Any:
+    """Число -> число, округлённое до двух знаков; прочие значения без изменений."""
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+CELL_FORMATS: dict[str, CellFormats] = {
+    "table": TABLE_CELL_FORMATS,
+    "csv": {"performance": two_decimals, ANY_COLUMN: float_two_decimals},
+    "jsonl": {ANY_COLUMN: round_two},
+    "json": {ANY_COLUMN: round_two},
+}
+
+
+def _record(row: Mapping[str, Any], columns: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {h: row.get(h) if fmt is None else fmt(row.get(h)) for h, fmt in columns}
+
+
+def _json_value(value: Any) -> Any:
+    """NaN и ±inf -> None: стандарт JSON их не допускает, json.dumps писал бы NaN/Infinity."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _json_record(row: Mapping[str, Any], columns: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {h: _json_value(value) for h, value in _record(row, columns).items()}
+
+
+def write_csv(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    out: IO[str],
+    cell_formats: Optional[CellFormats] = None,
+) -> None:
+    """CSV с заголовком; отсутствующие значения — пустые поля."""
+    formats = CELL_FORMATS["csv"] if cell_formats is None else cell_formats
+    columns = column_formats(headers, formats)
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(
+            [row.get(h, "") if fmt is None else fmt(row.get(h, "")) for h, fmt in columns]
+        )
+
+
+def write_jsonl(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    out: IO[str],
+    cell_formats: Optional[CellFormats] = None,
+    extra: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """По JSON-объекту на строку; extra добавляется в начало каждого объекта."""
+    formats = CELL_FORMATS["jsonl"] if cell_formats is None else cell_formats
+    columns = column_formats(headers, formats)
+    dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False).encode
+    prefix = dict(extra or {})
+    for row in rows:
+        out.write(dumps({**prefix, **_json_record(row, columns)}))
+        out.write("\n")
+
+
+def _write_json_array(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    out: IO[str],
+    cell_formats: CellFormats,
+    indent: str,
+) -> None:
+    columns = column_formats(headers, cell_formats)
+    dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False).encode
+    out.write("[")
+    separator = "\n"
+    for row in rows:
+        out.write(separator + indent + "  " + dumps(_json_record(row, columns)))
+        separator = ",\n"
+    out.write("\n" + indent + "]" if separator != "\n" else "]")
+
+
+def write_json(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    out: IO[str],
+    cell_formats: Optional[CellFormats] = None,
+) -> None:
+    """JSON-массив объектов, по объекту на строке."""
+    formats = CELL_FORMATS["json"] if cell_formats is None else cell_formats
+    _write_json_array(headers, rows, out, formats, "")
+    out.write("\n")
+
+
+def write_results(
+    results: Sequence[Result],
+    out: IO[str],
+    fmt: str = "table",
+    sample_rows: Optional[int] = None,
+    cell_formats: Optional[CellFormats] = None,
+) -> None:
+    """
+    Пишет результаты одного или нескольких отчётов в выбранном формате.
+
+    Parameters
+    ----------
+    results : Sequence[tuple[str, Sequence[str], Sequence[Mapping]]]
+        Результаты отчётов (имя, заголовки, строки), как из service.build_reports().
+    out : IO[str]
+        Текстовый поток вывода.
+    fmt : str
+        Один из FORMATS.
+    sample_rows : int | None
+        Для "table": ширины колонок по первым sample_rows строкам.
+    cell_formats : CellFormats | None
+        Форматирование значений; None — CELL_FORMATS[fmt].
+
+    Raises
+    ------
+    InvalidArguments
+        Неизвестный формат или несколько отчётов в формате csv.
+
+    Notes
+    -----
+    В формате table пустые результаты пропускаются (сообщение о них печатает CLI);
+    при нескольких отчётах каждая таблица идёт под заголовком "## имя".
+    В машиночитаемых форматах пустой результат даёт корректный пустой вывод;
+    при нескольких отчётах jsonl добавляет поле "report", а json — объект по именам.
+    """
+    if fmt not in FORMATS:
+        raise InvalidArguments(f"Неизвестный формат вывода '{fmt}'")
+    formats = CELL_FORMATS[fmt] if cell_formats is None else cell_formats
+    multiple = len(results) > 1
+
+    # Таблица замеряет стадию "render" сама (render.write_table)
+    with stats.stage("render") if fmt != "table" else nullcontext():
+        if fmt == "table":
+            printed = 0
+            for name, headers, rows in results:
+                if not rows:
+                    continue
+                if multiple:
+                    # Несколько отчётов: каждая таблица под своим заголовком
+                    out.write(f"\n## {name}\n\n" if printed else f"## {name}\n\n")
+                write_table(headers, rows, out, sample_rows=sample_rows, cell_formats=formats)
+                printed += 1
+        elif fmt == "csv":
+            if multiple:
+                raise InvalidArguments(
+                    "Формат csv поддерживает один отчёт; используйте jsonl или json"
+                )
+            [(_, headers, rows)] = results
+            write_csv(headers, rows, out, formats)
+        elif fmt == "jsonl":
+            for name, headers, rows in results:
+                write_jsonl(headers, rows, out, formats, {"report": name} if multiple else None)
+        elif not multiple:
+            [(_, headers, rows)] = results
+            write_json(headers, rows, out, formats)
+        else:
+            out.write("{")
+            for i, (name, headers, rows) in enumerate(results):
+                out.write(("," if i else "") + "\n  " + json.dumps(name, ensure_ascii=False) + ": ")
+                _write_json_array(headers, rows, out, formats, "  ")
+            out.write("\n}\n")
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Параллельный расчёт отчёта по нескольким файлам.
+
+Каждый файл разбирается и предварительно агрегируется в отдельном процессе; родителю
+возвращается только небольшое частичное состояние отчёта (не строки). Частичные
+состояния сливаются в порядке файлов, поэтому результат, включая порядок при равных
+значениях, совпадает с последовательным проходом.
+
+Файлы крупнее min_chunk_bytes дополнительно делятся на байтовые фрагменты
+(см. chunking.split_csv), так что параллелизм работает и для одного большого файла.
+Кэш разобранных файлов работает на уровне целых файлов: файл с актуальной записью
+в кэше читается одним заданием, а фрагменты больших файлов кэш не заполняют.
+Сжатые файлы на фрагменты не делятся (смещения в сжатом потоке не соответствуют
+границам записей) и тоже читаются одним заданием каждый.
+
+Задания отправляются в пул от больших к меньшим (по размеру в байтах), чтобы крупный
+файл не оказался последним и не держал остальные процессы без работы; слияние при этом
+идёт в исходном порядке заданий, по мере готовности очередного результата.
+
+С удалением повторов (dedupe.Deduplicator) файлы читаются последовательно в текущем
+процессе: решение «повтор или нет» зависит от всех предыдущих строк.
+
+Некорректные строки (rejects.RejectSink) рабочие процессы пишут в собственные
+файлы-части; родитель вливает их в порядке заданий, как и частичные состояния,
+поэтому файл отклонённых строк совпадает с последовательным проходом.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, Optional, Union
+
+from . import compression, stats
+from .cache import ParsedFileCache
+from .chunking import CsvChunk, iter_chunk_rows, lines_before, split_csv
+from .io import iter_csv_batches, read_errors
+from .models import EmployeeRow, EmployeeTable
+from .reports.base import Report
+
+if TYPE_CHECKING:
+    from .dedupe import Deduplicator
+    from .filters import RowFilter
+    from .rejects import RejectSink
+
+__all__ = ["aggregate_files", "resolve_jobs", "MIN_CHUNK_BYTES"]
+
+# Файлы меньше этого размера обрабатываются одним заданием целиком
+MIN_CHUNK_BYTES = 64 * 1024 * 1024
+
+Task = Union[Path, CsvChunk]
+Batch = Union[EmployeeTable, Iterator[EmployeeRow]]
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Число процессов: 0 означает «по числу CPU»."""
+    if jobs < 0:
+        raise ValueError("Число процессов не может быть отрицательным")
+    return jobs or os.cpu_count() or 1
+
+
+def _consume_files(
+    report: Report,
+    state: Any,
+    files: list[Path],
+    cache: Optional[ParsedFileCache],
+    where: Optional[RowFilter] = None,
+    rejects: Optional[RejectSink] = None,
+) -> Any:
+    """Учитывает файлы в состоянии; таблицы из кэша идут по колоночному пути отчёта."""
+    batches = iter_csv_batches(files, report.columns, cache, where, rejects)
+    return _consume_batches(report, state, batches)
+
+
+def _consume_batches(report: Report, state: Any, batches: Iterator[Batch]) -> Any:
+    while True:
+        with stats.stage("read"):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        # Строки потоковой порции разбираются здесь, но это время уходит в "read.parse"
+        with stats.stage("report.update"):
+            if isinstance(batch, EmployeeTable):
+                state = report.update_table(state, batch)
+            else:
+                state = report.update_batch(state, batch)
+    return state
+
+
+def _aggregate_deduplicated(
+    report: Report,
+    files: list[Path],
+    cache: Optional[ParsedFileCache],
+    where: Optional[RowFilter],
+    dedupe: Deduplicator,
+    rejects: Optional[RejectSink] = None,
+) -> Any:
+    """
+    Состояние отчёта без повторяющихся записей (см. dedupe.py).
+
+    Некорректные строки учитываются один раз: проход индекса пропускает их молча
+    (набор отклонённых строк не зависит от проекции, поэтому это те же строки,
+    что и в проходе отчёта), а прерванный однопроходный режим «отматывает» уже учтённые.
+    """
+    from .dedupe import IndexOverflow
+
+    columns = report.columns.union(dedupe.columns)
+    if dedupe.keep == "first":
+        try:
+            batches = dedupe.first_pass(iter_csv_batches(files, columns, cache, where, rejects))
+            return _consume_batches(report, report.create_state(), batches)
+        except IndexOverflow:
+            # Ключей больше бюджета памяти: двухпроходная схема с разделами на диске
+            if rejects is not None:
+                rejects.rewind()
+    with stats.stage("dedupe.index"):
+        silent = rejects.silent() if rejects is not None else None
+        index = dedupe.index(iter_csv_batches(files, dedupe.columns, cache, where, silent))
+    with index:
+        batches = dedupe.skip(
+            iter_csv_batches(files, columns, cache, where, rejects), index.dropped()
+        )
+        return _consume_batches(report, report.create_state(), batches)
+
+
+def _run_task(
+    report: Report,
+    cache: Optional[ParsedFileCache],
+    where: Optional[RowFilter],
+    rejects: Optional[RejectSink],
+    task: Task,
+) -> Any:
+    if isinstance(task, CsvChunk):
+        rows = iter_chunk_rows(task, report.columns, where, rejects)
+        rows = stats.track_rows(rows, task.path, "chunk", task.end - task.start)
+        with stats.stage("report.update"):
+            return report.update_batch(report.create_state(), rows)
+    return _consume_files(report, report.create_state(), [task], cache, where, rejects)
+
+
+# Отклонённые строки задания: (число, файл-часть или None)
+Rejected = Optional[tuple[int, Optional[str]]]
+
+
+def _aggregate_task(
+    report: Report,
+    cache: Optional[ParsedFileCache],
+    where: Optional[RowFilter],
+    rejects: Optional[RejectSink],
+    collect_stats: bool,
+    task: Task,
+) -> tuple[Any, Optional[stats.RunStats], Rejected]:
+    """
+    Рабочая функция: частичное состояние отчёта по файлу или его фрагменту,
+    статистика и отклонённые строки.
+    """
+    with ExitStack() as stack:
+        task_stats = stack.enter_context(stats.collect()) if collect_stats else None
+        if rejects is not None:
+            stack.enter_context(rejects)
+        partial = _run_task(report, cache, where, rejects, task)
+    rejected = None if rejects is None else (rejects.count, rejects.part)
+    return partial, task_stats, rejected
+
+
+def _plan_tasks(
+    files: list[Path],
+    jobs: int,
+    min_chunk_bytes: int,
+    pool: ProcessPoolExecutor,
+    cache: Optional[ParsedFileCache],
+    sizes: Optional[Mapping[Path, int]] = None,
+) -> list[tuple[Task, int]]:
+    """
+    Задания (с размером в байтах) в порядке файлов и фрагментов;
+    крупные некэшированные файлы делятся на части.
+    """
+    tasks: list[tuple[Task, int]] = []
+    for path in files:
+        with read_errors(path):
+            size = sizes.get(path) if sizes is not None else None
+            if size is None:
+                size = path.stat().st_size
+            parts = min(jobs, size // max(min_chunk_bytes, 1))
+            splittable = parts > 1 and compression.detect(path) is None
+        if splittable and not (cache is not None and cache.is_fresh(path)):
+            tasks.extend((chunk, chunk.end - chunk.start) for chunk in split_csv(path, parts, pool))
+        else:
+            tasks.append((path, size))
+    return tasks
+
+
+def aggregate_files(
+    report: Report,
+    files: list[Path],
+    jobs: int = 1,
+    min_chunk_bytes: int = MIN_CHUNK_BYTES,
+    cache: Optional[ParsedFileCache] = None,
+    sizes: Optional[Mapping[Path, int]] = None,
+    where: Optional[RowFilter] = None,
+    dedupe: Optional[Deduplicator] = None,
+    rejects: Optional[RejectSink] = None,
+) -> Any:
+    """
+    Возвращает состояние отчёта по всем файлам.
+
+    Parameters
+    ----------
+    report : Report
+        Экземпляр отчёта (передаётся в рабочие процессы через pickle).
+    files : list[Path]
+        Пути к CSV-файлам.
+    jobs : int
+        Число процессов; 1 — последовательный потоковый проход в текущем процессе.
+    min_chunk_bytes : int
+        Минимальный размер фрагмента при делении одного файла между процессами.
+    cache : ParsedFileCache | None
+        Кэш разобранных файлов; None — всегда разбирать CSV.
+    sizes : Mapping[Path, int] | None
+        Уже известные размеры файлов (например, из inputs.discover), чтобы
+        не вызывать stat() повторно; отсутствующие размеры запрашиваются.
+    where : RowFilter | None
+        Фильтр строк, применяемый при разборе (в рабочих процессах — тоже).
+    dedupe : Deduplicator | None
+        Удаление повторяющихся записей между файлами; с ним jobs не используется.
+    rejects : RejectSink | None
+        Сток некорректных строк (--on-error skip|quarantine); None — первая такая
+        строка прерывает расчёт.
+
+    Raises
+    ------
+    DataReadError, ValidationError
+        Ошибка первого по порядку проблемного файла (или превышен порог rejects).
+    """
+    jobs = resolve_jobs(jobs)
+    if dedupe is not None:
+        return _aggregate_deduplicated(report, files, cache, where, dedupe, rejects)
+    if jobs <= 1 or not files:
+        return _consume_files(report, report.create_state(), files, cache, where, rejects)
+
+    state = report.create_state()
+    run_stats = stats.current()
+    collect_stats = run_stats is not None
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        tasks = _plan_tasks(files, jobs, min_chunk_bytes, pool, cache, sizes)
+        # Крупные задания — первыми; sorted устойчив, равные размеры идут в исходном порядке
+        worker_rejects = rejects.worker() if rejects is not None else None
+        futures: list[Any] = [None] * len(tasks)
+        for i in sorted(range(len(tasks)), key=lambda i: -tasks[i][1]):
+            futures[i] = pool.submit(
+                _aggregate_task, report, cache, where, worker_rejects, collect_stats, tasks[i][0]
+            )
+        merged = 0
+        try:
+            # Слияние в порядке заданий — результат детерминирован
+            for (task, _), future in zip(tasks, futures):
+                partial, task_stats, rejected = future.result()
+                merged += 1
+                if task_stats is not None and run_stats is not None:
+                    run_stats.merge(task_stats)
+                if rejected is not None:
+                    _absorb_rejects(rejects, task, *rejected)  # type: ignore[arg-type]
+                with stats.stage("report.merge"):
+                    state = report.merge(state, partial)
+        except BaseException:
+            # Ошибка в одном файле: оставшиеся в очереди задания не запускаем
+            pool.shutdown(cancel_futures=True)
+            _discard_rejects(futures[merged:])
+            raise
+    return state
+
+
+def _absorb_rejects(rejects: RejectSink, task: Task, count: int, part: Optional[str]) -> None:
+    """Вливает отклонённые строки задания; номера строк фрагмента — в номера строк файла."""
+    offset = lines_before(task) if part is not None and isinstance(task, CsvChunk) else 0
+    rejects.absorb(count, part, offset)
+
+
+def _discard_rejects(futures: list[Any]) -> None:
+    """Удаляет файлы-части заданий, чьи результаты не будут слиты (после ошибки)."""
+    from .spill import remove_runs
+
+    for future in futures:
+        if future.cancelled() or future.exception() is not None:
+            continue
+        rejected = future.result()[2]
+        if rejected is not None and rejected[1] is not None:
+            remove_runs([rejected[1]])
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Отклонённые строки при разборе (--on-error skip|quarantine, --max-errors).
+
+По умолчанию (режим "fail") первая строка с некорректным значением прерывает запуск
+с ValidationError. С RejectSink читатель вместо этого передаёт такую строку в сток
+(файл, номер строки, причина, исходные поля) и продолжает разбор:
+- "skip" — строки только считаются;
+- "quarantine" — ещё и записываются в файл отклонённых строк: CSV с колонками
+  file, line, reason, record (record — исходная запись одной строкой CSV) или JSONL
+  (если имя файла оканчивается на .jsonl / .ndjson) с полями file, line, reason, fields.
+Записи копятся в буфере и пишутся пакетами по _BUFFER строк.
+
+max_errors — порог: когда отклонённых строк становится больше, запуск прерывается
+с ValidationError (уже отклонённые строки остаются в файле).
+
+Корректные строки сток не замедляет: он вызывается только из ветки обработки
+исключения в функции приведения типов (io.row_builder).
+
+Рабочие процессы (--jobs) получают собственный сток (worker()): он пишет записи
+во временный файл-часть (пакеты pickle, как серии spill.py), а родитель вливает части
+в порядке заданий (absorb()), переводя номера строк фрагментов в номера строк файла.
+Файлы с отклонёнными строками в кэш разобранных файлов не попадают.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Callable, Optional, Sequence
+
+from . import spill, stats
+from .errors import InvalidArguments, ValidationError
+
+__all__ = ["ON_ERROR_MODES", "RejectSink"]
+
+ON_ERROR_MODES: tuple[str, ...] = ("fail", "skip", "quarantine")
+
+# Отклонённых строк в одном пакете записи
+_BUFFER = 1024
+_JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+# (файл, номер строки, причина, поля записи)
+Rejected = tuple[str, int, str, Sequence[str]]
+
+
+def _record_line(fields: Sequence[str]) -> str:
+    """Исходная запись одной строкой CSV."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(fields)
+    return buffer.getvalue()
+
+
+class RejectSink:
+    """
+    Учёт отклонённых строк: счётчик, порог max_errors и буферизованная запись в path.
+
+    Используется как контекстный менеджер: вход создаёт (перезаписывает) файл
+    отклонённых строк, выход дописывает буфер и закрывает файл.
+
+    Parameters
+    ----------
+    mode : str
+        "skip" или "quarantine".
+    max_errors : int | None
+        Сколько строк можно отклонить; больше — ValidationError. None — без порога.
+    path : Path | None
+        Файл отклонённых строк; обязателен для "quarantine".
+
+    Raises
+    ------
+    InvalidArguments
+        Неизвестный режим или "quarantine" без файла.
+    """
+
+    def __init__(
+        self, mode: str = "skip", max_errors: Optional[int] = None, path: Optional[Path] = None
+    ) -> None:
+        if mode not in ON_ERROR_MODES[1:]:
+            raise InvalidArguments(
+                f"Неизвестный режим обработки ошибок: {mode!r} (допустимо: skip, quarantine)"
+            )
+        if mode == "quarantine" and path is None:
+            raise InvalidArguments("Для режима quarantine нужен файл отклонённых строк")
+        self.mode = mode
+        self.max_errors = max_errors
+        self.path = path
+        self.count = 0  # учтённые отклонённые строки
+        self.seen = 0  # все отклонения, включая повторы после rewind()
+        self.part: Optional[str] = None  # файл-часть рабочего процесса
+        self._worker = False
+        self._silent = False
+        self._replay = 0
+        self._buffer: list[Rejected] = []
+        self._fh: Optional[IO[Any]] = None
+        self._write: Optional[Callable[[list[Rejected]], None]] = None
+
+    # --- варианты стока ---
+
+    def worker(self) -> RejectSink:
+        """Сток для рабочего процесса: тот же режим и порог, записи — в файл-часть."""
+        sink = RejectSink(self.mode, self.max_errors, self.path)
+        sink._worker = True
+        return sink
+
+    def silent(self) -> RejectSink:
+        """Сток, который только пропускает строки (вспомогательные проходы по тем же данным)."""
+        sink = RejectSink("skip")
+        sink._silent = True
+        return sink
+
+    def rewind(self) -> None:
+        """
+        Данные будут прочитаны заново с начала: первые count отклонений следующего
+        прохода уже учтены и повторно не записываются.
+        """
+        self._replay = self.count
+
+    # --- запись ---
+
+    def reject(self, source: Path | str, line: int, fields: Sequence[str], reason: str) -> None:
+        """
+        Учитывает отклонённую строку line файла source.
+
+        Raises
+        ------
+        ValidationError
+            Отклонённых строк стало больше max_errors.
+        """
+        self.seen += 1
+        if self._silent:
+            return
+        if self._replay:
+            self._replay -= 1
+            return
+        stats.record_error(source)
+        self._add((str(source), line, reason, list(fields)))
+
+    def absorb(self, count: int, part: Optional[str], line_offset: int = 0) -> None:
+        """
+        Вливает результат рабочего процесса: count отклонений и файл-часть part
+        (номера строк в нём сдвигаются на line_offset); part удаляется.
+        """
+        if part is None:
+            self.count += count
+            self._check(None)
+            return
+        try:
+            for source, line, reason, fields in spill.read_run(part):
+                self._add((source, line + line_offset, reason, fields))
+        finally:
+            spill.remove_runs([part])
+
+    def _add(self, record: Rejected) -> None:
+        self.count += 1
+        if self.mode == "quarantine":
+            self._buffer.append(record)
+            if len(self._buffer) >= _BUFFER:
+                self.flush()
+        self._check(record)
+
+    def _check(self, record: Optional[Rejected]) -> None:
+        if self.max_errors is None or self.count <= self.max_errors:
+            return
+        last = ""
+        if record is not None:
+            last = f"; последняя — {record[0]}, строка {record[1]}: {record[2]}"
+        raise ValidationError(
+            f"Некорректных строк больше порога max_errors={self.max_errors}{last}"
+        )
+
+    def flush(self) -> None:
+        """Дописывает накопленные записи."""
+        if not self._buffer:
+            return
+        if self._write is None:
+            self._open()
+        assert self._write is not None
+        self._write(self._buffer)
+        self._buffer = []
+
+    def _open(self) -> None:
+        if self._worker:
+            fd, self.part = tempfile.mkstemp(prefix="csv-reports-rejects-", suffix=".pickle")
+            fh: IO[Any] = os.fdopen(fd, "wb")
+            self._write = lambda batch: pickle.dump(batch, fh, pickle.HIGHEST_PROTOCOL)
+        elif self.path is not None and self.path.suffix.lower() in _JSONL_SUFFIXES:
+            fh = self.path.open("w", encoding="utf-8")
+
+            def write(batch: list[Rejected]) -> None:
+                fh.writelines(
+                    json.dumps(
+                        {"file": source, "line": line, "reason": reason, "fields": list(fields)},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                    for source, line, reason, fields in batch
+                )
+
+            self._write = write
+        else:
+            assert self.path is not None
+            fh = self.path.open("w", encoding="utf-8", newline="")
+            writer = csv.writer(fh)
+            writer.writerow(["file", "line", "reason", "record"])
+            self._write = lambda batch: writer.writerows(
+                (source, line, reason, _record_line(fields))
+                for source, line, reason, fields in batch
+            )
+        self._fh = fh
+
+    def close(self) -> None:
+        """Дописывает буфер и закрывает файл."""
+        try:
+            self.flush()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> RejectSink:
+        if self.mode == "quarantine" and not self._worker:
+            self._open()  # файл прошлого запуска не должен остаться, даже если ошибок нет
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self.close()
+        if exc_type is not None and self.part is not None:
+            spill.remove_runs([self.part])
+            self.part = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # В рабочий процесс передаётся только настройка (открытых файлов ещё нет)
+        state = dict(self.__dict__)
+        state.update(_fh=None, _write=None, _buffer=[])
+        return state
@@ -2,38 +2,262 @@
 """
 Единая точка форматирования табличного вывода.
 
-- Используется библиотека `tabulate`.
-- Числовое поле 'performance' форматируется как "{:.2f}".
+- Таблица в формате GitHub Markdown (как tabulate с tablefmt="github").
+- Поле 'performance' форматируется как "{:.2f}" и выравнивается вправо; дробные значения
+  прочих колонок (агрегаты --group-by: mean_*, sum_* ...) — тоже "{:.2f}" (ключ "*"
+  в TABLE_CELL_FORMATS). Колонки, где все непустые значения — числа, выравниваются вправо.
+
+Рендер встроенный: ширины колонок считаются одним проходом по строкам, затем строки
+пишутся прямо в поток, без промежуточного списка ячеек и без сборки всей таблицы
+в одну строку. Вывод побайтно совпадает с tabulate: значения обрезаются по краям,
+ширина колонки не меньше заголовка + 2, ширина широких символов считается через
+wcwidth, если он установлен (как в tabulate).
+
+Ячейки с переводами строк или ANSI-кодами tabulate рисует по особым правилам
+(многострочные ячейки, «невидимые» символы); такие таблицы целиком отдаются tabulate.
+
+Режим sample_rows: ширины считаются по первым N строкам, остальные строки пишутся
+потоково без второго прохода (подходит для итераторов и очень больших результатов).
+Более длинные значения за пределами выборки сдвигают границы колонок.
 """
 from __future__ import annotations
 
-from typing import Any, Mapping
+import io
+import re
+from itertools import chain, islice
+from typing import IO, Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from . import stats
+
+# tabulate считает ширину широких символов через wcwidth, если он установлен;
+# модуль импортируется при первой не-ASCII ячейке (см. _wide_width)
+_wcswidth: Optional[Callable[[str], int]] = None
+
+__all__ = [
+    "render_table",
+    "write_table",
+    "TABLE_CELL_FORMATS",
+    "CellFormats",
+    "ANY_COLUMN",
+    "column_formats",
+    "two_decimals",
+    "float_two_decimals",
+]
 
-from tabulate import tabulate
+# Форматирование значений по ключам колонок: {колонка: функция значения};
+# ключ ANY_COLUMN — формат для колонок без собственного ключа
+CellFormats = Mapping[str, Callable[[Any], Any]]
+ANY_COLUMN = "*"
 
-__all__ = ["render_table"]
+# Всегда выравниваются вправо: числовые поля данных, даже с нечисловыми значениями ("n/a")
+_RIGHT_ALIGNED = frozenset({"performance"})
 
+# Переводы строк, ANSI-последовательности и маркер разделителя tabulate ("\x01")
+_SPECIAL = re.compile("[\r\n\x1b\x01]")
+_MIN_PADDING = 2
 
-def _format_cell(key: str, value: Any) -> Any:
-    """Точечное форматирование значений по ключам."""
-    if key == "performance" and isinstance(value, (int, float)):
+
+def two_decimals(value: Any) -> Any:
+    """Число -> строка с двумя знаками после запятой; прочие значения без изменений."""
+    if isinstance(value, (int, float)):
         return f"{value:.2f}"
     return value
 
 
-from tabulate import tabulate
+def float_two_decimals(value: Any) -> Any:
+    """Дробное число -> строка с двумя знаками; целые (count) и прочие значения без изменений."""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return value
 
-def render_table(headers: list[str], rows: list[Mapping[str, Any]]) -> str:
-    table_data = [[_format_cell(h, r.get(h, "")) for h in headers] for r in rows]
-
-    colalign = tuple("right" if h == "performance" else "left" for h in headers)
-
-    return tabulate(
-        table_data,
-        headers=headers,
-        tablefmt="github",
-        stralign="left",
-        numalign="right",
-        disable_numparse=True,
-        colalign=colalign,
+
+TABLE_CELL_FORMATS: CellFormats = {"performance": two_decimals, ANY_COLUMN: float_two_decimals}
+
+
+def column_formats(
+    headers: Sequence[str], cell_formats: CellFormats
+) -> list[tuple[str, Optional[Callable[[Any], Any]]]]:
+    """Пары (колонка, функция форматирования): по ключу колонки, иначе по ANY_COLUMN."""
+    default = cell_formats.get(ANY_COLUMN)
+    return [(h, cell_formats.get(h, default)) for h in headers]
+
+
+def _numeric_columns(headers: Sequence[str], rows: Iterable[Mapping[str, Any]]) -> list[bool]:
+    """Для каждой колонки: есть непустые значения, и все они int/float (не bool)."""
+    numeric: list[Optional[bool]] = [None] * len(headers)
+    for row in rows:
+        for i, h in enumerate(headers):
+            value = row.get(h)
+            if numeric[i] is not False and value is not None and value != "":
+                numeric[i] = type(value) in (int, float)
+    return [bool(flag) for flag in numeric]
+
+
+def _cell_text(value: Any) -> str:
+    """Текст ячейки как у tabulate: None -> "", пробелы по краям обрезаются."""
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        try:
+            value = str(value, "ascii")
+        except UnicodeDecodeError:
+            value = str(value)
+    text = value if isinstance(value, str) else f"{value}"
+    return text.strip()
+
+
+def _wide_width(text: str) -> int:
+    global _wcswidth
+    if _wcswidth is None:
+        try:
+            from wcwidth import wcswidth
+        except ImportError:  # pragma: no cover - зависит от окружения
+            wcswidth = len
+        _wcswidth = wcswidth
+    return _wcswidth(text)
+
+
+def _width(text: str) -> int:
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return _wide_width(text)
+
+
+def _row_values(
+    row: Mapping[str, Any], columns: list[tuple[str, Optional[Callable[[Any], Any]]]]
+) -> list[Any]:
+    return [row.get(h, "") if fmt is None else fmt(row.get(h, "")) for h, fmt in columns]
+
+
+def _measure(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    columns: list[tuple[str, Optional[Callable[[Any], Any]]]],
+) -> Optional[list[int]]:
+    """Ширины колонок; None, если таблицу должен рисовать tabulate."""
+    if any(_SPECIAL.search(h) for h in headers):
+        return None
+    widths = [_width(h) + _MIN_PADDING for h in headers]
+    special = _SPECIAL.search
+    for row in rows:
+        for i, value in enumerate(_row_values(row, columns)):
+            if value is None:
+                continue
+            if isinstance(value, bytes):
+                return None
+            text = value if isinstance(value, str) else f"{value}"
+            if special(text):
+                # Многострочные ячейки и ANSI-коды tabulate рисует по особым правилам
+                return None
+            w = _width(text.strip())
+            if w > widths[i]:
+                widths[i] = w
+    return widths
+
+
+def _pad(text: str, width: int, right: bool) -> str:
+    fill = " " * (width - _width(text))
+    return fill + text if right else text + fill
+
+
+def _write_rows(
+    out: IO[str],
+    rows: Iterable[Mapping[str, Any]],
+    widths: list[int],
+    right: list[bool],
+    columns: list[tuple[str, Optional[Callable[[Any], Any]]]],
+) -> None:
+    for row in rows:
+        cells = map(_cell_text, _row_values(row, columns))
+        out.write("| " + " | ".join(map(_pad, cells, widths, right)) + " |\n")
+
+
+def _write_tabulate(
+    out: IO[str],
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    columns: list[tuple[str, Optional[Callable[[Any], Any]]]],
+) -> None:
+    from tabulate import tabulate
+
+    headers = list(headers)
+    rows = list(rows)
+    table_data = [_row_values(r, columns) for r in rows]
+    numeric = _numeric_columns(headers, rows)
+    colalign = tuple(
+        "right" if h in _RIGHT_ALIGNED or numeric[i] else "left" for i, h in enumerate(headers)
+    )
+    out.write(
+        tabulate(
+            table_data,
+            headers=headers,
+            tablefmt="github",
+            stralign="left",
+            numalign="right",
+            disable_numparse=True,
+            colalign=colalign,
+        )
     )
+    out.write("\n")
+
+
+def write_table(
+    headers: Sequence[str],
+    rows: Iterable[Mapping[str, Any]],
+    out: IO[str],
+    sample_rows: Optional[int] = None,
+    cell_formats: Optional[CellFormats] = None,
+) -> None:
+    """
+    Пишет таблицу в поток out построчно (каждая строка завершается "\\n").
+
+    Parameters
+    ----------
+    headers : Sequence[str]
+        Заголовки (и ключи словарей строк) в порядке колонок.
+    rows : Iterable[Mapping[str, Any]]
+        Строки отчёта. Точный режим проходит по ним дважды (ширины, затем вывод),
+        поэтому одноразовый итератор будет материализован, а повторно итерируемый
+        объект (например, spill.SpilledRows) — прочитан дважды; в режиме sample_rows —
+        один проход.
+    out : IO[str]
+        Текстовый поток для вывода.
+    sample_rows : int | None
+        Считать ширины по первым sample_rows строкам; None — по всем строкам.
+    cell_formats : CellFormats | None
+        Форматирование значений по колонкам; None — TABLE_CELL_FORMATS.
+    """
+    if cell_formats is None:
+        cell_formats = TABLE_CELL_FORMATS
+    with stats.stage("render"):
+        if sample_rows is None:
+            if iter(rows) is rows:
+                rows = list(rows)
+            head: Iterable[Mapping[str, Any]] = rows
+            tail: Iterable[Mapping[str, Any]] = ()
+        else:
+            rows = iter(rows)
+            head = list(islice(rows, sample_rows))
+            tail = rows
+
+        columns = column_formats(headers, cell_formats)
+        widths = _measure(headers, head, columns)
+        if widths is None:
+            _write_tabulate(out, headers, chain(head, tail), columns)
+            return
+
+        # Без строк tabulate не знает выравнивания колонок и выравнивает заголовки влево;
+        # в режиме sample_rows числовые колонки определяются по выборке
+        numeric = _numeric_columns(headers, head)
+        right = [(h in _RIGHT_ALIGNED or numeric[i]) and bool(head) for i, h in enumerate(headers)]
+        out.write("| " + " | ".join(map(_pad, headers, widths, right)) + " |\n")
+        out.write("|" + "|".join("-" * (w + 2) for w in widths) + "|\n")
+        _write_rows(out, head, widths, right, columns)
+        _write_rows(out, tail, widths, right, columns)
+
+
+def render_table(headers: list[str], rows: list[Mapping[str, Any]]) -> str:
+    """Таблица целиком одной строкой (без завершающего перевода строки)."""
+    buffer = io.StringIO()
+    write_table(headers, rows, buffer)
+    return buffer.getvalue()[:-1]
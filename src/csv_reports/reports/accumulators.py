@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Инкрементальные аккумуляторы для агрегирующих отчётов.
+
+Аккумулятор хранит O(1) состояния вместо списка значений и поддерживает слияние,
+поэтому годится и для потоковой, и для параллельной обработки.
+
+Сумма ведётся точно (частичные суммы Шевчука, как в math.fsum): результат не зависит
+от порядка строк и от того, как данные были разбиты между частичными состояниями.
+Это гарантирует побайтно одинаковый вывод последовательного и параллельного режимов.
+
+Бесконечности и NaN в частичные суммы не попадают (они их разрушают): как и в math.fsum,
+они копятся отдельно и определяют итог — inf, -inf или nan, как у обычного сложения.
+"""
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+
+__all__ = ["MeanAccumulator"]
+
+
+class MeanAccumulator:
+    """Количество и точная сумма значений; среднее вычисляется при финализации."""
+
+    __slots__ = ("count", "_partials", "_special")
+
+    def __init__(self) -> None:
+        self.count = 0
+        # Неперекрывающиеся частичные суммы, их точная сумма равна сумме конечных значений
+        self._partials: list[float] = []
+        # Сумма бесконечных и NaN-значений (и переполнений); 0.0 — таких не было
+        self._special = 0.0
+
+    def _add_exact(self, x: float) -> None:
+        if not math.isfinite(x):
+            self._special += x
+            return
+        partials = self._partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        if math.isinf(x):
+            # Переполнение: частичные суммы испорчены, итог — бесконечность со знаком x
+            self._special += x
+            self._partials = []
+            return
+        partials[i:] = [x]
+
+    def add(self, value: float) -> None:
+        """Учитывает одно значение."""
+        self.count += 1
+        self._add_exact(value)
+
+    def add_exact_sum(self, total: Fraction, count: int) -> None:
+        """
+        Учитывает count значений, точная сумма которых равна total.
+
+        Используется векторизованными движками, которые считают групповую сумму
+        точно (в целых числах) и не передают значения по одному.
+        """
+        self.count += count
+        while total:
+            part = float(total)
+            self._add_exact(part)
+            total -= Fraction(part)
+
+    def merge(self, other: "MeanAccumulator") -> None:
+        """Вливает состояние другого аккумулятора (other не изменяется)."""
+        self.count += other.count
+        self._special += other._special
+        for p in other._partials:
+            self._add_exact(p)
+
+    def copy(self) -> "MeanAccumulator":
+        clone = MeanAccumulator()
+        clone.count = self.count
+        clone._partials = list(self._partials)
+        clone._special = self._special
+        return clone
+
+    @property
+    def total(self) -> float:
+        """Корректно округлённая сумма всех учтённых значений."""
+        if self._special:  # inf, -inf или nan (bool(nan) — True)
+            return self._special
+        return math.fsum(self._partials)
+
+    def exact_total(self) -> Fraction:
+        """
+        Точная сумма учтённых значений (для расчётов, чувствительных к округлению).
+
+        Raises
+        ------
+        ValueError
+            Среди значений были inf или nan (см. total).
+        """
+        if self._special:
+            raise ValueError(f"Сумма не конечна: {self._special}")
+        return sum(map(Fraction, self._partials), Fraction(0))
+
+    @property
+    def mean(self) -> float:
+        """Среднее значение; для пустого аккумулятора — ZeroDivisionError."""
+        return self.total / self.count
+
+    def __getstate__(self) -> tuple[int, list[float], float]:
+        return self.count, self._partials, self._special
+
+    def __setstate__(self, state: tuple[int, list[float], float]) -> None:
+        self.count, self._partials, self._special = state
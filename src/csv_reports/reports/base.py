@@ -6,21 +6,52 @@
 - статическое поле name: уникальный идентификатор отчёта (например, "performance");
 - headers(): список заголовков таблицы;
 - run(rows): вычисление данных отчёта по нормализованным строкам EmployeeRow.
+
+Поле columns объявляет, какие колонки нужны отчёту: читатель разбирает и приводит
+к типам только их, остальные ключи в строках отсутствуют. По умолчанию — все колонки.
+
+Помимо run() у каждого отчёта есть инкрементальный протокол:
+create_state() -> update()/update_batch()/update_table() -> merge() -> finalize().
+Для отчётов, реализующих только run(), он работает через адаптер: состояние —
+буфер строк, а finalize() вызывает run() по накопленному списку.
+
+Агрегирующие отчёты наследуются от AggregateReport и реализуют протокол напрямую:
+тогда память пропорциональна числу групп, а не строк, а частичные состояния
+можно считать потоково и параллельно, сливая их через merge().
+
+Поле memory_limit — бюджет памяти состояния в байтах (None — без ограничения).
+Его учитывают отчёты, умеющие сбрасывать состояние на диск (GroupByReport);
+остальные поле игнорируют.
+
+Поле top — сколько первых строк результата нужно (None — все). GroupByReport отбирает
+их частичной выборкой (heapq) вместо полной сортировки; результат остальных отчётов
+обрезает service.
 """
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar, Sequence
+from typing import Any, ClassVar, Iterable, Optional
 
-from ..models import EmployeeRow
+from ..models import EMPLOYEE_COLUMNS, EmployeeRow, EmployeeTable
 
-__all__ = ["Report"]
+__all__ = ["Report", "AggregateReport"]
 
 
 class Report(ABC):
-    """Абстрактный базовый класс отчёта."""
+    """
+    Абстрактный базовый класс отчёта.
+
+    Методы протокола могут изменять state на месте, но всегда возвращают
+    актуальное состояние — вызывающий код использует только возвращённое значение.
+    """
 
     name: ClassVar[str]
+    # Колонки EmployeeRow, которые читает отчёт (проекция при разборе CSV)
+    columns: ClassVar[frozenset[str]] = frozenset(EMPLOYEE_COLUMNS)
+    # Бюджет памяти состояния, байт (задаётся экземпляру, см. service.build_reports)
+    memory_limit: Optional[int] = None
+    # Сколько первых строк результата нужно (None — все; см. service.build_reports)
+    top: Optional[int] = None
 
     @abstractmethod
     def headers(self) -> list[str]:
@@ -28,9 +59,70 @@ class Report(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def run(self, rows: Sequence[EmployeeRow]) -> list[dict[str, Any]]:
+    def run(self, rows: Iterable[EmployeeRow]) -> list[dict[str, Any]]:
         """
         Выполняет расчёт и возвращает список словарей,
         совместимых с заголовками, возвращаемыми headers().
         """
         raise NotImplementedError
+
+    # --- Инкрементальный протокол (адаптер поверх run()) ---
+
+    def create_state(self) -> Any:
+        """Пустое состояние расчёта."""
+        return []
+
+    def update(self, state: Any, row: EmployeeRow) -> Any:
+        """Учитывает одну строку."""
+        state.append(row)
+        return state
+
+    def update_batch(self, state: Any, rows: Iterable[EmployeeRow]) -> Any:
+        """Учитывает пачку строк (или ленивый итератор) за один проход."""
+        for row in rows:
+            state = self.update(state, row)
+        return state
+
+    def update_table(self, state: Any, table: EmployeeTable) -> Any:
+        """
+        Учитывает колоночную таблицу. По умолчанию — построчно через update_batch();
+        отчёты могут переопределить метод и работать с колонками напрямую.
+        """
+        return self.update_batch(state, table.iter_rows(self.columns))
+
+    def merge(self, state: Any, other: Any) -> Any:
+        """Сливает other в state; other после слияния не должен изменяться."""
+        state.extend(other)
+        return state
+
+    def finalize(self, state: Any) -> list[dict[str, Any]]:
+        """Превращает состояние в строки отчёта."""
+        return self.run(state)
+
+
+class AggregateReport(Report):
+    """
+    Отчёт, реализующий инкрементальный протокол напрямую.
+
+    run() выражен через протокол, поэтому наследникам достаточно реализовать
+    create_state(), update(), merge() и finalize().
+    """
+
+    @abstractmethod
+    def create_state(self) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, state: Any, row: EmployeeRow) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge(self, state: Any, other: Any) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def finalize(self, state: Any) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    def run(self, rows: Iterable[EmployeeRow]) -> list[dict[str, Any]]:
+        return self.finalize(self.update_batch(self.create_state(), rows))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Составной отчёт: несколько отчётов за один проход по данным.
+
+CompositeReport раздаёт каждую строку (или таблицу) всем вложенным отчётам,
+поэтому N отчётов требуют одного чтения файлов вместо N. Читатель разбирает
+объединение колонок, нужных вложенным отчётам.
+
+Отчёт служебный и в реестре не регистрируется: finalize() возвращает не строки
+одной таблицы, а список результатов — по одному на вложенный отчёт.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+from ..models import EmployeeRow, EmployeeTable
+from .base import AggregateReport, Report
+
+__all__ = ["CompositeReport"]
+
+
+class CompositeReport(AggregateReport):
+    """Набор отчётов с общим инкрементальным состоянием (список состояний)."""
+
+    name = "composite"
+
+    def __init__(self, reports: Sequence[Report]) -> None:
+        if not reports:
+            raise ValueError("Составной отчёт должен содержать хотя бы один отчёт")
+        self.reports = list(reports)
+        # Поле экземпляра перекрывает ClassVar базового класса: объединение проекций
+        self.columns = frozenset().union(*(r.columns for r in self.reports))  # type: ignore
+
+    def headers(self) -> list[str]:
+        raise TypeError("У составного отчёта нет общих заголовков; см. reports[i].headers()")
+
+    def create_state(self) -> list[Any]:
+        return [r.create_state() for r in self.reports]
+
+    def update(self, state: list[Any], row: EmployeeRow) -> list[Any]:
+        return [r.update(s, row) for r, s in zip(self.reports, state)]
+
+    def update_batch(self, state: list[Any], rows: Iterable[EmployeeRow]) -> list[Any]:
+        state = list(state)
+        updaters = list(enumerate(r.update for r in self.reports))
+        for row in rows:
+            for i, update in updaters:
+                state[i] = update(state[i], row)
+        return state
+
+    def update_table(self, state: list[Any], table: EmployeeTable) -> list[Any]:
+        return [r.update_table(s, table) for r, s in zip(self.reports, state)]
+
+    def merge(self, state: list[Any], other: list[Any]) -> list[Any]:
+        return [r.merge(a, b) for r, a, b in zip(self.reports, state, other)]
+
+    def finalize(self, state: list[Any]) -> list[list[dict[str, Any]]]:  # type: ignore[override]
+        return [r.finalize(s) for r, s in zip(self.reports, state)]
@@ -0,0 +1,681 @@
+# -*- coding: utf-8 -*-
+"""
+Обобщённый отчёт «группировка + агрегаты» (GroupByReport).
+
+Ключ группы — одна или несколько колонок EmployeeRow; числовую колонку можно разбить
+на интервалы шириной WIDTH: "experience_years:5" -> группы 0-4, 5-9, ...
+Агрегаты — count, sum, mean, min, max и stddev (выборочное, n − 1) по числовым
+колонкам: "mean:performance", "sum:completed_tasks"; "count" — число строк группы.
+
+Состояние — хэш-таблица {ключ группы: _Group}: число строк и по одной
+engine.GroupStats на числовую серию (колонку или, для stddev, квадраты её значений).
+Суммы точные (MeanAccumulator), поэтому результат не зависит от порядка строк,
+разбиения на фрагменты и пути расчёта — построчного (update) или колоночного
+(update_table: коды групп + engine.group_stats, с NumPy на больших таблицах).
+
+Строки результата упорядочены по ключу группы, либо по order_by (при равенстве —
+в порядке первого появления группы). С top (--top) первые top строк отбираются
+heapq.nsmallest по тому же ключу (поля order_by, затем ранг появления) — O(n log top)
+без сортировки всех групп, с тем же порядком, что и у полной сортировки.
+
+Бюджет памяти (memory_limit, --memory-limit): когда групп больше, чем в него помещается,
+хэш-таблица сбрасывается на диск серией, отсортированной по ключу (spill.write_run),
+и очищается. finalize() сливает серии k-way слиянием, объединяя части одной группы,
+а сортировку по order_by выполняет внешне (spill.external_sort); строки результата
+тогда отдаются потоком с диска (spill.SpilledRows). Порядок первого появления
+сохраняется через ранги групп, поэтому результат совпадает с расчётом в памяти.
+
+Отчёт без собственного кода объявляется через groupby_report() и регистрируется
+в реестре (так объявлен встроенный 'performance'); CLI --group-by / --agg строит
+экземпляр «на лету», без регистрации.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from fractions import Fraction
+from itertools import islice
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .. import spill
+from ..engine import GroupStats, group_stats
+from ..errors import InvalidArguments
+from ..models import (
+    EMPLOYEE_COLUMNS,
+    NUMERIC_TYPECODES,
+    DictionaryColumn,
+    EmployeeRow,
+    EmployeeTable,
+)
+from .base import AggregateReport
+from .registry import registry
+
+__all__ = [
+    "AGGREGATES",
+    "Aggregate",
+    "GroupByReport",
+    "GroupKey",
+    "groupby_report",
+    "parse_aggregates",
+    "parse_group_by",
+]
+
+AGGREGATES: tuple[str, ...] = ("count", "sum", "mean", "min", "max", "stddev")
+
+# Серия значений группы: (колонка, квадраты значений)
+Series = tuple[str, bool]
+
+# Оценки памяти для бюджета: группа в хэш-таблице (ключ, _Group, слот словаря)
+# и каждая её серия (GroupStats с MeanAccumulator); строка результата и её ячейка
+_GROUP_BYTES = 300
+_SERIES_BYTES = 250
+_RECORD_BYTES = 250
+_CELL_BYTES = 60
+
+
+@dataclass(frozen=True)
+class GroupKey:
+    """Колонка ключа группы; width — ширина интервала для числовой колонки."""
+
+    column: str
+    width: Optional[Union[int, float]] = None
+
+    def bucket(self, value: Any) -> Any:
+        """Нижняя граница интервала значения."""
+        return value // self.width * self.width  # type: ignore[operator]
+
+    def label(self, value: Any) -> Any:
+        """Значение ключа в строке результата: интервалы — строкой "5-9"."""
+        if self.width is None:
+            return value
+        if NUMERIC_TYPECODES[self.column] == "q" and isinstance(self.width, int):
+            return str(value) if self.width == 1 else f"{value}-{value + self.width - 1}"
+        return f"{value:g}-{value + self.width:g}"
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Агрегат op по числовой колонке column (для count колонка не нужна)."""
+
+    op: str
+    column: Optional[str] = None
+    header: str = ""
+
+    @property
+    def title(self) -> str:
+        """Заголовок колонки результата: header или 'op_column' ('count')."""
+        if self.header:
+            return self.header
+        return self.op if self.column is None else f"{self.op}_{self.column}"
+
+
+def parse_group_by(spec: str) -> tuple[GroupKey, ...]:
+    """
+    Ключи группы из строки вида "team,position,experience_years:5".
+
+    Raises
+    ------
+    InvalidArguments
+        Неизвестная колонка, интервал у нечисловой колонки или неположительная ширина.
+    """
+    keys = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        column, _, width_text = (part.strip() for part in item.partition(":"))
+        width: Optional[Union[int, float]] = None
+        if width_text:
+            if column not in NUMERIC_TYPECODES:
+                raise InvalidArguments(f"Интервалы задаются только для числовых колонок: {item}")
+            try:
+                width = int(width_text) if width_text.isdigit() else float(width_text)
+            except ValueError:
+                raise InvalidArguments(f"Некорректная ширина интервала: {item}") from None
+            if not width > 0 or math.isinf(width):
+                raise InvalidArguments(f"Ширина интервала должна быть положительной: {item}")
+        keys.append(GroupKey(column, width))
+    return tuple(keys)
+
+
+def parse_aggregates(spec: str) -> tuple[Aggregate, ...]:
+    """
+    Агрегаты из строки вида "mean:performance,sum:completed_tasks,count".
+
+    Raises
+    ------
+    InvalidArguments
+        Неизвестный агрегат или колонка, либо агрегат без колонки.
+    """
+    aggregates = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        op, _, column = (part.strip() for part in item.partition(":"))
+        aggregates.append(Aggregate(op, column or None))
+    return tuple(aggregates)
+
+
+def _validate(keys: Sequence[GroupKey], aggregates: Sequence[Aggregate]) -> None:
+    if not keys:
+        raise InvalidArguments("Не указаны колонки группировки")
+    if not aggregates:
+        raise InvalidArguments("Не указаны агрегаты")
+    for key in keys:
+        if key.column not in EMPLOYEE_COLUMNS:
+            raise InvalidArguments(
+                f"Неизвестная колонка '{key.column}' (доступны: {', '.join(EMPLOYEE_COLUMNS)})"
+            )
+    for agg in aggregates:
+        if agg.op not in AGGREGATES:
+            raise InvalidArguments(
+                f"Неизвестный агрегат '{agg.op}' (доступны: {', '.join(AGGREGATES)})"
+            )
+        if agg.column is None and agg.op != "count":
+            raise InvalidArguments(f"Агрегату '{agg.op}' нужна колонка: {agg.op}:COLUMN")
+        if agg.column is not None and agg.column not in NUMERIC_TYPECODES:
+            raise InvalidArguments(
+                f"Агрегаты считаются по числовым колонкам ({', '.join(NUMERIC_TYPECODES)}), "
+                f"получено '{agg.column}'"
+            )
+    titles = [key.column for key in keys] + [agg.title for agg in aggregates]
+    duplicates = sorted({t for t in titles if titles.count(t) > 1})
+    if duplicates:
+        raise InvalidArguments(f"Повторяющиеся колонки результата: {', '.join(duplicates)}")
+
+
+class _Group:
+    """
+    Состояние одной группы: статистика по сериям.
+
+    Число строк группы — count первой серии (каждая серия видит все строки группы);
+    отдельный счётчик rows ведётся только у группировок без числовых агрегатов.
+    """
+
+    __slots__ = ("rows", "series")
+
+    def __init__(self, n_series: int) -> None:
+        self.rows = 0
+        self.series = [GroupStats() for _ in range(n_series)]
+
+    @property
+    def count(self) -> int:
+        return self.series[0].count if self.series else self.rows
+
+    def merge(self, other: "_Group") -> None:
+        self.rows += other.rows
+        for mine, theirs in zip(self.series, other.series):
+            mine.merge(theirs)
+
+    def copy(self) -> "_Group":
+        clone = _Group(0)
+        clone.rows = self.rows
+        clone.series = [stats.copy() for stats in self.series]
+        return clone
+
+    def __getstate__(self) -> tuple[int, list[GroupStats]]:
+        return self.rows, self.series
+
+    def __setstate__(self, state: tuple[int, list[GroupStats]]) -> None:
+        self.rows, self.series = state
+
+
+class _GroupTable(Dict[Any, _Group]):
+    """
+    Состояние GroupByReport: хэш-таблица {ключ группы: _Group}.
+
+    runs — сброшенные на диск части: (путь серии, смещение рангов). Записи серии —
+    (ключ, ранг, группа) по возрастанию ключа; ранг — номер первого появления группы
+    (с учётом смещения). ranked — сколько рангов уже занято сброшенными группами:
+    группы в памяти получат ранги ranked, ranked + 1, ... в порядке словаря.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.runs: list[tuple[str, int]] = []
+        self.ranked = 0
+
+
+GroupByState = _GroupTable
+
+
+class _Descending:
+    """Обратный порядок значения в ключе сортировки (для полей order_by по убыванию)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+def _ranked_run(path: str, offset: int) -> Iterator[tuple[Any, int, _Group]]:
+    for key, rank, group in spill.read_run(path):
+        yield key, rank + offset, group
+
+
+def _merge_runs(runs: Sequence[tuple[str, int]]) -> Iterator[tuple[Any, int, _Group]]:
+    """(ключ, ранг, группа) по возрастанию ключа; части одной группы из разных серий слиты."""
+    streams = [_ranked_run(path, offset) for path, offset in runs]
+    current: Optional[list[Any]] = None
+    for key, rank, group in heapq.merge(*streams, key=itemgetter(0)):
+        if current is not None and current[0] == key:
+            current[1] = min(current[1], rank)
+            current[2].merge(group)
+            continue
+        if current is not None:
+            yield tuple(current)  # type: ignore[misc]
+        current = [key, rank, group]
+    if current is not None:
+        yield tuple(current)  # type: ignore[misc]
+
+
+def _compact_runs(runs: list[tuple[str, int]]) -> list[tuple[str, int]]:
+    """Сливает серии группами по spill.MAX_FAN_IN, пока их больше (ранги — абсолютные)."""
+    while len(runs) > spill.MAX_FAN_IN:
+        merged: list[tuple[str, int]] = []
+        try:
+            for i in range(0, len(runs), spill.MAX_FAN_IN):
+                group = runs[i : i + spill.MAX_FAN_IN]
+                merged.append((spill.write_run(_merge_runs(group)), 0))
+                spill.remove_runs(path for path, _ in group)
+        except BaseException:
+            spill.remove_runs(path for path, _ in runs + merged)
+            raise
+        runs = merged
+    return runs
+
+
+def _stddev(count: int, values: GroupStats, squares: GroupStats) -> Optional[float]:
+    """Выборочное стандартное отклонение по точным суммам значений и их квадратов."""
+    if count < 2:
+        return None
+    if not (math.isfinite(values.sum) and math.isfinite(squares.sum)):
+        return math.nan  # inf/nan среди значений
+    total = values.acc.exact_total()
+    variance = (squares.acc.exact_total() - total * total / count) / (count - 1)
+    return math.sqrt(max(variance, Fraction(0)))
+
+
+class GroupByReport(AggregateReport):
+    """
+    Группировка по ключам group_by с агрегатами aggregates.
+
+    Конфигурация задаётся полями класса (декларативные отчёты, см. groupby_report())
+    или аргументами конструктора (отчёт «на лету», например из CLI).
+    """
+
+    name = "group_by"
+    group_by: ClassVar[tuple[GroupKey, ...]] = ()
+    aggregates: ClassVar[tuple[Aggregate, ...]] = ()
+    # (заголовок, по убыванию); пусто — сортировка по ключу группы
+    order_by: ClassVar[tuple[tuple[str, bool], ...]] = ()
+
+    def __init__(
+        self,
+        group_by: Union[str, Sequence[GroupKey], None] = None,
+        aggregates: Union[str, Sequence[Aggregate], None] = None,
+        name: Optional[str] = None,
+        order_by: Optional[Sequence[tuple[str, bool]]] = None,
+    ) -> None:
+        # Поля экземпляра перекрывают ClassVar (как CompositeReport.columns)
+        if isinstance(group_by, str):
+            group_by = parse_group_by(group_by)
+        if isinstance(aggregates, str):
+            aggregates = parse_aggregates(aggregates)
+        if group_by is not None:
+            self.group_by = tuple(group_by)  # type: ignore[misc]
+        if aggregates is not None:
+            self.aggregates = tuple(aggregates)  # type: ignore[misc]
+        if name is not None:
+            self.name = name  # type: ignore[misc]
+        if order_by is not None:
+            self.order_by = tuple(order_by)  # type: ignore[misc]
+        _validate(self.group_by, self.aggregates)
+
+        self.columns = frozenset(  # type: ignore[misc]
+            [key.column for key in self.group_by]
+            + [agg.column for agg in self.aggregates if agg.column is not None]
+        )
+        series: Dict[Series, int] = {}
+        for agg in self.aggregates:
+            if agg.column is not None:
+                series.setdefault((agg.column, False), len(series))
+                if agg.op == "stddev":
+                    series.setdefault((agg.column, True), len(series))
+        self._series: tuple[Series, ...] = tuple(series)
+        # min/max на построчном пути отслеживаются только у серий, где они запрошены
+        extrema = {agg.column for agg in self.aggregates if agg.op in ("min", "max")}
+        self._extrema = tuple(not sq and column in extrema for column, sq in self._series)
+        self._key = self._key_function()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Классы из groupby_report() не импортируются по имени: в рабочие процессы
+        # передаётся базовый класс с той же конфигурацией
+        cls = GroupByReport if type(self).__dict__.get("_declarative") else type(self)
+        args = (self.group_by, self.aggregates, self.name, self.order_by)
+        return cls, args, {"memory_limit": self.memory_limit, "top": self.top}
+
+    def _key_function(self) -> Callable[[EmployeeRow], Any]:
+        """Ключ строки: значение для одной колонки, кортеж — для нескольких."""
+        keys = self.group_by
+        if all(key.width is None for key in keys):
+            return itemgetter(*(key.column for key in keys))  # type: ignore[return-value]
+        if len(keys) == 1:
+            column, bucket = keys[0].column, keys[0].bucket
+            return lambda row: bucket(row[column])  # type: ignore[literal-required]
+        getters = [
+            (key.column, key.bucket if key.width is not None else None) for key in keys
+        ]
+        return lambda row: tuple(
+            row[c] if b is None else b(row[c]) for c, b in getters  # type: ignore[literal-required]
+        )
+
+    def headers(self) -> list[str]:
+        return [key.column for key in self.group_by] + [agg.title for agg in self.aggregates]
+
+    # --- инкрементальный протокол ---
+
+    def create_state(self) -> GroupByState:
+        return _GroupTable()
+
+    def _group_limit(self) -> int:
+        """Сколько групп держать в памяти до сброса на диск."""
+        if self.memory_limit is None:
+            return sys.maxsize
+        per_group = _GROUP_BYTES + _SERIES_BYTES * len(self._series)
+        return max(self.memory_limit // per_group, 1)
+
+    def _spill(self, state: GroupByState) -> None:
+        """Сбрасывает группы из памяти в серию, отсортированную по ключу."""
+        if not state:
+            return
+        entries = [(key, state.ranked + i, group) for i, (key, group) in enumerate(state.items())]
+        entries.sort(key=itemgetter(0))
+        state.runs.append((spill.write_run(entries), 0))
+        state.ranked += len(entries)
+        state.clear()
+
+    def update(self, state: GroupByState, row: EmployeeRow) -> GroupByState:
+        return self.update_batch(state, (row,))
+
+    def update_batch(self, state: GroupByState, rows: Iterable[EmployeeRow]) -> GroupByState:
+        # Цикл специализирован под частые формы: без серий (только count) и одна серия
+        # без min/max (как у 'performance') — без цикла по сериям на каждую строку
+        key_of, lookup, n_series = self._key, state.get, len(self._series)
+        limit = self._group_limit()
+        if not n_series:
+            for row in rows:
+                key = key_of(row)
+                group = lookup(key)
+                if group is None:
+                    if len(state) >= limit:
+                        self._spill(state)
+                    group = state[key] = _Group(0)
+                group.rows += 1
+            return state
+        if n_series == 1 and not self._extrema[0]:
+            column = self._series[0][0]
+            for row in rows:
+                key = key_of(row)
+                group = lookup(key)
+                if group is None:
+                    if len(state) >= limit:
+                        self._spill(state)
+                    group = state[key] = _Group(1)
+                group.series[0].acc.add(row[column])  # type: ignore[literal-required]
+            return state
+        specs = [
+            (i, column, squared, extrema)
+            for i, ((column, squared), extrema) in enumerate(zip(self._series, self._extrema))
+        ]
+        for row in rows:
+            key = key_of(row)
+            group = lookup(key)
+            if group is None:
+                if len(state) >= limit:
+                    self._spill(state)
+                group = state[key] = _Group(n_series)
+            for i, column, squared, extrema in specs:
+                value = row[column]  # type: ignore[literal-required]
+                if squared:
+                    value *= value
+                if extrema:
+                    group.series[i].add(value)
+                else:
+                    group.series[i].acc.add(value)
+        return state
+
+    def _table_groups(self, table: EmployeeTable) -> tuple[Sequence[int], list[Any]]:
+        """Коды групп строк таблицы и ключи групп в порядке первого появления."""
+        keys = self.group_by
+        if len(keys) == 1 and keys[0].width is None:
+            col = table.column(keys[0].column)
+            if isinstance(col, DictionaryColumn):
+                return col.codes, col.values
+        parts: list[Iterable[Any]] = []
+        for key in keys:
+            col = table.column(key.column)
+            if isinstance(col, DictionaryColumn):
+                parts.append(col)
+            else:
+                parts.append(col if key.width is None else map(key.bucket, col))
+        ids: Dict[Any, int] = {}
+        rows = parts[0] if len(parts) == 1 else zip(*parts)
+        codes = [ids.setdefault(k, len(ids)) for k in rows]
+        return codes, list(ids)
+
+    def _series_values(self, table: EmployeeTable, series: Series) -> Sequence[float]:
+        column, squared = series
+        values = table.column(column)
+        if not squared:
+            return values  # type: ignore[return-value]
+        return [v * v for v in values]  # type: ignore[union-attr]
+
+    def update_table(self, state: GroupByState, table: EmployeeTable) -> GroupByState:
+        # Коды групп + движок агрегатов по каждой серии (NumPy на больших таблицах)
+        if not len(table):
+            return state
+        codes, keys = self._table_groups(table)
+        per_series = [
+            group_stats(codes, self._series_values(table, s), len(keys)) for s in self._series
+        ]
+        if per_series:
+            counts = [g.count for g in per_series[0]]
+        else:
+            tally = Counter(codes)
+            counts = [tally[i] for i in range(len(keys))]
+
+        partial: GroupByState = {}
+        for i, key in enumerate(keys):
+            if counts[i]:
+                group = partial[key] = _Group(0)
+                group.series = [stats[i] for stats in per_series]
+                if not per_series:
+                    group.rows = counts[i]
+        # Слияние — по тем же правилам, что и у частичных состояний процессов
+        for key, group in partial.items():
+            mine = state.get(key)
+            if mine is None:
+                state[key] = group
+            else:
+                mine.merge(group)
+        if len(state) > self._group_limit():
+            self._spill(state)
+        return state
+
+    def merge(self, state: GroupByState, other: GroupByState) -> GroupByState:
+        if other.runs:
+            # Группы state (в памяти и на диске) появились раньше групп other:
+            # ранги серий other сдвигаются за все ранги state
+            self._spill(state)
+            state.runs.extend((path, offset + state.ranked) for path, offset in other.runs)
+            state.ranked += other.ranked
+        for key, group in other.items():
+            mine = state.get(key)
+            if mine is None:
+                state[key] = group.copy()
+            else:
+                mine.merge(group)
+        if len(state) > self._group_limit():
+            self._spill(state)
+        return state
+
+    def _value(self, group: _Group, agg: Aggregate) -> Any:
+        if agg.op == "count":
+            return group.count
+        assert agg.column is not None
+        stats = group.series[self._series.index((agg.column, False))]
+        integral = NUMERIC_TYPECODES[agg.column] == "q"
+        if agg.op == "sum":
+            return int(stats.acc.exact_total()) if integral else stats.sum
+        if agg.op == "mean":
+            return stats.mean
+        if agg.op == "stddev":
+            squares = group.series[self._series.index((agg.column, True))]
+            return _stddev(group.count, stats, squares)
+        value = stats.min if agg.op == "min" else stats.max
+        # NumPy-бэкенд возвращает float и для целых колонок
+        return int(value) if integral and value is not None else value
+
+    def _record(self, key: Any, group: _Group) -> Dict[str, Any]:
+        parts = (key,) if len(self.group_by) == 1 else key
+        record = {k.column: k.label(v) for k, v in zip(self.group_by, parts)}
+        for agg in self.aggregates:
+            record[agg.title] = self._value(group, agg)
+        return record
+
+    def finalize(self, state: GroupByState) -> List[Dict[str, Any]]:
+        if state.runs:
+            return self._finalize_spilled(state)  # type: ignore[return-value]
+        if self.top is not None:
+            return self._select_top(state)
+        entries = [(key, self._record(key, group)) for key, group in state.items()]
+        if not self.order_by:
+            entries.sort(key=itemgetter(0))
+        rows = [record for _, record in entries]
+        # Устойчивые сортировки от младшего поля к старшему
+        for title, descending in reversed(self.order_by):
+            rows.sort(key=lambda r: (r[title] is None, r[title]), reverse=descending)
+        return rows
+
+    def _select_top(self, state: GroupByState) -> List[Dict[str, Any]]:
+        """Первые top строк частичной выборкой (heapq, O(n log top)) вместо полной сортировки."""
+        if not self.order_by:
+            return [self._record(key, state[key]) for key in heapq.nsmallest(self.top, state)]
+        # Ранг — порядок первого появления, как у устойчивых сортировок в finalize()
+        records = enumerate(self._record(key, group) for key, group in state.items())
+        return [record for _, record in heapq.nsmallest(self.top, records, key=self._order_key)]
+
+    def _merged_groups(
+        self, runs: Sequence[tuple[str, int]]
+    ) -> Iterator[tuple[int, Dict[str, Any]]]:
+        """(ранг, строка результата) по возрастанию ключа: части групп из серий слиты."""
+        for key, rank, group in _merge_runs(runs):
+            yield rank, self._record(key, group)
+
+    def _order_key(self, item: tuple[int, Dict[str, Any]]) -> tuple[Any, ...]:
+        """Ключ внешней сортировки и выборки top: поля order_by, затем ранг появления."""
+        rank, record = item
+        key: list[Any] = []
+        for title, descending in self.order_by:
+            value = record[title]
+            if not descending:
+                key.append((value is None, value))
+            elif value is None:
+                key.append((0, 0))  # None — первым, как в reverse-сортировке в памяти
+            elif isinstance(value, (int, float)):
+                key.append((1, -value))  # без _Descending: сравнение кортежей остаётся в C
+            else:
+                key.append(_Descending((False, value)))
+        key.append(rank)
+        return tuple(key)
+
+    def _finalize_spilled(self, state: GroupByState) -> Union[list, spill.SpilledRows]:
+        """Результат по сериям на диске: слияние по ключу и внешняя сортировка по order_by."""
+        self._spill(state)
+        runs = _compact_runs(state.runs)
+        paths = [path for path, _ in runs]
+        state.runs = []
+        if self.top is not None:
+            # Выборка из потока слияния: в памяти не больше top строк, серии больше не нужны
+            try:
+                if not self.order_by:
+                    return list(islice(map(itemgetter(1), self._merged_groups(runs)), self.top))
+                top = heapq.nsmallest(self.top, self._merged_groups(runs), key=self._order_key)
+                return [record for _, record in top]
+            finally:
+                spill.remove_runs(paths)
+        if not self.order_by:
+            # Серии уже упорядочены по ключу: строки отдаются потоком прямо из них
+            return spill.SpilledRows(paths, lambda: map(itemgetter(1), self._merged_groups(runs)))
+        assert self.memory_limit is not None
+        per_record = _RECORD_BYTES + _CELL_BYTES * len(self.headers())
+        try:
+            return spill.external_sort(
+                self._merged_groups(runs),
+                key=self._order_key,
+                chunk_size=max(self.memory_limit // per_record, 1),
+                project=itemgetter(1),
+            )
+        finally:
+            spill.remove_runs(paths)
+
+
+def groupby_report(
+    name: str,
+    group_by: Union[str, Sequence[GroupKey]],
+    aggregates: Union[str, Sequence[Aggregate]],
+    order_by: Sequence[tuple[str, bool]] = (),
+    register: bool = True,
+) -> type[GroupByReport]:
+    """
+    Объявляет отчёт-группировку без собственного кода.
+
+    Пример (модуль плагина, объявленный через entry point):
+        TeamReport = groupby_report("teams", "team", "count,mean:performance")
+
+    Parameters
+    ----------
+    name : str
+        Имя отчёта в реестре.
+    group_by, aggregates
+        Ключи и агрегаты: строки в формате --group-by / --agg или готовые спецификации.
+    order_by : Sequence[tuple[str, bool]]
+        Сортировка строк по заголовкам результата: (заголовок, по убыванию).
+    register : bool
+        Зарегистрировать класс в общем реестре.
+
+    Raises
+    ------
+    InvalidArguments
+        Некорректные ключи или агрегаты.
+    """
+    keys = parse_group_by(group_by) if isinstance(group_by, str) else tuple(group_by)
+    aggs = parse_aggregates(aggregates) if isinstance(aggregates, str) else tuple(aggregates)
+    _validate(keys, aggs)
+    namespace = {
+        "name": name,
+        "group_by": keys,
+        "aggregates": aggs,
+        "order_by": tuple(order_by),
+        "_declarative": True,
+        "__module__": __name__,
+    }
+    cls = type(f"GroupByReport[{name}]", (GroupByReport,), namespace)
+    return registry.register(cls) if register else cls  # type: ignore[return-value]
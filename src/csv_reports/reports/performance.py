@@ -6,35 +6,21 @@
 - сортировка по убыванию средней эффективности
 Результат: список словарей {"position": str, "performance": float}
 (округление выполняется на этапе рендера).
+
+Отчёт объявлен декларативно поверх GroupByReport (см. groupby.py): состояние —
+{position: группа с точной суммой}, т.е. память пропорциональна числу должностей.
+Порядок групп в состоянии — порядок первого появления должности, он же определяет
+порядок при равных средних.
 """
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Any, Dict, List, Sequence
-
-from .base import Report
-from ..models import EmployeeRow
+from .groupby import Aggregate, GroupByReport, GroupKey
 from .registry import registry
 
 
 @registry.register
-class PerformanceReport(Report):
+class PerformanceReport(GroupByReport):
     name = "performance"
-
-    def headers(self) -> list[str]:
-        return ["position", "performance"]
-
-    def run(self, rows: Sequence[EmployeeRow]) -> List[Dict[str, Any]]:
-        buckets: dict[str, list[float]] = defaultdict(list)
-
-        for r in rows:
-            buckets[r["position"]].append(r["performance"])
-
-        aggregates: List[Dict[str, Any]] = []
-        for position, values in buckets.items():
-            mean_value = sum(values) / len(values)
-            aggregates.append({"position": position, "performance": float(mean_value)})
-
-        # Сортировка по убыванию средней эффективности
-        aggregates.sort(key=lambda x: x["performance"], reverse=True)
-        return aggregates
+    group_by = (GroupKey("position"),)
+    aggregates = (Aggregate("mean", "performance", header="performance"),)
+    order_by = (("performance", True),)
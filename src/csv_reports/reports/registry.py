@@ -11,22 +11,63 @@
         ...
 
 CLI получает список доступных отчётов через registry.choices().
+
+Модули отчётов импортируются лениво: реестр знает имена из лёгкого манифеста
+(встроенные отчёты, BUILTIN_REPORTS) и из entry points группы "csv_reports.reports"
+установленных пакетов, а класс импортирует только при get(name). Плагин объявляет
+отчёт в своём pyproject.toml:
+
+    [project.entry-points."csv_reports.reports"]
+    myreport = "my_package.reports:MyReport"
+
+Entry points читаются (importlib.metadata) только когда имени нет в манифесте
+или нужен полный список отчётов.
 """
 from __future__ import annotations
 
-from typing import Dict, List, Type
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Type
 
-from .base import Report
 from ..errors import ReportNotFound
 
-__all__ = ["ReportRegistry", "registry"]
+if TYPE_CHECKING:
+    # base тянет models и typing-конструкции; для списка имён он не нужен
+    from .base import Report
+
+__all__ = ["ReportRegistry", "registry", "BUILTIN_REPORTS", "ENTRY_POINT_GROUP"]
+
+ENTRY_POINT_GROUP = "csv_reports.reports"
+
+# Манифест встроенных отчётов: имя -> "модуль:класс"
+BUILTIN_REPORTS: Dict[str, str] = {
+    "performance": "csv_reports.reports.performance:PerformanceReport",
+}
+
+
+def _load_target(target: str) -> object:
+    module_name, _, attr = target.partition(":")
+    obj: object = import_module(module_name)
+    for part in filter(None, attr.split(".")):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _discover_entry_points() -> Dict[str, str]:
+    from importlib.metadata import entry_points
+
+    return {ep.name: ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
 
 
 class ReportRegistry:
-    """Хранилище соответствий <имя отчёта> -> <класс отчёта>."""
+    """Хранилище соответствий <имя отчёта> -> <класс отчёта> (или его ленивой цели)."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self, manifest: Optional[Mapping[str, str]] = None, entry_points: bool = False
+    ) -> None:
         self._registry: Dict[str, Type[Report]] = {}
+        self._lazy: Dict[str, str] = dict(manifest or {})
+        self._use_entry_points = entry_points
+        self._discovered = False
 
     def register(self, cls: Type[Report]) -> Type[Report]:
         """
@@ -37,6 +78,8 @@ class ReportRegistry:
         - у класса должно быть непустое поле `name`;
         - имя должно быть уникальным в пределах реестра.
         """
+        from .base import Report
+
         if not issubclass(cls, Report):
             raise TypeError("Можно регистрировать только подклассы Report")
 
@@ -50,16 +93,50 @@ class ReportRegistry:
         self._registry[name] = cls
         return cls
 
+    def _discover(self) -> None:
+        """Однократно дополняет ленивые цели отчётами из entry points."""
+        if self._discovered or not self._use_entry_points:
+            return
+        self._discovered = True
+        for name, target in _discover_entry_points().items():
+            self._lazy.setdefault(name, target)
+
+    def _target(self, name: str) -> Optional[str]:
+        if name not in self._lazy:
+            self._discover()
+        return self._lazy.get(name)
+
     def get(self, name: str) -> Type[Report]:
         """Возвращает класс отчёта по его machine-id или бросает ReportNotFound."""
-        try:
-            return self._registry[name]
-        except KeyError as exc:
-            raise ReportNotFound(f"Отчёт '{name}' не найден") from exc
+        cls = self._registry.get(name)
+        if cls is not None:
+            return cls
+        target = self._target(name)
+        if target is None:
+            raise ReportNotFound(f"Отчёт '{name}' не найден")
+
+        # Импорт модуля обычно сам регистрирует класс декоратором @registry.register
+        loaded = _load_target(target)
+        cls = self._registry.get(name)
+        if cls is None:
+            from .base import Report
+
+            if not (isinstance(loaded, type) and issubclass(loaded, Report)):
+                raise TypeError(f"Цель '{target}' отчёта '{name}' не является подклассом Report")
+            if loaded.name != name:
+                raise ValueError(
+                    f"Отчёт '{target}' объявлен как '{name}', но его name = '{loaded.name}'"
+                )
+            cls = self._registry[name] = loaded
+        return cls
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and (name in self._registry or self._target(name) is not None)
 
     def choices(self) -> List[str]:
         """Список доступных имён отчётов (для CLI choices)."""
-        return sorted(self._registry.keys())
+        self._discover()
+        return sorted(self._registry.keys() | self._lazy.keys())
 
 
-registry = ReportRegistry()
+registry = ReportRegistry(BUILTIN_REPORTS, entry_points=True)
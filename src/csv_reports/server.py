@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+Долгоживущий сервер отчётов (`csv-reports serve`).
+
+Сервер один раз разбирает настроенные CSV в колоночные EmployeeTable и держит их
+в памяти; запросы считают отчёты по готовым таблицам (service.build_reports_from_tables),
+без повторного импорта пакета и разбора файлов.
+
+- Транспорт: HTTP/1.1 поверх asyncio (TCP или Unix-сокет), только GET, keep-alive.
+- GET /report?report=NAME[,NAME...]&files=PATH[,PATH...]&format=FMT&where=EXPR — отчёт;
+  files — подмножество настроенных файлов (по умолчанию все), format — один из
+  output.FORMATS (по умолчанию json), where — фильтр строк (см. filters.py).
+  Файлы вне конфигурации не читаются.
+- GET /reports — доступные отчёты; GET /health — загруженные файлы и версия данных.
+
+Данные — неизменяемый снимок (DataSet): все запросы используют один и тот же снимок,
+перезагрузка собирает новый и подменяет ссылку целиком. Файлы проверяются по размеру
+и mtime раз в poll_interval секунд; изменённые файлы разбираются заново в потоке,
+не блокируя цикл событий. Если файл не удалось перечитать, остаётся прежняя версия.
+
+Расчёт отчёта идёт в пуле потоков; одинаковые одновременные запросы к одной версии
+данных разделяют один расчёт, а готовые ответы запоминаются до следующей перезагрузки.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import ParsedFileCache
+from .errors import CsvReportsError, InvalidArguments, ReportNotFound
+from .filters import RowFilter, compile_filter
+from .io import read_csv_table
+from .models import EmployeeTable
+from .output import FORMATS, write_results
+from .reports.registry import registry
+from .service import build_reports_from_tables
+
+__all__ = ["ReportServer", "DataSet", "CONTENT_TYPES", "DEFAULT_FORMAT"]
+
+DEFAULT_FORMAT = "json"
+
+CONTENT_TYPES: dict[str, str] = {
+    "table": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+}
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# Сколько готовых ответов хранить для текущей версии данных
+_MAX_MEMO = 128
+
+# Отпечаток файла для наблюдения: (размер, mtime_ns)
+Fingerprint = tuple[int, int]
+
+
+class DataSet:
+    """Неизменяемый снимок загруженных данных: таблицы в порядке настроенных файлов."""
+
+    __slots__ = ("version", "tables", "fingerprints", "loaded_at")
+
+    def __init__(
+        self,
+        version: int,
+        tables: dict[Path, EmployeeTable],
+        fingerprints: dict[Path, Fingerprint],
+    ) -> None:
+        self.version = version
+        self.tables = tables
+        self.fingerprints = fingerprints
+        self.loaded_at = time.time()
+
+
+def _fingerprint(path: Path) -> Fingerprint:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class ReportServer:
+    """
+    Сервер отчётов по набору CSV-файлов, загруженных в память.
+
+    Parameters
+    ----------
+    files : Sequence[Path]
+        CSV-файлы, которые сервер загружает и отдаёт; порядок задаёт порядок слияния.
+    cache : ParsedFileCache | None
+        Кэш разобранных файлов для (пере)загрузки; None — всегда разбирать CSV.
+    poll_interval : float
+        Период проверки файлов на изменения в секундах; 0 — не следить за файлами.
+    """
+
+    def __init__(
+        self,
+        files: Sequence[Path],
+        cache: Optional[ParsedFileCache] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        if not files:
+            raise InvalidArguments("Серверу нужен хотя бы один файл")
+        self.files = list(dict.fromkeys(files))
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self._by_resolved = {p.resolve(): p for p in self.files}
+        self._data: Optional[DataSet] = None
+        self._reload_lock = asyncio.Lock()
+        self._memo: dict[tuple[Any, ...], asyncio.Future[bytes]] = {}
+        # Версии файлов, которые не удалось перечитать: повторно не пробуем до новой записи
+        self._failed: dict[Path, Fingerprint] = {}
+
+    # --- данные ---
+
+    @property
+    def data(self) -> DataSet:
+        if self._data is None:
+            raise RuntimeError("Данные ещё не загружены: вызовите load()")
+        return self._data
+
+    def _read(self, path: Path) -> tuple[EmployeeTable, Fingerprint]:
+        # Отпечаток снимается до чтения: запись во время разбора заметит следующая проверка
+        fingerprint = _fingerprint(path)
+        return read_csv_table([path], cache=self.cache), fingerprint
+
+    def load(self) -> DataSet:
+        """
+        Синхронно загружает все файлы (при старте).
+
+        Raises
+        ------
+        DataReadError, ValidationError
+            Файл не удалось прочитать или разобрать.
+        """
+        tables: dict[Path, EmployeeTable] = {}
+        fingerprints: dict[Path, Fingerprint] = {}
+        for path in self.files:
+            tables[path], fingerprints[path] = self._read(path)
+        self._swap(DataSet(1, tables, fingerprints))
+        return self.data
+
+    def _swap(self, data: DataSet) -> None:
+        self._data = data
+        self._memo.clear()
+
+    def _changed(self, data: DataSet) -> list[Path]:
+        changed = []
+        for path in self.files:
+            try:
+                fingerprint = _fingerprint(path)
+            except OSError:
+                continue  # файл удалён или недоступен — отдаём последнюю версию
+            if fingerprint != data.fingerprints[path] and fingerprint != self._failed.get(path):
+                changed.append(path)
+        return changed
+
+    async def refresh(self) -> bool:
+        """Перечитывает изменившиеся файлы; True, если данные обновились."""
+        async with self._reload_lock:
+            data = self.data
+            changed = await asyncio.to_thread(self._changed, data)
+            if not changed:
+                return False
+            tables = dict(data.tables)
+            fingerprints = dict(data.fingerprints)
+            reloaded = False
+            for path in changed:
+                try:
+                    tables[path], fingerprints[path] = await asyncio.to_thread(self._read, path)
+                except CsvReportsError as e:
+                    print(f"Ошибка перезагрузки {path}: {e}", file=sys.stderr)
+                    with suppress(OSError):
+                        self._failed[path] = _fingerprint(path)
+                else:
+                    self._failed.pop(path, None)
+                    reloaded = True
+            if not reloaded:
+                return False
+            self._swap(DataSet(data.version + 1, tables, fingerprints))
+            return True
+
+    async def watch(self) -> None:
+        """Бесконечный цикл проверки файлов (фоновая задача serve())."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self.refresh()
+
+    # --- отчёты ---
+
+    def _resolve_files(self, names: Optional[str]) -> tuple[Path, ...]:
+        if not names:
+            return tuple(self.files)
+        selected = []
+        for name in filter(None, (n.strip() for n in names.split(","))):
+            path = self._by_resolved.get(Path(name).resolve())
+            if path is None:
+                raise InvalidArguments(f"Файл не обслуживается сервером: {name}")
+            selected.append(path)
+        return tuple(dict.fromkeys(selected))
+
+    def _compute(
+        self,
+        data: DataSet,
+        report_names: tuple[str, ...],
+        files: tuple[Path, ...],
+        fmt: str,
+        where: Optional[RowFilter],
+    ) -> bytes:
+        tables = (data.tables[p] for p in files)
+        results = build_reports_from_tables(report_names, tables, where)
+        buffer = io.StringIO()
+        write_results(results, buffer, fmt)
+        return buffer.getvalue().encode("utf-8")
+
+    async def render(
+        self,
+        report_names: Sequence[str],
+        files: Optional[str] = None,
+        fmt: str = DEFAULT_FORMAT,
+        where: Optional[str] = None,
+    ) -> bytes:
+        """
+        Отчёт(ы) по текущему снимку данных в формате fmt; where — выражение фильтра строк.
+
+        Raises
+        ------
+        InvalidArguments
+            Неизвестный формат, пустой список отчётов, файл вне конфигурации
+            или некорректный фильтр.
+        ReportNotFound
+            Отчёт не зарегистрирован.
+        """
+        if fmt not in FORMATS:
+            raise InvalidArguments(f"Неизвестный формат вывода '{fmt}'")
+        names = tuple(dict.fromkeys(report_names))
+        if not names:
+            raise InvalidArguments("Не указан параметр report")
+        if fmt == "csv" and len(names) > 1:
+            raise InvalidArguments("Формат csv поддерживает один отчёт; используйте jsonl или json")
+        for name in names:
+            if name not in registry:
+                raise ReportNotFound(f"Отчёт '{name}' не найден")
+        selected = self._resolve_files(files)
+        expression = where.strip() if where else ""
+        row_filter = compile_filter(expression) if expression else None
+
+        data = self.data
+        key = (data.version, names, selected, fmt, expression)
+        future = self._memo.get(key)
+        if future is None:
+            # Первый запрос считает, одновременные одинаковые ждут тот же результат
+            future = asyncio.ensure_future(
+                asyncio.to_thread(self._compute, data, names, selected, fmt, row_filter)
+            )
+            if self._data is data:
+                if len(self._memo) >= _MAX_MEMO:
+                    self._memo.pop(next(iter(self._memo)))
+                self._memo[key] = future
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._memo.get(key) is future:
+                del self._memo[key]
+            raise
+
+    def health(self) -> dict[str, Any]:
+        data = self.data
+        return {
+            "status": "ok",
+            "version": data.version,
+            "loaded_at": data.loaded_at,
+            "files": [{"path": str(p), "rows": len(t)} for p, t in data.tables.items()],
+        }
+
+    # --- HTTP ---
+
+    async def _dispatch(self, method: str, target: str) -> tuple[int, str, bytes]:
+        if method != "GET":
+            return _error(405, "Поддерживается только GET")
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/report":
+                fmt = query.get("format", DEFAULT_FORMAT)
+                names = [n.strip() for n in query.get("report", "").split(",") if n.strip()]
+                body = await self.render(names, query.get("files"), fmt, query.get("where"))
+                return 200, CONTENT_TYPES[fmt], body
+            if url.path == "/reports":
+                return _json(200, {"reports": registry.choices()})
+            if url.path == "/health":
+                return _json(200, self.health())
+        except ReportNotFound as e:
+            return _error(404, str(e))
+        except InvalidArguments as e:
+            return _error(400, str(e))
+        except CsvReportsError as e:
+            return _error(500, str(e))
+        except Exception as e:
+            # Ошибка в коде отчёта (например, подключаемого): клиент всё равно получает ответ
+            print(f"Ошибка обработки запроса {target}:", file=sys.stderr)
+            traceback.print_exception(e, file=sys.stderr)
+            return _error(500, f"Внутренняя ошибка сервера: {type(e).__name__}")
+        return _error(404, f"Неизвестный путь: {url.path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обслуживает одно соединение: последовательные запросы, пока клиент не закроет его."""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = await _read_headers(reader)
+                    method, target, version = request_line.decode("latin-1").split()
+                except (ValueError, UnicodeDecodeError):
+                    # Слишком длинная строка или не HTTP: отвечаем и закрываем соединение
+                    status, content_type, body = _error(400, "Некорректный HTTP-запрос")
+                    writer.write(_response(status, content_type, body, keep_alive=False))
+                    await writer.drain()
+                    break
+
+                status, content_type, body = await self._dispatch(method, target)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection") != "close"
+                writer.write(_response(status, content_type, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[Path] = None
+    ) -> asyncio.AbstractServer:
+        """Открывает сокет (Unix-сокет, если задан socket_path) и возвращает asyncio-сервер."""
+        if self._data is None:
+            await asyncio.to_thread(self.load)
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle, path=str(socket_path))
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(
+        self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[Path] = None
+    ) -> None:
+        """Запускает сервер и наблюдение за файлами; работает до отмены."""
+        server = await self.start(host, port, socket_path)
+        watcher = asyncio.create_task(self.watch()) if self.poll_interval > 0 else None
+        where = socket_path or ", ".join(
+            "{}:{}".format(*sock.getsockname()[:2]) for sock in server.sockets
+        )
+        print(
+            f"csv-reports: {sum(map(len, self.data.tables.values())):,} строк "
+            f"из {len(self.files)} файл(ов), слушаю {where}",
+            file=sys.stderr,
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+
+def _json(status: int, payload: Any) -> tuple[int, str, bytes]:
+    body = json.dumps(payload, ensure_ascii=False, indent=2) + "\n"
+    return status, CONTENT_TYPES["json"], body.encode("utf-8")
+
+
+def _error(status: int, message: str) -> tuple[int, str, bytes]:
+    return _json(status, {"error": message})
+
+
+def _response(status: int, content_type: str, body: bytes, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
@@ -1,24 +1,65 @@
 # -*- coding: utf-8 -*-
 """
 Координирующий слой: чтение данных -> выбор отчёта -> расчёт -> возврат заголовков и строк.
+
+build_reports() считает несколько отчётов за один проход по файлам;
+build_reports_from_tables() — то же по уже загруженным таблицам (режим serve).
 """
 from __future__ import annotations
 
+from itertools import islice
 from pathlib import Path
-from typing import Tuple
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional, Sequence, Union
 
-from .io import read_csv_files
+from . import stats
+from .cache import ParsedFileCache
+from .models import EmployeeTable
+from .parallel import aggregate_files
+from .reports.base import Report
+from .reports.composite import CompositeReport
 from .reports.registry import registry
 
+if TYPE_CHECKING:
+    from .dedupe import Deduplicator
+    from .filters import RowFilter
+    from .rejects import RejectSink
+
+__all__ = [
+    "build_report",
+    "build_reports",
+    "build_reports_from_tables",
+    "prepare_reports",
+    "finalize_reports",
+    "ReportResult",
+    "ReportSpec",
+]
+
+# (имя отчёта, заголовки, строки)
+ReportResult = tuple[str, list[str], list[dict]]
+
+# Имя зарегистрированного отчёта или готовый экземпляр (например, GroupByReport из CLI)
+ReportSpec = Union[str, Report]
 
-def build_report(report_name: str, files: list[Path]) -> tuple[list[str], list[dict]]:
+
+def build_report(
+    report_name: str,
+    files: list[Path],
+    jobs: int = 1,
+    cache: ParsedFileCache | None = None,
+    where: RowFilter | None = None,
+    dedupe: Deduplicator | None = None,
+    rejects: RejectSink | None = None,
+) -> tuple[list[str], list[dict]]:
     """
     Формирует отчёт из одного или нескольких CSV-файлов.
 
     Порядок шагов:
-    1) Читаем и нормализуем данные из всех переданных файлов.
-    2) Получаем класс отчёта из реестра по имени.
-    3) Вычисляем данные отчёта.
+    1) Получаем класс отчёта из реестра по имени.
+    2) Читаем и нормализуем данные из всех переданных файлов, передавая строки
+       в состояние отчёта по мере разбора (create_state -> update_batch).
+       При jobs > 1 файлы разбираются в пуле процессов, частичные состояния
+       сливаются через merge() в порядке файлов.
+    3) Финализируем состояние в строки отчёта.
     4) Возвращаем заголовки и строки для дальнейшего рендера.
 
     Parameters
@@ -27,6 +68,21 @@ def build_report(report_name: str, files: list[Path]) -> tuple[list[str], list[d
         Машинное имя отчёта (например, "performance").
     files : list[Path]
         Пути к CSV-файлам.
+    jobs : int
+        Число процессов для разбора файлов (1 — без параллелизма, 0 — по числу CPU).
+    cache : ParsedFileCache | None
+        Кэш разобранных файлов; неизменённые файлы не разбираются повторно.
+    where : RowFilter | None
+        Фильтр строк (filters.compile_filter): отчёт считается только по прошедшим
+        строкам. Применяется при разборе, до приведения остальных колонок.
+    dedupe : Deduplicator | None
+        Удаление повторяющихся записей между файлами (dedupe.Deduplicator): повторы
+        ключа среди прошедших where строк не учитываются. Файлы читаются
+        последовательно, jobs не используется.
+    rejects : RejectSink | None
+        Сток некорректных строк (rejects.RejectSink, --on-error skip|quarantine): такие
+        строки пропускаются (и записываются в файл), а не прерывают расчёт
+        с ValidationError; None — прервать на первой.
 
     Returns
     -------
@@ -34,12 +90,139 @@ def build_report(report_name: str, files: list[Path]) -> tuple[list[str], list[d
         Кортеж (headers, rows), где headers — заголовки таблицы,
         rows — список словарей со значениями по колонкам.
     """
-    rows = read_csv_files(files)
+    [(_, headers, data)] = build_reports(
+        [report_name], files, jobs=jobs, cache=cache, where=where, dedupe=dedupe, rejects=rejects
+    )
+    return headers, data
 
-    report_cls = registry.get(report_name)
-    report = report_cls()
 
-    headers = report.headers()
-    data = report.run(rows)
+def build_reports(
+    report_names: Sequence[ReportSpec],
+    files: list[Path],
+    jobs: int = 1,
+    cache: ParsedFileCache | None = None,
+    sizes: Optional[Mapping[Path, int]] = None,
+    where: RowFilter | None = None,
+    dedupe: Deduplicator | None = None,
+    memory_limit: Optional[int] = None,
+    top: Optional[int] = None,
+    rejects: RejectSink | None = None,
+) -> list[ReportResult]:
+    """
+    Формирует несколько отчётов за одно чтение файлов.
 
-    return headers, data
+    Все отчёты объединяются в CompositeReport: каждая разобранная строка раздаётся
+    всем отчётам, а читатель разбирает объединение нужных им колонок.
+    Повторяющиеся имена учитываются один раз; порядок результатов — порядок имён.
+
+    Parameters
+    ----------
+    report_names : Sequence[str | Report]
+        Машинные имена отчётов или готовые экземпляры (сопоставляются по report.name).
+    files, jobs, cache, where, dedupe, rejects
+        Как в build_report().
+    sizes : Mapping[Path, int] | None
+        Известные размеры файлов для планировщика parallel (без повторного stat()).
+    memory_limit : int | None
+        Бюджет памяти состояний отчётов, байт (делится между отчётами поровну).
+        Отчёты со сбросом на диск (GroupByReport) при превышении пишут части состояния
+        во временные файлы; их строки тогда могут быть не списком, а повторно
+        итерируемым потоком с диска (spill.SpilledRows).
+    top : int | None
+        Только первые top строк каждого отчёта (в порядке отчёта); отчёты с порядком
+        строк (GroupByReport) отбирают их частичной выборкой, без полной сортировки.
+
+    Returns
+    -------
+    list[tuple[str, list[str], list[dict]]]
+        Для каждого отчёта — (имя, заголовки, строки).
+
+    Raises
+    ------
+    ReportNotFound
+        Одно из имён не зарегистрировано (до чтения файлов).
+    """
+    names, reports, target = prepare_reports(report_names, memory_limit, top)
+    state = aggregate_files(
+        target,
+        files,
+        jobs=jobs,
+        cache=cache,
+        sizes=sizes,
+        where=where,
+        dedupe=dedupe,
+        rejects=rejects,
+    )
+    return finalize_reports(names, reports, target, state)
+
+
+def build_reports_from_tables(
+    report_names: Sequence[ReportSpec],
+    tables: Iterable[EmployeeTable],
+    where: RowFilter | None = None,
+    top: Optional[int] = None,
+) -> list[ReportResult]:
+    """
+    Формирует отчёты по уже загруженным колоночным таблицам (без чтения файлов).
+
+    Таблицы учитываются через update_table() в переданном порядке, поэтому результат
+    совпадает с build_reports() по тем же файлам. Таблицы не изменяются, и их можно
+    использовать из нескольких потоков одновременно; фильтр where отбирает строки
+    в новые таблицы (RowFilter.select).
+
+    Raises
+    ------
+    ReportNotFound
+        Одно из имён не зарегистрировано.
+    """
+    names, reports, target = prepare_reports(report_names, top=top)
+    state = target.create_state()
+    for table in tables:
+        if where is not None:
+            table = where.select(table)
+        state = target.update_table(state, table)
+    return finalize_reports(names, reports, target, state)
+
+
+def prepare_reports(
+    report_names: Sequence[ReportSpec],
+    memory_limit: Optional[int] = None,
+    top: Optional[int] = None,
+) -> tuple[list[str], list[Report], Report]:
+    """
+    Имена без повторов, экземпляры отчётов и отчёт, который считает их все
+    (для собственных циклов расчёта, например watch.TailAggregator).
+    """
+    by_name: dict[str, ReportSpec] = {}
+    for spec in report_names:
+        by_name.setdefault(spec if isinstance(spec, str) else spec.name, spec)
+    names = list(by_name)
+    reports = [
+        registry.get(spec)() if isinstance(spec, str) else spec for spec in by_name.values()
+    ]
+    if memory_limit is not None:
+        for report in reports:
+            report.memory_limit = max(memory_limit // len(reports), 1)
+    for report in reports:
+        report.top = top
+    # Один отчёт считаем напрямую: его собственный update_batch() может быть быстрее
+    target = reports[0] if len(reports) == 1 else CompositeReport(reports)
+    return names, reports, target
+
+
+def finalize_reports(
+    names: list[str], reports: list[Report], target: Report, state: Any
+) -> list[ReportResult]:
+    """Результаты отчётов из prepare_reports() по итоговому состоянию state отчёта target."""
+    with stats.stage("report.finalize"):
+        results = [target.finalize(state)] if len(reports) == 1 else target.finalize(state)
+    return [
+        (name, r.headers(), _head(data, r.top)) for name, r, data in zip(names, reports, results)
+    ]
+
+
+def _head(rows: Iterable[Any], top: Optional[int]) -> Iterable[Any]:
+    """Первые top строк: отчёты без частичной выборки считают все строки и обрезаются здесь."""
+    if top is None or (isinstance(rows, list) and len(rows) <= top):
+        return rows
+    return list(islice(rows, top))
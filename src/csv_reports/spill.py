@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Отсортированные серии на диске и их слияние — для отчётов с бюджетом памяти (--memory-limit).
+
+Серия — временный файл с записями, уже упорядоченными по ключу: поток пакетов pickle
+по _BATCH записей. Серии сливаются потоково (heapq.merge, k-way), поэтому в памяти
+одновременно находится по одному пакету на серию; больше MAX_FAN_IN серий сливаются
+в несколько уровней (ограничение на число открытых файлов).
+
+external_sort() сортирует поток записей: пока записи помещаются в chunk_size, сортировка
+идёт в памяти (и возвращается список), иначе отсортированные части сбрасываются
+в серии, а результат — SpilledRows: повторно итерируемый объект, каждый проход которого
+заново сливает серии с диска (табличному рендеру нужно два прохода: ширины и вывод).
+Файлы серий удаляются, когда SpilledRows больше не используется (или при close()).
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import pickle
+import tempfile
+import weakref
+from contextlib import suppress
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+__all__ = [
+    "MAX_FAN_IN",
+    "SpilledRows",
+    "external_sort",
+    "read_run",
+    "remove_runs",
+    "write_run",
+]
+
+# Записей в одном пакете pickle
+_BATCH = 1024
+# Серий в одном слиянии (открытых файлов); больше — слияние в несколько уровней
+MAX_FAN_IN = 64
+
+
+def write_run(records: Iterable[Any], tmp_dir: Optional[str] = None) -> str:
+    """Пишет записи (уже в нужном порядке) во временный файл серии; возвращает его путь."""
+    fd, path = tempfile.mkstemp(prefix="csv-reports-run-", suffix=".pickle", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= _BATCH:
+                    pickle.dump(batch, fh, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, fh, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        remove_runs([path])
+        raise
+    return path
+
+
+def read_run(path: str) -> Iterator[Any]:
+    """Записи серии по порядку."""
+    with open(path, "rb") as fh:
+        while True:
+            try:
+                batch = pickle.load(fh)
+            except EOFError:
+                return
+            yield from batch
+
+
+def remove_runs(paths: Iterable[str]) -> None:
+    for path in paths:
+        with suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+class SpilledRows:
+    """
+    Строки результата, собранные из серий на диске.
+
+    Каждый вызов iter() заново читает серии через produce(); файлы paths удаляются
+    при close() или когда объект больше не используется.
+    """
+
+    def __init__(self, paths: Iterable[str], produce: Callable[[], Iterator[Any]]) -> None:
+        self._produce = produce
+        self._finalizer = weakref.finalize(self, remove_runs, list(paths))
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._produce()
+
+    def __bool__(self) -> bool:
+        # Серии создаются только из непустых частей
+        return True
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def external_sort(
+    records: Iterable[Any],
+    key: Callable[[Any], Any],
+    chunk_size: int,
+    project: Callable[[Any], Any] = lambda record: record,
+) -> Union[list[Any], SpilledRows]:
+    """
+    Записи, отсортированные по key (устойчиво) и преобразованные project: список,
+    если все они уместились в chunk_size, иначе SpilledRows поверх отсортированных серий.
+    """
+    runs: list[str] = []
+    chunk: list[Any] = []
+    try:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                chunk.sort(key=key)
+                runs.append(write_run(chunk))
+                chunk = []
+    except BaseException:
+        remove_runs(runs)
+        raise
+    chunk.sort(key=key)
+    if not runs:
+        return list(map(project, chunk))
+    if chunk:
+        runs.append(write_run(chunk))
+    # heapq.merge устойчив между сериями: при равных ключах раньше идёт более ранняя
+    # серия, поэтому соседние серии сливаются группами с сохранением их порядка
+    while len(runs) > MAX_FAN_IN:
+        merged = []
+        try:
+            for i in range(0, len(runs), MAX_FAN_IN):
+                group = runs[i : i + MAX_FAN_IN]
+                merged.append(write_run(heapq.merge(*map(read_run, group), key=key)))
+                remove_runs(group)
+        except BaseException:
+            remove_runs(runs + merged)
+            raise
+        runs = merged
+    return SpilledRows(runs, lambda: map(project, heapq.merge(*map(read_run, runs), key=key)))
+
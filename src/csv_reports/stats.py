@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Инструментирование запуска: время по стадиям, строки и байты по файлам, пиковая память.
+
+Сбор включается контекстом collect(); вне его все точки замера (stage(), track_rows())
+сводятся к проверке одной глобальной переменной и ничего не стоят на строку.
+
+Стадии:
+- "read"             — получение очередной порции данных: открытие файла, таблица из кэша;
+- "read.parse"       — время внутри csv.reader и приведения типов (строки разбираются
+                       лениво, пока их потребляет отчёт); CPU-часы на каждую строку
+                       слишком дороги, поэтому CPU разбора — оценка: доля CPU за время
+                       жизни итератора строк, пропорциональная wall-времени разбора;
+- "report.update"    — обновление состояния отчёта (без разбора строк);
+- "cache.load"       — чтение записи кэша разобранных файлов;
+- "report.merge"     — слияние частичных состояний из рабочих процессов;
+- "report.finalize"  — финализация состояния в строки отчёта;
+- "render"           — форматирование таблицы.
+Время стадии — собственное: вложенные стадии из него вычитаются.
+
+Отклонённые строки (--on-error skip|quarantine) считаются по файлам (record_error()).
+
+Рабочие процессы (--jobs) собирают свою статистику и возвращают её вместе с частичным
+состоянием; родитель сливает её через RunStats.merge().
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Any, ContextManager, Iterator, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+__all__ = [
+    "RunStats",
+    "StageStats",
+    "FileStats",
+    "collect",
+    "current",
+    "stage",
+    "track_rows",
+    "record_file",
+    "record_error",
+    "peak_rss_mb",
+]
+
+T = TypeVar("T")
+
+_NULL: ContextManager[None] = nullcontext()
+
+
+class StageStats:
+    """Накопленное собственное время стадии."""
+
+    __slots__ = ("wall", "cpu", "calls")
+
+    def __init__(self, wall: float = 0.0, cpu: Optional[float] = 0.0, calls: int = 0) -> None:
+        self.wall = wall
+        self.cpu = cpu
+        self.calls = calls
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"wall": self.wall, "cpu": self.cpu, "calls": self.calls}
+
+    def add(self, wall: float, cpu: Optional[float]) -> None:
+        self.wall += wall
+        self.cpu = None if cpu is None or self.cpu is None else self.cpu + cpu
+        self.calls += 1
+
+
+class FileStats:
+    """Сводка по одному файлу (или фрагменту файла)."""
+
+    __slots__ = ("path", "source", "rows", "bytes")
+
+    def __init__(self, path: str, source: str, rows: int = 0, nbytes: int = 0) -> None:
+        self.path = path
+        self.source = source  # "csv" | "chunk" | "cache"
+        self.rows = rows
+        self.bytes = nbytes
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"path": self.path, "source": self.source, "rows": self.rows, "bytes": self.bytes}
+
+
+class RunStats:
+    """Статистика одного запуска."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self.files: list[FileStats] = []
+        self.errors: dict[str, int] = {}  # отклонённые строки по файлам
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.finished: Optional[float] = None
+        self._stack: list[list[Any]] = []
+
+    def _stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # [имя, wall на входе, cpu на входе, wall вложенных стадий, cpu вложенных стадий]
+        frame = [name, time.perf_counter(), time.process_time(), 0.0, 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            wall = time.perf_counter() - frame[1]
+            cpu = time.process_time() - frame[2]
+            self._stage(name).add(wall - frame[3], cpu - frame[4])
+            self._charge_parent(wall, cpu)
+
+    def _charge_parent(self, wall: float, cpu: float) -> None:
+        if self._stack:
+            self._stack[-1][3] += wall
+            self._stack[-1][4] += cpu
+
+    def add_file(self, path: Path | str, source: str, rows: int = 0, nbytes: int = 0) -> FileStats:
+        entry = FileStats(str(path), source, rows, nbytes)
+        self.files.append(entry)
+        return entry
+
+    def track_rows(self, rows: Iterator[T], entry: FileStats) -> Iterator[T]:
+        """Считает строки entry и время, проведённое внутри итератора rows."""
+        clock = time.perf_counter
+        started, started_cpu = clock(), time.process_time()
+        spent = 0.0
+        count = 0
+        try:
+            while True:
+                start = clock()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    break
+                finally:
+                    spent += clock() - start
+                count += 1
+                yield row
+        finally:
+            entry.rows += count
+            # CPU разбора: CPU за время жизни итератора в доле wall-времени разбора
+            window = clock() - started
+            cpu = (time.process_time() - started_cpu) * spent / window if window > 0 else 0.0
+            self._stage("read.parse").add(spent, cpu)
+            # Время разбора не входит в собственное время объемлющей стадии
+            self._charge_parent(spent, cpu)
+
+    def merge(self, other: RunStats) -> RunStats:
+        for name, stats in other.stages.items():
+            target = self._stage(name)
+            target.wall += stats.wall
+            target.cpu = None if target.cpu is None or stats.cpu is None else target.cpu + stats.cpu
+            target.calls += stats.calls
+        self.files.extend(other.files)
+        for path, count in other.errors.items():
+            self.errors[path] = self.errors.get(path, 0) + count
+        return self
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Стек открытых стадий процессу-получателю не нужен
+        state = dict(self.__dict__)
+        state["_stack"] = []
+        return state
+
+    # --- сводка ---
+
+    @property
+    def wall(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def rows(self) -> int:
+        return sum(f.rows for f in self.files)
+
+    @property
+    def bytes(self) -> int:
+        return sum(f.bytes for f in self.files)
+
+    def summary(self) -> dict[str, Any]:
+        """Машиночитаемая сводка (для --stats-json)."""
+        wall = self.wall
+        return {
+            "wall_seconds": wall,
+            "cpu_seconds": time.process_time() - self.started_cpu,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "rows_per_s": self.rows / wall if wall else None,
+            "errors": sum(self.errors.values()),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(children=True),
+            "stages": {name: s.as_dict() for name, s in self.stages.items()},
+            "files": [f.as_dict() for f in self.files],
+            "errors_by_file": dict(self.errors),
+        }
+
+    def format(self) -> str:
+        """Человекочитаемая сводка (для --stats)."""
+        data = self.summary()
+        wall = data["wall_seconds"] or 1.0
+        lines = [
+            f"Время: {data['wall_seconds']:.3f} s, строк: {data['rows']:,}, "
+            f"байт: {data['bytes']:,}, скорость: {data['rows_per_s'] or 0:,.0f} rows/s",
+        ]
+        peak, children = data["peak_rss_mb"], data["peak_rss_children_mb"]
+        if peak is not None:
+            lines.append(
+                f"Пиковая память: {peak:.1f} MB"
+                + (f" (рабочие процессы: {children:.1f} MB)" if children else "")
+            )
+        lines.append(f"{'стадия':<18} {'wall, s':>9} {'cpu, s':>9} {'доля':>6} {'вызовов':>8}")
+        for name, s in data["stages"].items():
+            cpu = f"{s['cpu']:9.3f}" if s["cpu"] is not None else f"{'-':>9}"
+            lines.append(
+                f"{name:<18} {s['wall']:9.3f} {cpu} {s['wall'] / wall:6.1%} {s['calls']:>8}"
+            )
+        for f in data["files"]:
+            lines.append(f"{f['path']} [{f['source']}]: {f['rows']:,} строк, {f['bytes']:,} байт")
+        if data["errors"]:
+            lines.append(f"Отклонено некорректных строк: {data['errors']:,}")
+            for path, count in data["errors_by_file"].items():
+                lines.append(f"{path}: {count:,} отклонено")
+        return "\n".join(lines)
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Пиковый RSS текущего процесса (или завершённых дочерних) в мегабайтах."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+_current: Optional[RunStats] = None
+
+
+def current() -> Optional[RunStats]:
+    """Активная статистика или None, если сбор выключен."""
+    return _current
+
+
+@contextmanager
+def collect() -> Iterator[RunStats]:
+    """Включает сбор статистики на время блока (в текущем процессе)."""
+    global _current
+    previous, _current = _current, RunStats()
+    try:
+        yield _current
+    finally:
+        _current.finished = time.perf_counter()
+        _current = previous
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Замер стадии name; без активного сбора — пустой контекст."""
+    if _current is None:
+        return _NULL
+    return _current.stage(name)
+
+
+def _file_size(path: Path | str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def record_file(path: Path | str, source: str, rows: int, nbytes: Optional[int] = None) -> None:
+    """Учитывает уже прочитанный файл (например, взятый из кэша)."""
+    if _current is not None:
+        _current.add_file(path, source, rows, _file_size(path) if nbytes is None else nbytes)
+
+
+def record_error(path: Path | str) -> None:
+    """Учитывает отклонённую строку файла path."""
+    if _current is not None:
+        key = str(path)
+        _current.errors[key] = _current.errors.get(key, 0) + 1
+
+
+def track_rows(
+    rows: Iterator[T], path: Path | str, source: str, nbytes: Optional[int] = None
+) -> Iterator[T]:
+    """
+    Оборачивает итератор строк файла счётчиком; без активного сбора возвращает rows.
+
+    nbytes — объём читаемых данных; None — размер файла path.
+    """
+    if _current is None:
+        return rows
+    entry = _current.add_file(path, source, nbytes=_file_size(path) if nbytes is None else nbytes)
+    return _current.track_rows(rows, entry)
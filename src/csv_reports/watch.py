@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Инкрементальный пересчёт отчётов по дописываемым CSV (режим --watch).
+
+Для каждого файла хранится курсор: идентичность файла (st_dev, st_ino), байты
+заголовка, смещение конца последней полностью разобранной записи и частичное
+состояние отчёта по всем записям до этого смещения. Очередной poll() разбирает только
+байты, дописанные после смещения (как фрагмент chunking.CsvChunk), и дополняет
+состояние через update_batch(); итог — merge() состояний файлов в их порядке.
+
+Граница записи ищется так же, как в chunking: перевод строки вне кавычек.
+Незавершённая последняя запись (без перевода строки — так заканчиваются и обычные
+выгрузки) в состояние не попадает: она разбирается заново при каждом poll() и
+учитывается только в results(), если уже разбирается как корректная строка.
+
+Файл считается заменённым, если изменился его inode, он стал короче смещения или
+изменились байты заголовка; тогда его состояние сбрасывается и файл читается заново.
+Временно отсутствующий файл (ротация) пропускается до появления нового.
+Сжатые файлы дописывать построчно нельзя, поэтому для них режим недоступен.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import mmap
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence
+
+from . import compression
+from .chunking import CsvChunk, count_quotes, iter_chunk_rows, next_record_start, parse_header
+from .errors import InvalidArguments, ValidationError
+from .io import RowBuilder, read_errors, row_builder
+from .models import EmployeeRow
+from .service import ReportResult, ReportSpec, finalize_reports, prepare_reports
+
+if TYPE_CHECKING:
+    from .filters import RowFilter
+
+__all__ = ["TailAggregator", "FileCursor"]
+
+
+class FileCursor:
+    """Позиция чтения и частичное состояние отчёта по одному файлу."""
+
+    __slots__ = (
+        "path",
+        "ident",
+        "header",
+        "header_bytes",
+        "build",
+        "offset",
+        "state",
+        "rows",
+        "tail",
+        "tail_rows",
+    )
+
+    def __init__(self, path: Path, state: Any) -> None:
+        self.path = path
+        self.reset(state)
+
+    def reset(self, state: Any) -> None:
+        """Начать файл заново (после ротации или перезаписи)."""
+        self.ident: Optional[tuple[int, int]] = None
+        self.header: Optional[tuple[str, ...]] = None
+        self.header_bytes = b""
+        self.build: Optional[RowBuilder] = None
+        self.offset = 0
+        self.state = state
+        self.rows = 0  # записей в state (прошедших фильтр)
+        self.tail = b""  # незавершённая последняя запись
+        self.tail_rows: list[EmployeeRow] = []
+
+
+def _last_record_end(mm: mmap.mmap, start: int, size: int) -> int:
+    """Конец последней полной записи в [start, size): после перевода строки вне кавычек."""
+    end = mm.rfind(b"\n", start, size) + 1
+    # Перевод строки внутри поля в кавычках записи не завершает: отступаем к предыдущему
+    while end > start and count_quotes(mm, start, end) & 1:
+        end = mm.rfind(b"\n", start, end - 1) + 1
+    return max(end, start)
+
+
+class TailAggregator:
+    """
+    Отчёты по набору дописываемых файлов с пересчётом только новых данных.
+
+    Parameters
+    ----------
+    report_names : Sequence[str | Report]
+        Машинные имена отчётов или экземпляры (как в service.build_reports()).
+    files : Sequence[Path]
+        CSV-файлы; порядок задаёт порядок слияния состояний.
+    where : RowFilter | None
+        Фильтр строк (как в service.build_reports()).
+    top : int | None
+        Только первые top строк каждого отчёта (как в service.build_reports()).
+
+    Raises
+    ------
+    ReportNotFound
+        Одно из имён не зарегистрировано.
+    """
+
+    def __init__(
+        self,
+        report_names: Sequence[ReportSpec],
+        files: Sequence[Path],
+        where: Optional[RowFilter] = None,
+        top: Optional[int] = None,
+    ) -> None:
+        self._names, self._reports, self.report = prepare_reports(report_names, top=top)
+        self.where = where
+        self.cursors = [FileCursor(path, self.report.create_state()) for path in files]
+        self.rescans = 0
+
+    @property
+    def rows(self) -> int:
+        """Число учтённых строк (с незавершёнными последними записями)."""
+        return sum(c.rows + len(c.tail_rows) for c in self.cursors)
+
+    def poll(self) -> bool:
+        """
+        Дочитывает новые данные всех файлов; True, если результат мог измениться.
+
+        Raises
+        ------
+        DataReadError, ValidationError
+            Ошибка чтения или некорректная полная запись.
+        InvalidArguments
+            Один из файлов сжат.
+        """
+        changed = False
+        for cursor in self.cursors:
+            changed |= self._advance(cursor)
+        return changed
+
+    def results(self) -> list[ReportResult]:
+        """Результаты отчётов по текущему состоянию (состояния файлов не изменяются)."""
+        report = self.report
+        state = report.create_state()
+        for cursor in self.cursors:
+            state = report.merge(state, cursor.state)
+            if cursor.tail_rows:
+                state = report.update_batch(state, cursor.tail_rows)
+        return finalize_reports(self._names, self._reports, report, state)
+
+    def _reset(self, cursor: FileCursor) -> None:
+        self.rescans += 1
+        cursor.reset(self.report.create_state())
+
+    def _advance(self, cursor: FileCursor) -> bool:
+        path = cursor.path
+        try:
+            fh = path.open("rb")
+        except FileNotFoundError:
+            return False  # ротация: ждём новый файл, пока отдаём накопленное
+        with read_errors(path), fh:
+            st = os.fstat(fh.fileno())
+            ident = (st.st_dev, st.st_ino)
+            changed = False
+            if cursor.ident is not None and (ident != cursor.ident or st.st_size < cursor.offset):
+                self._reset(cursor)
+                changed = True
+            if st.st_size == 0:
+                return changed
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header = cursor.header_bytes
+                if cursor.header is not None and mm[: len(header)] != header:
+                    # Файл переписан на месте с другим заголовком
+                    self._reset(cursor)
+                    changed = True
+                if cursor.header is None and not self._read_header(cursor, mm):
+                    return changed
+                cursor.ident = ident
+                return self._read_appended(cursor, mm) or changed
+
+    def _read_header(self, cursor: FileCursor, mm: mmap.mmap) -> bool:
+        codec = compression.detect(cursor.path)
+        if codec is not None:
+            raise InvalidArguments(
+                f"Режим --watch не поддерживает сжатые файлы ({codec}): {cursor.path}"
+            )
+        start = next_record_start(mm, 0, odd=False)
+        if mm[start - 1 : start] != b"\n":
+            return False  # заголовок ещё не дописан
+        cursor.header = parse_header(mm[:start], cursor.path)
+        cursor.header_bytes = mm[:start]
+        cursor.build = row_builder(cursor.header, self.report.columns, self.where)
+        cursor.offset = start
+        return True
+
+    def _read_appended(self, cursor: FileCursor, mm: mmap.mmap) -> bool:
+        size = len(mm)
+        end = _last_record_end(mm, cursor.offset, size)
+        changed = False
+        if end > cursor.offset:
+            assert cursor.header is not None
+            chunk = CsvChunk(cursor.path, cursor.offset, end, cursor.header)
+            rows = iter_chunk_rows(chunk, self.report.columns, self.where)
+            cursor.state = self.report.update_batch(cursor.state, self._counted(cursor, rows))
+            cursor.offset = end
+            changed = True
+
+        tail = mm[end:size]
+        if tail != cursor.tail:
+            cursor.tail = tail
+            cursor.tail_rows = self._parse_tail(cursor, tail)
+            changed = True
+        return changed
+
+    @staticmethod
+    def _counted(cursor: FileCursor, rows: Iterator[EmployeeRow]) -> Iterator[EmployeeRow]:
+        for row in rows:
+            cursor.rows += 1
+            yield row
+
+    @staticmethod
+    def _parse_tail(cursor: FileCursor, tail: bytes) -> list[EmployeeRow]:
+        """Строки незавершённой записи; пусто, пока запись не разбирается целиком."""
+        if not tail.strip() or tail.count(b'"') & 1:
+            return []
+        assert cursor.build is not None
+        try:
+            fields = [f for f in csv.reader(io.StringIO(tail.decode("utf-8"), newline="")) if f]
+            return [row for row in map(cursor.build, fields) if row is not None]
+        except (UnicodeDecodeError, ValidationError):
+            return []  # запись дописывается прямо сейчас
+
@@ -3,6 +3,7 @@
 Общие фикстуры для тестов:
 - sample_csv_1, sample_csv_2: временные CSV-файлы с данными из задания.
 - rows: объединённые нормализованные строки из обоих файлов.
+- кэш разобранных файлов в каждом тесте направляется во временный каталог.
 """
 from __future__ import annotations
 
@@ -22,6 +23,14 @@ if str(SRC_DIR) not in sys.path:
 from csv_reports.io import read_csv_files  # noqa: E402
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """CLI по умолчанию пишет кэш: не даём тестам трогать домашний каталог."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("CSV_REPORTS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 def _write_csv(tmp_path: Path, name: str, content: str) -> Path:
     path = tmp_path / name
     path.write_text(dedent(content).lstrip("\n"), encoding="utf-8", newline="\n")
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты кэша разобранных файлов:
+- повторное чтение берёт строки из кэша и совпадает с разбором CSV (в т.ч. с проекцией);
+- изменение файла (размер/mtime/содержимое) инвалидирует запись;
+- повреждённая запись не ломает чтение;
+- ограничение размера вытесняет давно использованные записи;
+- запись блоками: словари, начатые заново, перекодируются; память промаха не растёт с файлом;
+- CLI: --cache-dir заполняет кэш, --no-cache его не трогает.
+"""
+from __future__ import annotations
+
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from csv_reports import io as csv_io
+from csv_reports.cache import ParsedFileCache
+from csv_reports.cli import main as cli_main
+from csv_reports.io import iter_csv_rows, read_csv_files
+from csv_reports.models import EmployeeTable
+
+
+def _forbid_parsing(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV не должен разбираться при попадании в кэш")
+
+    monkeypatch.setattr(csv_io, "_iter_file_rows", fail)
+
+
+def test_cache_hit_skips_parsing(tmp_path: Path, sample_csv_1: Path, monkeypatch) -> None:
+    cache = ParsedFileCache(tmp_path / "c")
+    expected = read_csv_files([sample_csv_1])
+
+    assert read_csv_files([sample_csv_1], cache=cache) == expected
+    assert cache.is_fresh(sample_csv_1)
+
+    _forbid_parsing(monkeypatch)
+    assert read_csv_files([sample_csv_1], cache=cache) == expected
+    assert read_csv_files([sample_csv_1], columns={"position"}, cache=cache) == [
+        {"position": r["position"]} for r in expected
+    ]
+
+
+def test_cache_invalidated_by_change(tmp_path: Path, sample_csv_1: Path) -> None:
+    cache = ParsedFileCache(tmp_path / "c")
+    read_csv_files([sample_csv_1], cache=cache)
+
+    text = sample_csv_1.read_text(encoding="utf-8").replace("4.8", "3.8")
+    sample_csv_1.write_text(text, encoding="utf-8")
+    st = sample_csv_1.stat()
+    os.utime(sample_csv_1, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert not cache.is_fresh(sample_csv_1)
+    rows = read_csv_files([sample_csv_1], cache=cache)
+    assert rows[0]["performance"] == 3.8
+
+
+def test_cache_hash_verification_detects_same_size_and_mtime(
+    tmp_path: Path, sample_csv_1: Path
+) -> None:
+    cache = ParsedFileCache(tmp_path / "c", verify_hash=True)
+    read_csv_files([sample_csv_1], cache=cache)
+
+    st = sample_csv_1.stat()
+    text = sample_csv_1.read_text(encoding="utf-8").replace("4.8", "3.8")
+    sample_csv_1.write_text(text, encoding="utf-8")
+    os.utime(sample_csv_1, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert not cache.is_fresh(sample_csv_1)
+    assert read_csv_files([sample_csv_1], cache=cache)[0]["performance"] == 3.8
+
+
+def test_corrupted_entry_falls_back_to_parsing(tmp_path: Path, sample_csv_1: Path) -> None:
+    cache_dir = tmp_path / "c"
+    cache = ParsedFileCache(cache_dir)
+    expected = read_csv_files([sample_csv_1], cache=cache)
+
+    for entry in cache_dir.iterdir():
+        entry.write_bytes(entry.read_bytes()[:-7])
+
+    assert read_csv_files([sample_csv_1], cache=cache) == expected
+
+
+def test_lru_eviction_respects_size_cap(tmp_path: Path, sample_csv_1: Path, sample_csv_2: Path):
+    cache_dir = tmp_path / "c"
+    cache = ParsedFileCache(cache_dir, max_bytes=1)
+    read_csv_files([sample_csv_1, sample_csv_2], cache=cache)
+
+    # Лимит меньше одной записи: после каждой записи кэш вычищается полностью
+    assert list(cache_dir.glob("*.colcache")) == []
+
+
+def _write_employees(path: Path, rows: int) -> Path:
+    lines = ["name,position,completed_tasks,performance,skills,team,experience_years"]
+    for i in range(rows):
+        lines.append(f"Employee {i},Role {i % 7},{i % 50},{i % 5}.5,Python,Team {i % 3},{i % 9}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_blocks_round_trip_with_dictionary_resets(tmp_path: Path) -> None:
+    path = _write_employees(tmp_path / "e.csv", 25)
+    cache = ParsedFileCache(tmp_path / "c", block_rows=4)
+    expected = read_csv_files([path], cache=cache)
+
+    table = cache.load(path)
+    assert isinstance(table, EmployeeTable)
+    assert list(table) == expected
+    # Словарь name (уникальные значения) начинался заново в каждом блоке, но после
+    # перекодирования значения не повторяются; team держит один словарь на все блоки
+    assert len(table.column("name").values) == 25
+    assert table.column("team").values == ["Team 0", "Team 1", "Team 2"]
+
+
+def _peak_bytes(path: Path, cache: ParsedFileCache | None) -> int:
+    tracemalloc.start()
+    try:
+        for _ in iter_csv_rows([path], ["team"], cache=cache):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_cache_miss_memory_is_bounded_by_block(tmp_path: Path) -> None:
+    """При промахе сверх обычного разбора в памяти держится блок, а не вся таблица файла."""
+    path = _write_employees(tmp_path / "e.csv", 40_000)
+    cache = ParsedFileCache(tmp_path / "c", block_rows=500)
+    overhead = _peak_bytes(path, cache) - _peak_bytes(path, None)
+    table = cache.load(path)
+    assert table is not None and len(table) == 40_000
+    assert overhead < table.nbytes() / 4
+
+
+def test_cli_cache_flags(tmp_path: Path, sample_csv_1: Path, capsys) -> None:
+    args = ["--files", str(sample_csv_1), "--report", "performance"]
+
+    with pytest.raises(SystemExit):
+        cli_main(args + ["--no-cache", "--cache-dir", str(tmp_path / "off")])
+    assert not (tmp_path / "off").exists()
+    uncached = capsys.readouterr().out
+
+    for _ in range(2):
+        with pytest.raises(SystemExit) as e:
+            cli_main(args + ["--cache-dir", str(tmp_path / "on")])
+        assert e.value.code == 0
+        assert capsys.readouterr().out == uncached
+    assert len(list((tmp_path / "on").glob("*.colcache"))) == 1
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты разбиения файла на фрагменты:
+- границы не попадают внутрь полей в кавычках (запятые, переводы строк, удвоенные кавычки);
+- объединение строк всех фрагментов совпадает с последовательным чтением;
+- параллельный расчёт по фрагментам одного файла совпадает с последовательным;
+- заголовок валидируется при разбиении.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from csv_reports.chunking import iter_chunk_rows, split_csv
+from csv_reports.errors import ValidationError
+from csv_reports.io import read_csv_files
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.performance import PerformanceReport
+
+HEADER = "name,position,completed_tasks,performance,skills,team,experience_years\n"
+
+
+@pytest.fixture
+def tricky_csv(tmp_path: Path) -> Path:
+    """Файл с многострочными полями и кавычками внутри skills."""
+    lines = [HEADER]
+    for i in range(60):
+        skills = f'"Swift, Kotlin,\nReact ""Native"" {i},\niOS"'
+        lines.append(
+            f"Dev {i},Position {i % 7},{i},{i % 5}.{i % 10},{skills},Mobile Team,{i % 9}\n"
+        )
+    path = tmp_path / "tricky.csv"
+    path.write_text("".join(lines), encoding="utf-8", newline="")
+    return path
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 50, 10_000])
+def test_chunks_reassemble_to_sequential_read(tricky_csv: Path, parts: int) -> None:
+    chunks = split_csv(tricky_csv, parts)
+    assert 1 <= len(chunks) <= parts
+
+    rows = [row for chunk in chunks for row in iter_chunk_rows(chunk)]
+    assert rows == read_csv_files([tricky_csv])
+    assert rows[3]["skills"] == 'Swift, Kotlin, React "Native" 3, iOS'
+
+
+def test_split_with_executor_matches_local_scan(tricky_csv: Path) -> None:
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert split_csv(tricky_csv, 5, executor=pool) == split_csv(tricky_csv, 5)
+
+
+def test_parallel_over_chunks_matches_serial(tricky_csv: Path) -> None:
+    report = PerformanceReport()
+    serial = report.finalize(aggregate_files(report, [tricky_csv], jobs=1))
+    chunked = report.finalize(aggregate_files(report, [tricky_csv], jobs=4, min_chunk_bytes=1))
+    assert chunked == serial
+
+
+def test_split_validates_header(tmp_path: Path) -> None:
+    bad = tmp_path / "bad.csv"
+    bad.write_text("name,position\nAlex,Dev\n", encoding="utf-8")
+    with pytest.raises(ValidationError):
+        split_csv(bad, 2)
+
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+    with pytest.raises(ValidationError):
+        split_csv(empty, 2)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты чтения сжатых CSV:
+- gzip/bz2/xz распознаются по сигнатуре (не по расширению) и читаются как обычный CSV;
+- в параллельном режиме сжатые файлы не делятся на фрагменты, результат совпадает;
+- оборванный сжатый файл и zstd без пакета zstandard -> DataReadError.
+"""
+from __future__ import annotations
+
+import bz2
+import gzip
+import importlib.util
+import lzma
+from pathlib import Path
+
+import pytest
+
+from csv_reports import compression
+from csv_reports.errors import DataReadError
+from csv_reports.io import read_csv_files
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.performance import PerformanceReport
+
+_CODECS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+def _compressed(source: Path, codec: str) -> Path:
+    # Расширение оставляем .csv: формат определяется по содержимому
+    target = source.with_name(f"{codec}_{source.name}")
+    target.write_bytes(_CODECS[codec](source.read_bytes()))
+    return target
+
+
+@pytest.mark.parametrize("codec", sorted(_CODECS))
+def test_compressed_file_reads_like_plain(sample_csv_1: Path, codec: str) -> None:
+    packed = _compressed(sample_csv_1, codec)
+
+    assert compression.detect(packed) == codec
+    assert compression.detect(sample_csv_1) is None
+    assert read_csv_files([packed]) == read_csv_files([sample_csv_1])
+
+
+def test_parallel_reads_compressed_files_whole(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    report = PerformanceReport()
+    plain = [sample_csv_1, sample_csv_2]
+    packed = [_compressed(sample_csv_1, "gzip"), _compressed(sample_csv_2, "xz")]
+
+    serial = report.finalize(aggregate_files(report, plain, jobs=1))
+    # min_chunk_bytes=1 делит несжатые файлы на фрагменты, сжатые — нет
+    for files in (packed, [packed[0], plain[1]]):
+        state = aggregate_files(report, files, jobs=2, min_chunk_bytes=1)
+        assert report.finalize(state) == serial
+
+
+def test_truncated_compressed_file_raises(sample_csv_1: Path) -> None:
+    packed = _compressed(sample_csv_1, "gzip")
+    packed.write_bytes(packed.read_bytes()[:-20])
+
+    with pytest.raises(DataReadError, match="повреждён или оборван"):
+        read_csv_files([packed])
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("zstandard") is not None, reason="zstandard установлен"
+)
+def test_zstd_without_zstandard_raises(tmp_path: Path) -> None:
+    packed = tmp_path / "data.csv"
+    packed.write_bytes(b"\x28\xb5\x2f\xfd" + b"\x00" * 16)
+
+    assert compression.detect(packed) == "zstd"
+    with pytest.raises(DataReadError, match="zstandard"):
+        read_csv_files([packed])
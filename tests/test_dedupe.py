@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты удаления повторяющихся записей между файлами (--dedupe):
+- режимы first/last на примерах из условия (Alex Ivanov есть в обоих файлах);
+- индекс повторов с разделами на диске совпадает с расчётом в памяти, временные
+  файлы удаляются;
+- переполнение бюджета в режиме first -> двухпроходная схема, результат тот же
+  (с кэшем, фильтром --where и без них);
+- CLI: --dedupe/--dedupe-key/--dedupe-memory, ошибки аргументов -> код 2.
+"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cache import ParsedFileCache
+from csv_reports.cli import main as cli_main
+from csv_reports.dedupe import Deduplicator, DuplicateIndex, _fingerprint
+from csv_reports.errors import InvalidArguments
+from csv_reports.filters import compile_filter
+from csv_reports.io import read_csv_files
+from csv_reports.reports.groupby import GroupByReport
+from csv_reports.reports.performance import PerformanceReport
+from csv_reports.service import build_report, build_reports
+
+
+def _expected(rows: list, key: tuple, keep: str) -> list:
+    """Строки без повторов ключа: эталон без отпечатков и разделов."""
+    order = list(range(len(rows))) if keep == "first" else list(range(len(rows)))[::-1]
+    seen, kept = set(), []
+    for i in order:
+        k = tuple(rows[i][c] for c in key)
+        if k not in seen:
+            seen.add(k)
+            kept.append(i)
+    return [rows[i] for i in sorted(kept)]
+
+
+@pytest.mark.parametrize(
+    "keep, expected",
+    [
+        ("first", {"Backend Developer": 4.75, "DevOps Engineer": 4.9, "QA Engineer": 4.5}),
+        ("last", {"Backend Developer": 4.8, "DevOps Engineer": 4.8, "QA Engineer": 4.5}),
+    ],
+)
+def test_keep_first_and_last(keep, expected, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    files = [sample_csv_1, sample_csv_2]
+    _, data = build_report("performance", files, dedupe=Deduplicator(keep))
+    as_map = {row["position"]: row["performance"] for row in data}
+    assert {k: as_map[k] for k in expected} == pytest.approx(expected)
+    assert data == PerformanceReport().run(_expected(read_csv_files(files), ("name",), keep))
+
+
+@pytest.mark.parametrize("keep", ["first", "last"])
+def test_spilled_index_matches_memory(keep: str, tmp_path: Path) -> None:
+    rng = random.Random(7)
+    keys = [rng.randrange(1500) for _ in range(5000)]
+    fingerprints = [_fingerprint(k) for k in keys]
+
+    with DuplicateIndex(keep, len(keys)) as index:
+        index.extend(fingerprints)
+        in_memory = list(index.dropped())
+        assert not index.spilled
+
+    with DuplicateIndex(keep, 40, tmp_path) as index:  # разделы и их повторное деление
+        index.extend(fingerprints[:1000])
+        index.extend(fingerprints[1000:])
+        assert list(index.dropped()) == in_memory
+        assert index.spilled
+    assert list(tmp_path.iterdir()) == []
+
+    rows = [{"name": k} for k in keys]
+    dropped = set(in_memory)
+    assert [r for i, r in enumerate(rows) if i not in dropped] == _expected(rows, ("name",), keep)
+
+
+@pytest.mark.parametrize("keep", ["first", "last"])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_bounded_memory_paths_agree(
+    keep: str, use_cache: bool, sample_csv_1: Path, sample_csv_2: Path, tmp_path: Path
+) -> None:
+    files = [sample_csv_1, sample_csv_2, sample_csv_1]
+    where = compile_filter("experience_years >= 4")
+    report = GroupByReport("team", "count,mean:performance,max:completed_tasks")
+    rows = [r for r in read_csv_files(files) if where(r)]
+    expected = report.run(_expected(rows, ("name", "team"), keep))
+
+    cache = ParsedFileCache(tmp_path / "cache") if use_cache else None
+    for memory_limit in (1 << 20, 1):  # в памяти; переполнение -> разделы на диске
+        dedupe = Deduplicator(keep, ["name", "team"], memory_limit, tmp_dir=tmp_path)
+        for _ in range(2):  # с кэшем: промах, затем попадание
+            results = build_reports([report], files, cache=cache, where=where, dedupe=dedupe)
+            assert results[0][2] == expected
+
+
+def test_invalid_settings() -> None:
+    with pytest.raises(InvalidArguments, match="Неизвестная колонка ключа: salary"):
+        Deduplicator("first", ["salary"])
+    with pytest.raises(InvalidArguments, match="режим"):
+        Deduplicator("none")
+
+
+def test_cli_dedupe(capsys, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    argv = ["--files", str(sample_csv_1), str(sample_csv_2), "--group-by", "team"]
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--format", "json", "--dedupe", "last", "--dedupe-memory", "1K"])
+    assert e.value.code == 0
+    data = json.loads(capsys.readouterr().out)
+    assert {row["team"]: row["count"] for row in data}["API Team"] == 2  # Alex Ivanov — один раз
+
+    for extra in (
+        ["--dedupe", "first", "--dedupe-key", "name,salary"],
+        ["--dedupe", "first", "--watch"],
+        ["--dedupe", "first", "--dedupe-memory", "lots"],
+    ):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + extra)
+        assert e.value.code == 2
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты движка групповых агрегатов:
+- чистый Python: count/sum/mean/min/max и пустые группы;
+- NumPy-бэкенд (если установлен) совпадает с чистым Python побитно;
+- выбор бэкенда и ошибки на неизвестные бэкенды/агрегаты.
+"""
+from __future__ import annotations
+
+import random
+from array import array
+
+import pytest
+
+from csv_reports.engine import available_backends, group_aggregate, resolve_backend
+from csv_reports.errors import InvalidArguments
+
+
+def test_python_backend_aggregates() -> None:
+    codes = array("I", [0, 1, 0, 0, 1])
+    values = array("d", [4.8, 4.5, 4.9, 4.7, 4.6])
+
+    result = group_aggregate(codes, values, n_groups=3, backend="python")
+
+    assert result["count"] == [3, 2, 0]
+    assert result["sum"] == [14.4, 9.1, 0.0]
+    assert result["mean"] == [4.8, 4.55, None]
+    assert result["min"] == [4.7, 4.5, None]
+    assert result["max"] == [4.9, 4.6, None]
+
+
+def test_numpy_backend_matches_python_exactly() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    n = 20_000
+    codes = array("I", (rng.randrange(9) for _ in range(n)))
+    values = array(
+        "d",
+        (rng.choice([rng.random() * 5, -rng.random() * 1e12, rng.random() * 1e-200, 0.0])
+         for _ in range(n)),
+    )
+
+    python = group_aggregate(codes, values, n_groups=10, backend="python")
+    vectorized = group_aggregate(codes, values, n_groups=10, backend="numpy")
+    assert vectorized == python
+
+
+def test_backend_selection(monkeypatch) -> None:
+    assert resolve_backend() == available_backends()[0]
+
+    monkeypatch.setenv("CSV_REPORTS_ENGINE", "python")
+    assert resolve_backend() == "python"
+
+    with pytest.raises(InvalidArguments):
+        resolve_backend("gpu")
+    with pytest.raises(InvalidArguments):
+        group_aggregate(array("I"), array("d"), 0, ops=["median"])
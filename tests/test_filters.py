@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты фильтра строк (--where):
+- семантика сравнений, in, and/or/not; нормализация строковых литералов; pickle;
+- недопустимые выражения отклоняются с InvalidArguments (без выполнения кода);
+- фильтр применяется до приведения остальных колонок: их ошибки у отклонённых строк
+  не мешают;
+- последовательный, параллельный (по фрагментам), кэшированный и табличный пути дают
+  одинаковый результат;
+- CLI: --where фильтрует отчёт, некорректное выражение -> код 2.
+"""
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cache import ParsedFileCache
+from csv_reports.cli import main as cli_main
+from csv_reports.errors import InvalidArguments
+from csv_reports.filters import compile_filter
+from csv_reports.io import read_csv_files, read_csv_table
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.performance import PerformanceReport
+from csv_reports.service import build_report, build_reports_from_tables
+
+
+def test_filter_semantics() -> None:
+    where = compile_filter('team == "API   Team" and experience_years >= 5')
+    assert where.columns == {"team", "experience_years"}
+    assert where({"team": "API Team", "experience_years": 5})
+    assert not where({"team": "API Team", "experience_years": 4})
+
+    where = compile_filter('position in ("QA", "Dev") or not (1 <= completed_tasks < 10)')
+    assert where({"position": "QA", "completed_tasks": 3})
+    assert not where({"position": "PM", "completed_tasks": 3})
+    assert where({"position": "PM", "completed_tasks": 30})
+
+    restored = pickle.loads(pickle.dumps(compile_filter("performance > -1.5")))
+    assert restored({"performance": 0.0}) and restored.expression == "performance > -1.5"
+
+
+@pytest.mark.parametrize(
+    "expression, reason",
+    [
+        ('__import__("os").system("true") == 0', "сравнение без колонки"),
+        ("team", "ожидается сравнение"),
+        ("team == 5", "несовместимые типы"),
+        ("salary > 1", "неизвестная колонка 'salary'"),
+        ("team.upper() == 'X'", "сравнение без колонки"),
+        ('team in "API Team"', "непустой список"),
+        ("experience_years == True", "ожидается колонка, число или строка"),
+        ('team = "API Team"', "синтаксическая ошибка"),
+    ],
+)
+def test_invalid_expressions_rejected(expression: str, reason: str) -> None:
+    with pytest.raises(InvalidArguments, match=reason):
+        compile_filter(expression)
+
+
+def test_rejected_rows_skip_coercion_of_other_columns(tmp_path: Path) -> None:
+    path = tmp_path / "dirty.csv"
+    path.write_text(
+        "name,position,completed_tasks,performance,skills,team,experience_years\n"
+        "A,Dev,1,not-a-number,Go,API Team,1\n"
+        "B,Dev,2,4.5,Go,Web Team,3\n",
+        encoding="utf-8",
+    )
+    where = compile_filter("team == 'Web Team'")
+    rows = read_csv_files([path], columns=["performance"], where=where)
+    assert rows == [{"performance": 4.5, "team": "Web Team"}]
+
+
+def test_all_paths_agree(sample_csv_1: Path, sample_csv_2: Path, tmp_path: Path) -> None:
+    files = [sample_csv_1, sample_csv_2]
+    where = compile_filter('experience_years >= 4 and team != "Web Team"')
+    report = PerformanceReport()
+    expected = report.run(row for row in read_csv_files(files) if where(row))
+    assert expected
+
+    assert build_report("performance", files, where=where)[1] == expected
+    chunked = aggregate_files(report, files, jobs=2, min_chunk_bytes=1, where=where)
+    assert report.finalize(chunked) == expected
+
+    cache = ParsedFileCache(tmp_path / "cache")
+    for _ in range(2):  # промах (запись в кэш), затем попадание
+        assert build_report("performance", files, cache=cache, where=where)[1] == expected
+    assert len(read_csv_table(files, cache=cache)) == 10  # в кэше — все строки
+
+    tables = [read_csv_table([path]) for path in files]
+    [(_, _, rows)] = build_reports_from_tables(["performance"], tables, where)
+    assert rows == expected
+
+
+def test_cli_where(capsys, sample_csv_1: Path) -> None:
+    argv = ["--files", str(sample_csv_1), "--report", "performance", "--format", "jsonl"]
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--where", "performance >= 4.8"])
+    assert e.value.code == 0
+    out = capsys.readouterr().out
+    assert "DevOps Engineer" in out and "Backend Developer" in out
+    assert "QA Engineer" not in out
+
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--where", "open('x') == 1"])
+    assert e.value.code == 2
+    assert "Некорректный фильтр" in capsys.readouterr().err
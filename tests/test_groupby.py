@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты обобщённого отчёта-группировки (GroupByReport):
+- разбор --group-by / --agg и ошибки спецификации (InvalidArguments);
+- несколько ключей, интервалы числовой колонки, все агрегаты — против ручного расчёта;
+- построчный, табличный (оба движка) и параллельный пути дают одинаковый результат;
+- groupby_report() регистрирует отчёт без кода; экземпляр переживает pickle;
+- CLI: --group-by / --agg, в том числе вместе с --report; ошибки -> код 2.
+"""
+from __future__ import annotations
+
+import json
+import pickle
+import statistics
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cli import main as cli_main
+from csv_reports.errors import InvalidArguments
+from csv_reports.io import read_csv_files, read_csv_table
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.groupby import (
+    Aggregate,
+    GroupByReport,
+    GroupKey,
+    groupby_report,
+    parse_aggregates,
+    parse_group_by,
+)
+from csv_reports.reports.registry import registry
+from csv_reports.service import build_reports
+
+AGGS = (
+    "count,sum:completed_tasks,mean:performance,min:performance,max:completed_tasks,"
+    "stddev:performance"
+)
+
+
+def test_parse_specs() -> None:
+    assert parse_group_by(" team , experience_years:5,performance:0.5") == (
+        GroupKey("team"),
+        GroupKey("experience_years", 5),
+        GroupKey("performance", 0.5),
+    )
+    assert parse_aggregates("count,mean:performance") == (
+        Aggregate("count"),
+        Aggregate("mean", "performance"),
+    )
+    assert GroupKey("experience_years", 5).label(5) == "5-9"
+    assert GroupKey("performance", 0.5).label(4.5) == "4.5-5"
+
+
+@pytest.mark.parametrize(
+    "group_by, aggregates, reason",
+    [
+        ("salary", "count", "Неизвестная колонка 'salary'"),
+        ("team:5", "count", "только для числовых колонок"),
+        ("experience_years:0", "count", "должна быть положительной"),
+        ("experience_years:x", "count", "Некорректная ширина"),
+        ("team", "median:performance", "Неизвестный агрегат 'median'"),
+        ("team", "mean", "нужна колонка"),
+        ("team", "mean:team", "по числовым колонкам"),
+        ("team", "count,count", "Повторяющиеся колонки"),
+        ("", "count", "Не указаны колонки"),
+    ],
+)
+def test_invalid_specs(group_by: str, aggregates: str, reason: str) -> None:
+    with pytest.raises(InvalidArguments, match=reason):
+        GroupByReport(group_by, aggregates)
+
+
+def test_multi_key_and_buckets(rows) -> None:
+    report = GroupByReport("team,experience_years:5", AGGS)
+    data = report.run(rows)
+
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault((row["team"], row["experience_years"] // 5 * 5), []).append(row)
+    assert [(r["team"], r["experience_years"]) for r in data] == [
+        (team, f"{low}-{low + 4}") for team, low in sorted(groups)
+    ]
+    for record, (_, members) in zip(data, sorted(groups.items())):
+        perf = [m["performance"] for m in members]
+        tasks = [m["completed_tasks"] for m in members]
+        assert record["count"] == len(members)
+        assert record["sum_completed_tasks"] == sum(tasks)
+        assert isinstance(record["sum_completed_tasks"], int)
+        assert record["mean_performance"] == pytest.approx(statistics.fmean(perf))
+        assert record["min_performance"] == min(perf)
+        assert record["max_completed_tasks"] == max(tasks)
+        expected = statistics.stdev(perf) if len(perf) > 1 else None
+        assert record["stddev_performance"] == pytest.approx(expected)
+
+
+def test_count_only_and_order_by(rows) -> None:
+    report = GroupByReport("position", "count", order_by=[("count", True)])
+    data = report.run(rows)
+    assert data[0] == {"position": "Backend Developer", "count": 3}
+    assert sum(r["count"] for r in data) == len(rows)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_all_paths_agree(engine, monkeypatch, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    monkeypatch.setenv("CSV_REPORTS_ENGINE", engine)
+    files = [sample_csv_1, sample_csv_2]
+    for spec in ("team,experience_years:5", "position", "skills"):
+        report = GroupByReport(spec, AGGS)
+        expected = report.run(read_csv_files(files))
+
+        state = report.create_state()
+        for path in files:
+            state = report.update_table(state, read_csv_table([path]))
+        assert report.finalize(state) == expected
+
+        chunked = aggregate_files(report, files, jobs=2, min_chunk_bytes=1)
+        assert report.finalize(chunked) == expected
+
+
+def test_declarative_report(sample_csv_1: Path, monkeypatch) -> None:
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+    cls = groupby_report("teams", "team", "count,mean:performance", [("count", True)])
+    assert registry.get("teams") is cls
+
+    report = pickle.loads(pickle.dumps(cls()))
+    assert report.name == "teams" and report.headers() == ["team", "count", "mean_performance"]
+
+    [(name, headers, data)] = build_reports(["teams"], [sample_csv_1], jobs=2)
+    assert name == "teams" and headers == report.headers()
+    assert data[0] == {"team": "API Team", "count": 1, "mean_performance": 4.8}
+
+
+def test_cli_group_by(capsys, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    files = ["--files", str(sample_csv_1), str(sample_csv_2)]
+    with pytest.raises(SystemExit) as e:
+        cli_main(files + ["--group-by", "team", "--agg", "count,max:performance", "--format=json"])
+    assert e.value.code == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data[0] == {"team": "AI Team", "count": 2, "max_performance": 4.7}
+
+    with pytest.raises(SystemExit) as e:
+        cli_main(files + ["--report", "performance", "--group-by", "position"])
+    assert e.value.code == 0
+    out = capsys.readouterr().out
+    assert "## performance" in out and "## group_by" in out
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["--agg", "count"], "--agg requires --group-by"),
+        (["--group-by", "team", "--agg", "avg:performance"], "Неизвестный агрегат"),
+        ([], "--report --all-reports --group-by is required"),
+    ],
+)
+def test_cli_group_by_errors(capsys, sample_csv_1: Path, argv: list, message: str) -> None:
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files", str(sample_csv_1), *argv])
+    assert e.value.code == 2
+    assert message in capsys.readouterr().err
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты сбора входных файлов:
+- discover: шаблоны имён, рекурсивный обход, детерминированный порядок;
+- stat_files: находит размеры и отсутствующие файлы (каталог — тоже отсутствующий файл);
+- CLI: --input-dir и --files-from (файл и stdin) дают тот же отчёт, что и --files;
+- parallel: задания отправляются от больших к меньшим, слияние — в порядке файлов.
+"""
+from __future__ import annotations
+
+import io
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+from csv_reports import inputs, parallel
+from csv_reports.cli import main as cli_main
+from csv_reports.reports.performance import PerformanceReport
+
+
+def _touch(path: Path, size: int = 1) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_discover_patterns_and_recursion(tmp_path: Path) -> None:
+    _touch(tmp_path / "b.csv", 3)
+    _touch(tmp_path / "a.csv.gz", 2)
+    _touch(tmp_path / "notes.txt")
+    _touch(tmp_path / "sub" / "c.csv", 5)
+
+    flat = inputs.discover([tmp_path])
+    assert flat == [(tmp_path / "a.csv.gz", 2), (tmp_path / "b.csv", 3)]
+
+    deep = inputs.discover([tmp_path], patterns=["*.csv"], recursive=True)
+    assert [p.name for p, _ in deep] == ["b.csv", "c.csv"]
+
+
+def test_stat_files_reports_sizes_and_missing(tmp_path: Path) -> None:
+    present = [_touch(tmp_path / f"f{i}.csv", i + 1) for i in range(40)]
+    absent = [tmp_path / "nope.csv", tmp_path / "missing_dir" / "x.csv", tmp_path]
+
+    found, missing = inputs.stat_files(present[:1] + absent + present[1:])
+
+    assert found == [(p, i + 1) for i, p in enumerate(present)]
+    assert missing == absent
+
+
+def _run_cli(capsys, argv: list[str]) -> str:
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--report", "performance", "--no-cache"])
+    assert e.value.code == 0
+    return capsys.readouterr().out
+
+
+def test_cli_input_dir_and_manifest_match_files(
+    capsys, monkeypatch, sample_csv_1: Path, sample_csv_2: Path, tmp_path: Path
+) -> None:
+    expected = _run_cli(capsys, ["--files", str(sample_csv_1), str(sample_csv_2)])
+
+    assert _run_cli(capsys, ["--input-dir", str(tmp_path), "--pattern", "sample_*.csv"]) == expected
+
+    manifest = tmp_path / "files.txt"
+    manifest.write_text(f"# shards\n{sample_csv_1}\n\n{sample_csv_2}\n", encoding="utf-8")
+    assert _run_cli(capsys, ["--files-from", str(manifest)]) == expected
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{sample_csv_1}\n{sample_csv_2}\n"))
+    assert _run_cli(capsys, ["--files-from", "-"]) == expected
+
+
+def test_cli_input_errors(capsys, sample_csv_1: Path, tmp_path: Path) -> None:
+    manifest = tmp_path / "files.txt"
+    manifest.write_text(f"{sample_csv_1}\n{tmp_path / 'gone.csv'}\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files-from", str(manifest), "--report", "performance"])
+    assert e.value.code == 1
+    assert "gone.csv" in capsys.readouterr().err
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--input-dir", str(empty), "--report", "performance"])
+    assert e.value.code == 1
+
+
+class _RecordingPool:
+    """Синхронный пул: запоминает порядок отправки заданий."""
+
+    submitted: list = []
+
+    def __init__(self, max_workers: int) -> None:
+        pass
+
+    def __enter__(self) -> "_RecordingPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def submit(self, fn, *args) -> Future:
+        self.submitted.append(args[-1])
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_parallel_submits_largest_first_and_merges_in_order(
+    monkeypatch, sample_csv_1: Path, sample_csv_2: Path
+) -> None:
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", _RecordingPool)
+    monkeypatch.setattr(_RecordingPool, "submitted", [])
+    report = PerformanceReport()
+    files = [sample_csv_1, sample_csv_2]
+
+    sizes = {sample_csv_1: 10, sample_csv_2: 99}
+    state = parallel.aggregate_files(report, files, jobs=2, sizes=sizes)
+
+    assert _RecordingPool.submitted == [sample_csv_2, sample_csv_1]
+    serial = parallel.aggregate_files(report, files, jobs=1)
+    assert report.finalize(state) == report.finalize(serial)
@@ -2,6 +2,10 @@
 """
 Тесты чтения CSV:
 - чтение одного/нескольких файлов, проверка типов и количества строк;
+- потоковое чтение iter_csv_rows: совпадение с read_csv_files и ленивость;
+- проекция колонок: разбираются только запрошенные колонки, ошибки указывают колонку;
+- нормализация значений: быстрый путь совпадает с полной нормализацией, одинаковые
+  значения категориальных колонок — один объект str;
 - негативный кейс: отсутствие обязательной колонки.
 """
 from __future__ import annotations
@@ -10,8 +14,9 @@ from pathlib import Path
 
 import pytest
 
-from csv_reports.io import read_csv_files
-from csv_reports.errors import ValidationError
+from csv_reports.io import _categorical, _normalize_text, _to_float, _to_int
+from csv_reports.io import iter_csv_rows, read_csv_files
+from csv_reports.errors import DataReadError, ValidationError
 
 
 def _assert_employee_row_schema(row: dict) -> None:
@@ -80,3 +85,85 @@ def test_missing_required_column_raises(tmp_path: Path) -> None:
         read_csv_files([bad_csv])
 
     assert "обязательные колонки" in str(exc.value) or "колонки" in str(exc.value)
+
+
+def test_iter_csv_rows_matches_read_csv_files(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    paths = [sample_csv_1, sample_csv_2]
+    assert list(iter_csv_rows(paths)) == read_csv_files(paths)
+
+
+def test_iter_csv_rows_is_lazy(sample_csv_1: Path, tmp_path: Path) -> None:
+    # Отсутствующий второй файл не мешает прочитать строки первого
+    it = iter_csv_rows([sample_csv_1, tmp_path / "no_such.csv"])
+    first_five = [next(it) for _ in range(5)]
+    assert [r["name"] for r in first_five][0] == "Alex Ivanov"
+
+    with pytest.raises(DataReadError):
+        next(it)
+
+
+def test_column_projection_returns_only_requested_keys(sample_csv_1: Path) -> None:
+    rows = read_csv_files([sample_csv_1], columns={"performance", "position"})
+    assert len(rows) == 5
+    assert list(rows[0]) == ["position", "performance"]
+    assert rows[0] == {"position": "Backend Developer", "performance": 4.8}
+
+
+def test_column_projection_skips_coercion_of_other_columns(tmp_path: Path) -> None:
+    # Некорректный completed_tasks не мешает, если колонка не запрошена
+    path = tmp_path / "partial.csv"
+    path.write_text(
+        "name,position,completed_tasks,performance,skills,team,experience_years\n"
+        "Alex,Backend Developer,n/a,\"4,5\",Python,API Team,5\n",
+        encoding="utf-8",
+    )
+    assert read_csv_files([path], columns=["position", "performance"]) == [
+        {"position": "Backend Developer", "performance": 4.5}
+    ]
+
+    with pytest.raises(ValidationError) as exc:
+        read_csv_files([path])
+    assert "completed_tasks" in str(exc.value)
+
+
+def test_unknown_projection_column_raises(sample_csv_1: Path) -> None:
+    with pytest.raises(ValueError):
+        read_csv_files([sample_csv_1], columns=["salary"])
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["Backend Developer", "", " ", " API Team", "API Team ", "API  Team", "A\tB", "A\nB",
+     "A\u00a0B", "Python, Django"],
+)
+def test_normalize_text_fast_path_matches_full_normalization(value: str) -> None:
+    expected = " ".join(value.strip().split())
+    assert _normalize_text(value) == expected
+    assert _categorical(size=4)(value) == expected
+
+
+def test_categorical_values_share_one_object(tmp_path: Path) -> None:
+    path = tmp_path / "teams.csv"
+    path.write_text(
+        "name,position,completed_tasks,performance,skills,team,experience_years\n"
+        + "".join(
+            f"Emp {i},Backend Developer,{i},4.5,Python,{' API  Team ' if i % 2 else 'API Team'},1\n"
+            for i in range(4)
+        ),
+        encoding="utf-8",
+    )
+    rows = read_csv_files([path])
+    assert len({id(row["team"]) for row in rows}) == 1
+    assert len({id(row["position"]) for row in rows}) == 1
+    assert rows[1]["team"] == "API Team"
+
+    coerce = _categorical(size=2)  # словарь заполнен: значения по-прежнему нормализуются
+    assert [coerce(v) for v in ("a", " b", "c ", "d  e")] == ["a", "b", "c", "d e"]
+
+
+def test_numbers_with_comma_and_spaces() -> None:
+    assert _to_float("4,5") == 4.5 and _to_float(" 4.5 ") == 4.5 and _to_int(" 12 ") == 12
+    with pytest.raises(ValueError, match="'fast'"):
+        _to_float(" fast ")
+    with pytest.raises(ValueError, match="'1 2'"):
+        _to_int(" 1  2 ")
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты нескольких отчётов за один проход:
+- build_reports читает файлы один раз и совпадает с отдельными запусками;
+- CLI: --report a,b и --all-reports печатают таблицы под заголовками;
+- неизвестное имя в списке -> код 2 от argparse;
+- --format json/csv с несколькими отчётами.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from csv_reports import io as csv_io
+from csv_reports.cli import main as cli_main
+from csv_reports.reports.base import Report
+from csv_reports.reports.registry import registry
+from csv_reports.service import build_report, build_reports
+
+
+class _HeadcountReport(Report):
+    """Простой отчёт только с run(): число сотрудников по командам."""
+
+    name = "headcount"
+    columns = frozenset({"team"})
+
+    def headers(self) -> list[str]:
+        return ["team", "employees"]
+
+    def run(self, rows):
+        counts: dict[str, int] = {}
+        for row in rows:
+            counts[row["team"]] = counts.get(row["team"], 0) + 1
+        return [{"team": t, "employees": n} for t, n in counts.items()]
+
+
+@pytest.fixture
+def with_headcount(monkeypatch):
+    monkeypatch.setitem(registry._registry, "headcount", _HeadcountReport)
+
+
+def test_build_reports_single_pass(with_headcount, monkeypatch, sample_csv_1, sample_csv_2):
+    files = [sample_csv_1, sample_csv_2]
+    expected_perf = build_report("performance", files)
+    expected_head = build_report("headcount", files)
+
+    opened: list[Path] = []
+    original = csv_io._iter_file_rows
+
+    def counting(path, columns, where=None, rejects=None):
+        opened.append(path)
+        return original(path, columns, where, rejects)
+
+    monkeypatch.setattr(csv_io, "_iter_file_rows", counting)
+    results = build_reports(["performance", "headcount", "performance"], files)
+
+    assert opened == files  # каждый файл прочитан ровно один раз
+    assert [name for name, _, _ in results] == ["performance", "headcount"]
+    assert results[0][1:] == expected_perf
+    assert results[1][1:] == expected_head
+
+
+def test_build_reports_parallel(with_headcount, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    files = [sample_csv_1, sample_csv_2]
+    names = ["headcount", "performance"]
+    assert build_reports(names, files, jobs=2) == build_reports(names, files)
+
+
+def test_cli_multiple_reports(with_headcount, capsys, sample_csv_1: Path) -> None:
+    for selection in (["--report", "performance,headcount"], ["--all-reports"]):
+        with pytest.raises(SystemExit) as e:
+            cli_main(["--files", str(sample_csv_1), *selection])
+        assert e.value.code == 0
+
+        out = capsys.readouterr().out
+        assert "## performance" in out and "## headcount" in out
+        assert "Testing Team" in out and "4.50" in out
+
+
+def test_cli_unknown_report_in_list_exits_with_code_2(sample_csv_1: Path) -> None:
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files", str(sample_csv_1), "--report", "performance,nope"])
+    assert e.value.code == 2
+
+
+def test_cli_json_several_reports(with_headcount, capsys, sample_csv_1):
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files", str(sample_csv_1), "--all-reports", "--format", "json"])
+    assert e.value.code == 0
+    data = json.loads(capsys.readouterr().out)
+    assert list(data) == ["headcount", "performance"]  # порядок registry.choices()
+    assert data["headcount"][0] == {"team": "API Team", "employees": 1}
+
+
+def test_cli_csv_rejects_several_reports(with_headcount, sample_csv_1):
+    with pytest.raises(SystemExit) as e:
+        cli_main(
+            ["--files", str(sample_csv_1), "--report", "performance,headcount", "--format", "csv"]
+        )
+    assert e.value.code == 2
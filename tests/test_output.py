@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты форматов вывода: csv, jsonl, json, несколько отчётов и флаги CLI --format/--output.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cli import main as cli_main
+from csv_reports.errors import InvalidArguments
+from csv_reports.output import write_results
+
+HEADERS = ["position", "performance"]
+ROWS = [
+    {"position": "DevOps Engineer", "performance": 4.854},
+    {"position": 'Backend "API", Developer', "performance": 4.8},
+]
+
+
+def _render(results, fmt: str, **kwargs) -> str:
+    buffer = io.StringIO()
+    write_results(results, buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def test_csv_keeps_two_decimals_and_quotes_fields() -> None:
+    out = _render([("performance", HEADERS, ROWS)], "csv")
+    assert list(csv.reader(io.StringIO(out))) == [
+        HEADERS,
+        ["DevOps Engineer", "4.85"],
+        ['Backend "API", Developer', "4.80"],
+    ]
+
+
+def test_aggregate_columns_use_two_decimals() -> None:
+    headers = ["team", "count", "mean_performance"]
+    rows = [{"team": "API", "count": 3, "mean_performance": 4.666666666666667}]
+    out = _render([("group_by", headers, rows)], "csv")
+    assert list(csv.reader(io.StringIO(out)))[1] == ["API", "3", "4.67"]
+    out = _render([("group_by", headers, rows)], "json")
+    assert json.loads(out) == [{"team": "API", "count": 3, "mean_performance": 4.67}]
+
+
+def test_jsonl_and_json_keep_numbers() -> None:
+    lines = _render([("performance", HEADERS, ROWS)], "jsonl").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"position": "DevOps Engineer", "performance": 4.85},
+        {"position": 'Backend "API", Developer', "performance": 4.8},
+    ]
+    assert json.loads(_render([("performance", HEADERS, ROWS)], "json")) == [
+        json.loads(line) for line in lines
+    ]
+
+
+def test_cell_formats_are_configurable() -> None:
+    out = _render([("performance", HEADERS, ROWS)], "jsonl", cell_formats={})
+    assert json.loads(out.splitlines()[0])["performance"] == 4.854
+
+
+def test_multiple_reports() -> None:
+    results = [("performance", HEADERS, ROWS), ("empty", ["team"], [])]
+    assert json.loads(_render(results, "json")) == {
+        "performance": [
+            {"position": "DevOps Engineer", "performance": 4.85},
+            {"position": 'Backend "API", Developer', "performance": 4.8},
+        ],
+        "empty": [],
+    }
+    lines = [json.loads(line) for line in _render(results, "jsonl").splitlines()]
+    assert [line["report"] for line in lines] == ["performance", "performance"]
+    with pytest.raises(InvalidArguments):
+        _render(results, "csv")
+
+
+@pytest.mark.parametrize("cell_formats", [None, {}])
+def test_json_writes_non_finite_as_null(cell_formats) -> None:
+    rows = [
+        {"position": "a", "performance": float("inf")},
+        {"position": "b", "performance": float("nan")},
+        {"position": "c", "performance": -float("inf")},
+    ]
+    expected = [{"position": p, "performance": None} for p in "abc"]
+    for fmt in ("jsonl", "json"):
+        out = _render([("performance", HEADERS, rows)], fmt, cell_formats=cell_formats)
+        assert "Infinity" not in out and "NaN" not in out
+        if fmt == "jsonl":
+            assert [json.loads(line) for line in out.splitlines()] == expected
+        else:
+            assert json.loads(out) == expected
+
+
+def test_cli_json_with_infinite_mean(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "inf.csv"
+    path.write_text(
+        "name,position,completed_tasks,performance,skills,team,experience_years\n"
+        "A,Dev,1,inf,x,core,1\n"
+        "B,Dev,1,4.5,x,core,1\n"
+        "C,QA,1,4.0,x,qa,1\n",
+        encoding="utf-8",
+    )
+    argv = ["--files", str(path), "--group-by", "team", "--format", "json"]
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--agg", "mean:performance,stddev:performance"])
+    assert e.value.code == 0
+    by_team = {row["team"]: row for row in json.loads(capsys.readouterr().out)}
+    assert by_team["core"]["mean_performance"] is None
+    assert by_team["qa"]["mean_performance"] == 4.0
+
+
+def test_empty_json_is_valid() -> None:
+    assert json.loads(_render([("performance", HEADERS, [])], "json")) == []
+
+
+def test_cli_format_and_output(sample_csv_1: Path, tmp_path: Path, capsys) -> None:
+    target = tmp_path / "report.csv"
+    with pytest.raises(SystemExit) as e:
+        cli_main(
+            [
+                "--files",
+                str(sample_csv_1),
+                "--report",
+                "performance",
+                "--format",
+                "csv",
+                "--output",
+                str(target),
+            ]
+        )
+    assert e.value.code == 0
+    assert capsys.readouterr().out == ""
+    rows = list(csv.DictReader(target.open(encoding="utf-8", newline="")))
+    assert rows[0] == {"position": "DevOps Engineer", "performance": "4.90"}
+    assert len(rows) == 5
+
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты параллельного режима:
+- результат в пуле процессов совпадает с последовательным, включая порядок равных значений;
+- ошибка в файле рабочего процесса доходит до вызывающего кода;
+- CLI принимает --jobs и отклоняет отрицательные значения.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cli import main as cli_main
+from csv_reports.errors import ValidationError
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.performance import PerformanceReport
+from csv_reports.service import build_report
+
+
+def test_parallel_matches_serial(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    files = [sample_csv_1, sample_csv_2, sample_csv_1]
+    serial = build_report("performance", files, jobs=1)
+    parallel = build_report("performance", files, jobs=3)
+
+    assert parallel == serial
+    # Порядок равных значений — по первому появлению должности
+    positions = [row["position"] for row in parallel[1]]
+    assert positions[2:4] == ["Frontend Developer", "Data Scientist"]
+
+
+def test_parallel_worker_error_propagates(sample_csv_1: Path, tmp_path: Path) -> None:
+    bad = tmp_path / "bad.csv"
+    bad.write_text("name,position\nAlex,Dev\n", encoding="utf-8")
+
+    with pytest.raises(ValidationError):
+        aggregate_files(PerformanceReport(), [sample_csv_1, bad], jobs=2)
+
+
+def test_cli_jobs_option(capsys, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    args = ["--files", str(sample_csv_1), str(sample_csv_2), "--report", "performance"]
+
+    with pytest.raises(SystemExit):
+        cli_main(args)
+    serial_out = capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as e:
+        cli_main(args + ["--jobs", "2"])
+    assert e.value.code == 0
+    assert capsys.readouterr().out == serial_out
+
+
+def test_cli_negative_jobs_exits_with_code_2(sample_csv_1: Path) -> None:
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files", str(sample_csv_1), "--report", "performance", "--jobs", "-1"])
+    assert e.value.code == 2
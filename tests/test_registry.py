@@ -4,10 +4,18 @@
 - регистрация нового отчёта и получение его по имени;
 - ошибка при дублировании имени;
 - choices() содержит "performance";
-- get("performance") возвращает класс PerformanceReport.
+- get("performance") возвращает класс PerformanceReport;
+- отчёт только с run() работает через инкрементальный протокол (адаптер);
+- ленивые отчёты из манифеста и entry points импортируются только при get();
+- импорт CLI не загружает тяжёлые модули.
 """
 from __future__ import annotations
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
 from csv_reports.reports.base import Report
@@ -68,3 +76,93 @@ def test_duplicate_name_raises_value_error() -> None:
 
             def run(self, rows):
                 return [{"y": 2}]
+
+
+def test_run_only_report_works_through_incremental_adapter() -> None:
+    """create_state/update/merge/finalize по умолчанию буферизуют строки и вызывают run()."""
+
+    class CountReport(Report):
+        name = "count"
+
+        def headers(self) -> list[str]:
+            return ["rows"]
+
+        def run(self, rows):
+            return [{"rows": len(rows)}]
+
+    report = CountReport()
+    left = report.update_batch(report.create_state(), [{"name": "a"}, {"name": "b"}])
+    right = report.update(report.create_state(), {"name": "c"})
+
+    assert report.finalize(report.merge(left, right)) == [{"rows": 3}]
+
+
+def test_lazy_manifest_imports_report_on_get(tmp_path, monkeypatch) -> None:
+    """Имя из манифеста видно сразу, а модуль отчёта импортируется только при get()."""
+    module = tmp_path / "lazy_report_mod.py"
+    module.write_text(
+        "from csv_reports.reports.base import Report\n"
+        "class LazyReport(Report):\n"
+        "    name = 'lazy'\n"
+        "    def headers(self):\n"
+        "        return ['x']\n"
+        "    def run(self, rows):\n"
+        "        return []\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    local = ReportRegistry({"lazy": "lazy_report_mod:LazyReport"})
+
+    assert "lazy" in local
+    assert local.choices() == ["lazy"]
+    assert "lazy_report_mod" not in sys.modules
+
+    cls = local.get("lazy")
+    assert cls.__name__ == "LazyReport"
+    assert local.get("lazy") is cls
+    monkeypatch.delitem(sys.modules, "lazy_report_mod")
+
+
+def test_lazy_target_must_be_report_with_matching_name() -> None:
+    local = ReportRegistry({"bad": "csv_reports.errors:ReportNotFound"})
+    with pytest.raises(TypeError):
+        local.get("bad")
+
+    local = ReportRegistry({"other": "csv_reports.reports.performance:PerformanceReport"})
+    with pytest.raises(ValueError):
+        local.get("other")
+
+
+def test_entry_points_are_discovered_on_demand(monkeypatch) -> None:
+    import csv_reports.reports.registry as registry_module
+
+    calls = []
+
+    def fake_discover():
+        calls.append(1)
+        return {"plugin": "csv_reports.reports.performance:PerformanceReport"}
+
+    monkeypatch.setattr(registry_module, "_discover_entry_points", fake_discover)
+    local = ReportRegistry({"performance": "x:y"}, entry_points=True)
+
+    assert "performance" in local and not calls  # имя из манифеста — без entry points
+    assert local.choices() == ["performance", "plugin"]
+    assert "missing" not in local
+    assert len(calls) == 1
+
+
+def test_cli_import_does_not_load_heavy_modules() -> None:
+    """Импорт CLI (нужный для --help) не тянет расчётную часть, numpy и tabulate."""
+    code = (
+        "import sys, csv_reports.cli; "
+        "heavy = ['numpy', 'tabulate', 'concurrent.futures', 'csv_reports.service', "
+        "'csv_reports.reports.performance', 'importlib.metadata']; "
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    src = Path(__file__).resolve().parents[1] / "src"
+    pythonpath = os.pathsep.join(filter(None, [str(src), os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONPATH=pythonpath)
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    ).stdout
+    assert out.strip() == ""
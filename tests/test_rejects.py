@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты отказоустойчивого разбора (--on-error skip|quarantine, --max-errors):
+- некорректные строки пропускаются, отчёт считается по остальным; в файл отклонённых
+  строк (CSV или JSONL) попадают файл, номер строки, причина и исходная запись;
+- последовательный проход, фрагменты в рабочих процессах, кэш и --dedupe дают
+  один и тот же файл отклонённых строк; файл с ними не кэшируется;
+- порог max_errors прерывает расчёт; число отклонённых строк — в статистике;
+- со стоком корректные строки разбираются с проекцией: незапрошенные текстовые колонки
+  не нормализуются, а отклонённые строки не зависят от проекции и --where;
+- CLI: сообщение о пропущенных строках, ошибки сочетаний аргументов -> код 2.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from csv_reports import io as csv_io
+from csv_reports import stats
+from csv_reports.cache import ParsedFileCache
+from csv_reports.cli import main as cli_main
+from csv_reports.dedupe import Deduplicator
+from csv_reports.errors import ValidationError
+from csv_reports.filters import compile_filter
+from csv_reports.io import iter_csv_rows, read_csv_files
+from csv_reports.parallel import aggregate_files
+from csv_reports.rejects import RejectSink
+from csv_reports.reports.groupby import GroupByReport
+from csv_reports.reports.performance import PerformanceReport
+from csv_reports.service import build_report, build_reports
+
+BAD_LINES = {
+    3: "Bob Stone,QA Engineer,12,fast,Jest,Testing Team,2",
+    5: "truncated,row",
+    8: 'Eve Hart,QA Engineer,abc,4.1,"Jest, Cypress",Testing Team,3',
+}
+
+
+@pytest.fixture
+def with_bad_rows(tmp_path: Path, sample_csv_1: Path) -> Path:
+    """sample_1.csv с некорректными строками на строках файла 3, 5 и 8."""
+    good = sample_csv_1.read_text(encoding="utf-8").splitlines()
+    lines = [good[0]]
+    rows = iter(good[1:])
+    for line_no in range(2, len(good) + len(BAD_LINES) + 1):
+        lines.append(BAD_LINES.get(line_no) or next(rows))
+    path = tmp_path / "with_bad_rows.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_skip_counts_good_rows_only(with_bad_rows: Path, sample_csv_1: Path) -> None:
+    with pytest.raises(ValidationError, match="performance"):
+        build_report("performance", [with_bad_rows])
+
+    sink = RejectSink("skip")
+    with stats.collect() as run_stats, sink:
+        _, data = build_report("performance", [with_bad_rows], rejects=sink)
+    assert data == PerformanceReport().run(read_csv_files([sample_csv_1]))
+    assert sink.count == 3
+    assert run_stats.summary()["errors"] == 3
+    assert run_stats.summary()["errors_by_file"] == {str(with_bad_rows): 3}
+
+
+def test_quarantine_file(with_bad_rows: Path, tmp_path: Path) -> None:
+    reject_file = tmp_path / "rejects.csv"
+    with RejectSink("quarantine", path=reject_file) as sink:
+        build_report("performance", [with_bad_rows], rejects=sink)
+
+    rows = list(csv.DictReader(reject_file.open(encoding="utf-8", newline="")))
+    assert [(int(r["line"]), r["record"]) for r in rows] == sorted(BAD_LINES.items())
+    assert {r["file"] for r in rows} == {str(with_bad_rows)}
+    assert rows[0]["reason"] == "performance: could not convert string to float: 'fast'"
+    assert rows[1]["reason"] == "в строке нет значения для колонки 'completed_tasks'"
+
+
+def _quarantined(reject_file: Path, run) -> tuple[object, list]:
+    """Результат run(sink) и записи файла отклонённых строк (JSONL)."""
+    with RejectSink("quarantine", path=reject_file) as sink:
+        data = run(sink)
+    lines = reject_file.read_text(encoding="utf-8").splitlines()
+    return data, [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_all_paths_write_same_rejects(
+    use_cache: bool, with_bad_rows: Path, sample_csv_2: Path, tmp_path: Path
+) -> None:
+    files = [sample_csv_2, with_bad_rows, with_bad_rows]
+    report = GroupByReport("position", "count")  # проекция не влияет на отклонённые строки
+    cache = ParsedFileCache(tmp_path / "cache") if use_cache else None
+
+    def serial(sink: RejectSink) -> list:
+        return report.finalize(aggregate_files(report, files, cache=cache, rejects=sink))
+
+    def chunked(sink: RejectSink) -> list:
+        state = aggregate_files(report, files, 2, min_chunk_bytes=1, cache=cache, rejects=sink)
+        return report.finalize(state)
+
+    def deduplicated(sink: RejectSink) -> list:
+        dedupe = Deduplicator("first", memory_limit=1)  # двухпроходная схема
+        return build_reports([report], files, cache=cache, dedupe=dedupe, rejects=sink)[0][2]
+
+    data, lines = _quarantined(tmp_path / "serial.jsonl", serial)
+    assert [(r["line"], r["fields"][0]) for r in lines] == [
+        (3, "Bob Stone"),
+        (5, "truncated"),
+        (8, "Eve Hart"),
+    ] * 2
+    assert _quarantined(tmp_path / "chunked.jsonl", chunked) == (data, lines)
+    assert _quarantined(tmp_path / "deduplicated.jsonl", deduplicated)[1] == lines
+
+    if cache is not None:
+        assert cache.is_fresh(sample_csv_2) and not cache.is_fresh(with_bad_rows)
+        with pytest.raises(ValidationError):  # режим fail по-прежнему видит ошибки
+            build_report("performance", [with_bad_rows], cache=cache)
+
+
+def test_good_rows_keep_projected_fast_path(monkeypatch, with_bad_rows: Path) -> None:
+    calls: dict[str, int] = {}
+
+    def counting(name: str):
+        coerce = csv_io._COERCERS[name]
+
+        def wrapper(value: str):
+            calls[name] = calls.get(name, 0) + 1
+            return coerce(value)
+
+        return wrapper
+
+    for name in ("name", "skills", "team", "completed_tasks"):
+        monkeypatch.setitem(csv_io._COERCERS, name, counting(name))
+    columns = PerformanceReport().columns
+    with RejectSink("skip") as sink:
+        rows = list(iter_csv_rows([with_bad_rows], columns, rejects=sink))
+    assert len(rows) == 5 and sink.count == 3
+    # Для корректных строк нормализация незапрошенных колонок не вызывается, а целые
+    # из одних цифр проверяются без int(); вызовы — только при описании трёх отклонённых
+    assert calls == {"name": 3, "completed_tasks": 3}
+
+    everything = [RejectSink("skip"), RejectSink("skip")]
+    list(iter_csv_rows([with_bad_rows], rejects=everything[0]))
+    where = compile_filter("team == 'none'")  # отбрасывает все строки
+    list(iter_csv_rows([with_bad_rows], {"team"}, where=where, rejects=everything[1]))
+    assert everything[0].count == everything[1].count == 3
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_max_errors(jobs: int, with_bad_rows: Path, tmp_path: Path) -> None:
+    reject_file = tmp_path / "rejects.csv"
+    files = [with_bad_rows, with_bad_rows]
+    with pytest.raises(ValidationError, match="max_errors=4"):
+        with RejectSink("quarantine", max_errors=4, path=reject_file) as sink:
+            build_reports(["performance"], files, jobs=jobs, rejects=sink)
+    assert len(reject_file.read_text(encoding="utf-8").splitlines()) == 1 + 5
+
+    with RejectSink("skip", max_errors=6) as sink:
+        build_reports(["performance"], files, jobs=jobs, rejects=sink)
+    assert sink.count == 6
+
+
+def test_cli_on_error(capsys, with_bad_rows: Path, tmp_path: Path) -> None:
+    argv = ["--files", str(with_bad_rows), "--report", "performance", "--format", "json"]
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv)
+    assert e.value.code == 1
+
+    reject_file = tmp_path / "rejects.jsonl"
+    with pytest.raises(SystemExit) as e:
+        cli_main(argv + ["--on-error", "quarantine", "--reject-file", str(reject_file)])
+    assert e.value.code == 0
+    captured = capsys.readouterr()
+    assert len(json.loads(captured.out)) == 5
+    assert f"Пропущено некорректных строк: 3 (записаны в {reject_file})" in captured.err
+    assert len(reject_file.read_text(encoding="utf-8").splitlines()) == 3
+
+    for extra in (
+        ["--on-error", "quarantine"],
+        ["--reject-file", str(reject_file)],
+        ["--max-errors", "3"],
+        ["--on-error", "skip", "--watch"],
+        ["--on-error", "ignore"],
+    ):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + extra)
+        assert e.value.code == 2
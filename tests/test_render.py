@@ -2,11 +2,15 @@
 """
 Тесты рендера:
 - проверка форматирования чисел с 2 знаками после запятой;
-- снапшот-тест всей строки вывода для стабильного Markdown-формата (tablefmt="github").
+- снапшот-тест всей строки вывода для стабильного Markdown-формата (tablefmt="github");
+- побайтное совпадение встроенного рендера с tabulate и режим выборки ширин;
+- агрегаты --group-by: дробные с 2 знаками, числовые колонки выровнены вправо.
 """
 from __future__ import annotations
 
-from csv_reports.render import render_table
+import io
+
+from csv_reports.render import render_table, write_table
 
 
 def test_render_table_formats_two_decimals() -> None:
@@ -43,3 +47,74 @@ def test_render_table_snapshot_full_string() -> None:
 
     # Снапшот: строка должна совпадать полностью
     assert out == expected
+
+
+def test_render_table_matches_tabulate_byte_for_byte() -> None:
+    """Встроенный рендер совпадает с tabulate(tablefmt="github") на неудобных значениях."""
+    from tabulate import tabulate
+
+    headers = ["position", "performance", "team"]
+    rows = [
+        {"position": "  Разработчик  ", "performance": 4.854, "team": None},
+        {"position": "数据 Engineer", "performance": "n/a", "team": 7},
+        {"position": "", "performance": 10, "team": "True"},
+        {"performance": 0.0},
+    ]
+    expected = tabulate(
+        [
+            ["Разработчик", "4.85", None],
+            ["数据 Engineer", "n/a", 7],
+            ["", "10.00", "True"],
+            ["", "0.00", ""],
+        ],
+        headers=headers,
+        tablefmt="github",
+        stralign="left",
+        numalign="right",
+        disable_numparse=True,
+        colalign=("left", "right", "left"),
+    )
+    assert render_table(headers, rows) == expected
+
+
+def test_render_table_formats_and_aligns_aggregate_columns() -> None:
+    from tabulate import tabulate
+
+    headers = ["team", "count", "mean_performance"]
+    rows = [
+        {"team": "API Team", "count": 12, "mean_performance": 4.666666666666667},
+        {"team": "QA", "count": 3, "mean_performance": None},
+    ]
+    expected = tabulate(
+        [["API Team", "12", "4.67"], ["QA", "3", ""]],
+        headers=headers,
+        tablefmt="github",
+        disable_numparse=True,
+        colalign=("left", "right", "right"),
+    )
+    assert render_table(headers, rows) == expected
+    # Многострочная ячейка отдаёт таблицу tabulate — выравнивание то же
+    rows[1]["team"] = "Q\nA"
+    line = render_table(headers, rows).splitlines()[2]
+    assert line == "| API Team |      12 |               4.67 |"
+
+
+def test_render_table_multiline_cells_fall_back_to_tabulate() -> None:
+    out = render_table(["position", "performance"], [{"position": "a\nb", "performance": 1}])
+    assert out.splitlines()[2:] == [
+        "| a          |          1.00 |",
+        "| b          |               |",
+    ]
+
+
+def test_write_table_width_sample_streams_rows() -> None:
+    """По выборке ширины берутся из первых строк; остальные строки пишутся как есть."""
+    buffer = io.StringIO()
+    rows = iter([{"position": "QA", "performance": 4.5}, {"position": "DevOps Engineer"}])
+    write_table(["position", "performance"], rows, buffer, sample_rows=1)
+    assert buffer.getvalue().splitlines() == [
+        "| position   |   performance |",
+        "|------------|---------------|",
+        "| QA         |          4.50 |",
+        "| DevOps Engineer |               |",
+    ]
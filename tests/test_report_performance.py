@@ -3,10 +3,13 @@
 Тесты отчёта 'performance':
 - корректный расчёт среднего по должностям и сортировка по убыванию;
 - идемпотентность по отношению к перестановке строк/порядка файлов (кроме порядка при равных значениях);
-- отсутствие преждевременного округления (в run() возвращаются float, форматирование — в рендере).
+- отсутствие преждевременного округления (в run() возвращаются float, форматирование — в рендере);
+- inf/nan в значениях дают inf/nan в среднем, как при обычном сложении.
 """
 from __future__ import annotations
 
+import math
+import pickle
 from pathlib import Path
 
 import pytest
@@ -86,3 +89,74 @@ def test_run_returns_raw_floats_not_formatted(rows):
     report = PerformanceReport()
     data = report.run(rows)
     assert all(isinstance(row["performance"], float) for row in data)
+
+
+def test_merge_of_partial_states_matches_single_pass(sample_csv_1: Path, sample_csv_2: Path):
+    """Слияние частичных состояний по файлам даёт тот же результат, что и один проход."""
+    report = PerformanceReport()
+    single = report.run(read_csv_files([sample_csv_1, sample_csv_2]))
+
+    part_1 = report.update_batch(report.create_state(), read_csv_files([sample_csv_1]))
+    part_2 = report.update_batch(report.create_state(), read_csv_files([sample_csv_2]))
+    merged = report.merge(report.merge(report.create_state(), part_1), part_2)
+
+    assert report.finalize(merged) == single
+    # Слияние не изменяет исходные частичные состояния
+    assert part_2["Backend Developer"].count == 2
+
+
+def test_mean_accumulator_is_exact_and_order_independent():
+    from csv_reports.reports.accumulators import MeanAccumulator
+
+    values = [0.1] * 10 + [1e16, 1.0, -1e16]
+    forward, backward = MeanAccumulator(), MeanAccumulator()
+    for v in values:
+        forward.add(v)
+    for v in reversed(values):
+        backward.add(v)
+
+    assert forward.count == backward.count == 13
+    assert forward.total == backward.total == 2.0
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([math.inf, 4.0], math.inf),
+        ([4.0, -math.inf, 1.0], -math.inf),
+        ([math.inf, 4.0, -math.inf], math.nan),
+        ([math.nan, 4.0], math.nan),
+        ([1.7e308, 1.7e308, 1.0], math.inf),  # переполнение, как у обычного сложения
+    ],
+)
+def test_mean_accumulator_non_finite_values(values, expected):
+    from csv_reports.reports.accumulators import MeanAccumulator
+
+    single, left, right = MeanAccumulator(), MeanAccumulator(), MeanAccumulator()
+    for i, v in enumerate(values):
+        single.add(v)
+        (left if i % 2 else right).add(v)
+    left.merge(right)
+    for acc in (single, left, pickle.loads(pickle.dumps(single))):
+        if math.isnan(expected):
+            assert math.isnan(acc.total) and math.isnan(acc.mean)
+        else:
+            assert acc.total == expected and acc.mean == expected
+
+
+def test_performance_report_with_inf(tmp_path: Path, capsys):
+    from csv_reports.cli import main as cli_main
+
+    path = tmp_path / "inf.csv"
+    path.write_text(
+        "name,position,completed_tasks,performance,skills,team,experience_years\n"
+        "A,Dev,1,inf,Python,T,1\nB,Dev,1,4.0,Python,T,1\n",
+        encoding="utf-8",
+    )
+    assert PerformanceReport().run(read_csv_files([path])) == [
+        {"position": "Dev", "performance": math.inf}
+    ]
+    with pytest.raises(SystemExit):
+        cli_main(["--files", str(path), "--report", "performance"])
+    row = capsys.readouterr().out.splitlines()[-1]
+    assert row.split() == ["|", "Dev", "|", "inf", "|"]
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты сервера отчётов (serve):
+- ответ /report совпадает с build_report по тем же файлам;
+- изменение файла подхватывается refresh() без перезапуска;
+- ошибки запроса: неизвестный отчёт -> 404, файл вне конфигурации или
+  некорректный фильтр where -> 400;
+- одновременные одинаковые запросы считаются один раз;
+- непредвиденное исключение в отчёте -> 500, соединение обслуживается дальше.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from csv_reports import server as server_module
+from csv_reports.filters import compile_filter
+from csv_reports.server import ReportServer
+from csv_reports.service import build_report
+
+
+async def _get(port: int, target: str) -> tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), body
+
+
+def _run(server: ReportServer, *targets: str) -> list[tuple[int, bytes]]:
+    async def scenario() -> list[tuple[int, bytes]]:
+        srv = await server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return [await _get(port, t) for t in targets]
+
+    return asyncio.run(scenario())
+
+
+def test_report_matches_build_report(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    server = ReportServer([sample_csv_1, sample_csv_2], poll_interval=0)
+    [(status, body), (table_status, table)] = _run(
+        server, "/report?report=performance", "/report?report=performance&format=table"
+    )
+
+    headers, rows = build_report("performance", [sample_csv_1, sample_csv_2])
+    expected = [{h: round(r[h], 2) if h == "performance" else r[h] for h in headers} for r in rows]
+    assert status == 200 and json.loads(body) == expected
+    assert table_status == 200 and table.decode().startswith("| position")
+
+
+def test_report_where(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    files = [sample_csv_1, sample_csv_2]
+    server = ReportServer(files, poll_interval=0)
+    [(status, body)] = _run(server, "/report?report=performance&where=experience_years+%3E%3D+5")
+
+    _, rows = build_report("performance", files, where=compile_filter("experience_years >= 5"))
+    assert status == 200
+    assert [r["position"] for r in json.loads(body)] == [r["position"] for r in rows]
+
+
+def test_subset_of_files_and_errors(sample_csv_1: Path, sample_csv_2: Path, tmp_path) -> None:
+    server = ReportServer([sample_csv_1, sample_csv_2], poll_interval=0)
+    other = tmp_path / "other.csv"
+    (subset, _), (missing, _), (foreign, _), (bad_where, _), (health, body) = _run(
+        server,
+        f"/report?report=performance&files={sample_csv_1}",
+        "/report?report=nope",
+        f"/report?report=performance&files={other}",
+        "/report?report=performance&where=team%3D%3D1",
+        "/health",
+    )
+    assert (subset, missing, foreign, bad_where, health) == (200, 404, 400, 400, 200)
+    assert [f["rows"] for f in json.loads(body)["files"]] == [5, 5]
+
+
+def test_refresh_picks_up_changed_file(sample_csv_1: Path) -> None:
+    server = ReportServer([sample_csv_1], poll_interval=0)
+    server.load()
+
+    async def scenario() -> tuple[bytes, bool, bytes]:
+        before = await server.render(["performance"])
+        with sample_csv_1.open("a", encoding="utf-8") as fh:
+            fh.write("Zed,Manager,1,1.0,Excel,Ops,1\n")
+        st = sample_csv_1.stat()
+        os.utime(sample_csv_1, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        reloaded = await server.refresh()
+        return before, reloaded, await server.render(["performance"])
+
+    before, reloaded, after = asyncio.run(scenario())
+    assert reloaded and server.data.version == 2
+    assert "Manager" not in before.decode() and "Manager" in after.decode()
+
+
+def test_concurrent_identical_requests_share_one_computation(
+    sample_csv_1: Path, monkeypatch
+) -> None:
+    server = ReportServer([sample_csv_1], poll_interval=0)
+    server.load()
+    calls = []
+    original = server_module.build_reports_from_tables
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(server_module, "build_reports_from_tables", counting)
+
+    async def scenario() -> list[bytes]:
+        return await asyncio.gather(*(server.render(["performance"]) for _ in range(8)))
+
+    bodies = asyncio.run(scenario())
+    assert len(set(bodies)) == 1 and len(calls) == 1
+
+
+def test_unexpected_error_returns_500(sample_csv_1: Path, monkeypatch, capsys) -> None:
+    server = ReportServer([sample_csv_1], poll_interval=0)
+
+    def broken(*args, **kwargs):
+        raise KeyError("boom")
+
+    monkeypatch.setattr(server_module, "build_reports_from_tables", broken)
+    [(status, body), (health, _)] = _run(server, "/report?report=performance", "/health")
+    assert (status, health) == (500, 200)
+    assert "KeyError" in json.loads(body)["error"]
+    assert "KeyError: 'boom'" in capsys.readouterr().err
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты бюджета памяти отчётов (--memory-limit) и сброса на диск (spill.py):
+- external_sort: устойчивость, многоуровневое слияние (> MAX_FAN_IN серий), список без сброса;
+- группировка сверх бюджета совпадает с расчётом в памяти: с order_by и без,
+  последовательно и в нескольких процессах; результат читается повторно,
+  временные серии удаляются;
+- CLI: --memory-limit даёт тот же вывод; вместе с --watch -> код 2.
+"""
+from __future__ import annotations
+
+import gc
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from csv_reports import spill
+from csv_reports.cli import main as cli_main
+from csv_reports.reports.groupby import GroupByReport
+from csv_reports.service import build_reports
+
+HEADER = "name,position,completed_tasks,performance,skills,team,experience_years\n"
+
+
+@pytest.fixture
+def run_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Каталог временных серий (чтобы проверить, что они удалены)."""
+    path = tmp_path / "runs"
+    path.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(path))
+    return path
+
+
+@pytest.fixture
+def many_groups(tmp_path: Path) -> list[Path]:
+    """Два файла с сотнями сотрудников: группировка по name даёт много групп."""
+    rng = random.Random(3)
+    paths = []
+    for part in range(2):
+        lines = [HEADER]
+        for _ in range(600):
+            name = f"Employee {rng.randrange(400)}"
+            team = rng.choice(["API Team", "Web Team", "AI Team"])
+            lines.append(
+                f"{name},Developer,{rng.randrange(60)},{rng.randrange(30, 50) / 10},"
+                f"Python,{team},{rng.randrange(12)}\n"
+            )
+        path = tmp_path / f"many_{part}.csv"
+        path.write_text("".join(lines), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_external_sort(run_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(spill, "MAX_FAN_IN", 3)
+    rng = random.Random(5)
+    records = [(rng.randrange(20), i) for i in range(500)]
+
+    assert spill.external_sort(records, key=lambda r: r[0], chunk_size=1000) == sorted(records)
+
+    result = spill.external_sort(records, key=lambda r: r[0], chunk_size=7, project=lambda r: r[1])
+    assert isinstance(result, spill.SpilledRows)
+    expected = [i for _, i in sorted(records)]  # sorted устойчив: равные ключи — по i
+    assert list(result) == expected and list(result) == expected
+    assert len(list(run_dir.iterdir())) <= 3
+    result.close()
+    assert list(run_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "group_by, aggregates, order_by",
+    [
+        ("name,team", "count,mean:performance,stddev:performance", ()),
+        ("name", "sum:completed_tasks,max:performance", [("max_performance", True)]),
+        ("experience_years", "count", [("count", False)]),
+    ],
+)
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_spilled_groups_match_memory(
+    group_by, aggregates, order_by, jobs, many_groups: list[Path], run_dir: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(spill, "MAX_FAN_IN", 4)  # слияние серий в несколько уровней
+    report = GroupByReport(group_by, aggregates, order_by=order_by)
+    [(_, _, expected)] = build_reports([report], many_groups)
+
+    [(_, _, data)] = build_reports([report], many_groups, jobs=jobs, memory_limit=20_000)
+    if group_by != "experience_years":
+        assert isinstance(data, spill.SpilledRows)
+    assert list(data) == expected
+    assert list(data) == expected  # повторный проход (табличный вывод читает дважды)
+
+    del data
+    gc.collect()
+    assert list(run_dir.iterdir()) == []
+
+
+def test_cli_memory_limit(capsys, many_groups: list[Path], run_dir: Path) -> None:
+    argv = ["--files", *map(str, many_groups), "--group-by", "name", "--agg", "count"]
+    outputs = []
+    for extra in ([], ["--memory-limit", "16K"]):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + ["--no-cache", *extra])
+        assert e.value.code == 0
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1]
+
+    for extra in (["--memory-limit", "0"], ["--memory-limit", "1K", "--watch"]):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + extra)
+        assert e.value.code == 2
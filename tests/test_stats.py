@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты инструментирования: стадии, счётчики строк и байт, флаги CLI --stats/--stats-json.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from csv_reports import stats
+from csv_reports.cli import main as cli_main
+from csv_reports.io import iter_csv_rows
+from csv_reports.parallel import aggregate_files
+from csv_reports.reports.performance import PerformanceReport
+
+
+def test_disabled_collection_is_a_no_op(sample_csv_1: Path) -> None:
+    """Без collect() итератор строк не оборачивается, а стадии — пустой контекст."""
+    rows = iter([1, 2])
+    assert stats.current() is None
+    assert stats.track_rows(rows, sample_csv_1, "csv") is rows
+    with stats.stage("render"):
+        pass
+    assert stats.current() is None
+
+
+def test_nested_stage_time_is_exclusive() -> None:
+    with stats.collect() as run:
+        with run.stage("outer"):
+            with run.stage("inner"):
+                sum(range(200_000))
+    outer, inner = run.stages["outer"], run.stages["inner"]
+    assert outer.calls == inner.calls == 1
+    assert inner.wall > 0
+    # Собственное время внешней стадии не включает вложенную
+    assert outer.wall < inner.wall
+
+
+def test_rows_and_bytes_are_counted_per_file(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    with stats.collect() as run:
+        rows = list(iter_csv_rows([sample_csv_1, sample_csv_2], ["position"]))
+    assert [(f.path, f.source, f.rows) for f in run.files] == [
+        (str(sample_csv_1), "csv", 5),
+        (str(sample_csv_2), "csv", 5),
+    ]
+    assert run.rows == len(rows) == 10
+    assert run.bytes == sample_csv_1.stat().st_size + sample_csv_2.stat().st_size
+    assert "read.parse" in run.stages
+
+
+def test_parse_time_is_not_counted_as_update(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    """Обновление отчёта — отдельная стадия; из неё вычитаются wall и CPU разбора."""
+    with stats.collect() as run:
+        aggregate_files(PerformanceReport(), [sample_csv_1, sample_csv_2], jobs=1)
+    parse, update = run.stages["read.parse"], run.stages["report.update"]
+    assert update.calls == 2
+    assert parse.cpu is not None and parse.cpu >= 0
+    assert update.wall >= 0 and update.cpu is not None and update.cpu >= 0
+    # "read" — только получение порций: два файла и завершающий вызов
+    assert run.stages["read"].calls == 3
+
+
+def test_worker_stats_are_merged(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    report = PerformanceReport()
+    with stats.collect() as run:
+        aggregate_files(report, [sample_csv_1, sample_csv_2], jobs=2)
+    assert [f.path for f in run.files] == [str(sample_csv_1), str(sample_csv_2)]
+    assert run.rows == 10
+    assert run.stages["read"].calls >= 2
+
+
+def test_cli_stats_and_stats_json(capsys, sample_csv_1: Path, tmp_path: Path) -> None:
+    out_json = tmp_path / "stats.json"
+    profile = tmp_path / "run.prof"
+    with pytest.raises(SystemExit) as e:
+        cli_main(
+            [
+                "--files",
+                str(sample_csv_1),
+                "--report",
+                "performance",
+                "--stats",
+                "--stats-json",
+                str(out_json),
+                "--profile",
+                str(profile),
+            ]
+        )
+    assert e.value.code == 0
+
+    captured = capsys.readouterr()
+    assert "DevOps Engineer" in captured.out
+    assert "render" in captured.err and "rows/s" in captured.err
+
+    summary = json.loads(out_json.read_text(encoding="utf-8"))
+    assert summary["rows"] == 5
+    assert {"read", "report.finalize", "render"} <= set(summary["stages"])
+    assert profile.stat().st_size > 0
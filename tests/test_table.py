@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты колоночной таблицы EmployeeTable:
+- обратимость строки -> таблица -> строки, словарное кодирование строк;
+- слияние таблиц с перекодированием словарей и проекция колонок;
+- отчёт 'performance' по таблице совпадает с построчным расчётом.
+"""
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+
+from csv_reports.io import read_csv_files, read_csv_table
+from csv_reports.models import DictionaryColumn, EmployeeTable
+from csv_reports.reports.performance import PerformanceReport
+
+
+def test_table_round_trip_and_encoding(rows) -> None:
+    table = EmployeeTable.from_rows(rows)
+
+    assert len(table) == len(rows) == 10
+    assert list(table) == rows
+
+    positions = table.column("position")
+    assert isinstance(positions, DictionaryColumn)
+    assert len(positions.values) == 5  # 10 строк, 5 уникальных должностей
+    assert positions.values[0] == "Backend Developer"
+
+    perf = table.column("performance")
+    assert isinstance(perf, array) and perf.typecode == "d"
+    assert table.column("completed_tasks").typecode == "q"
+
+
+def test_extend_table_remaps_codes(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    first = read_csv_table([sample_csv_2])
+    second = read_csv_table([sample_csv_1])
+    first.extend_table(second)
+
+    assert list(first) == read_csv_files([sample_csv_2, sample_csv_1])
+
+
+def test_table_projection(sample_csv_1: Path) -> None:
+    table = read_csv_table([sample_csv_1], columns={"team", "performance"})
+    assert table.columns == ("performance", "team")
+    assert next(iter(table)) == {"performance": 4.8, "team": "API Team"}
+    assert list(table.iter_rows({"team"}))[1] == {"team": "Web Team"}
+
+
+def test_performance_report_consumes_table(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    report = PerformanceReport()
+    files = [sample_csv_1, sample_csv_2]
+
+    by_rows = report.run(read_csv_files(files))
+    state = report.update_table(report.create_state(), read_csv_table(files, report.columns))
+    assert report.finalize(state) == by_rows
+
+
+def test_table_is_compact(rows) -> None:
+    table = EmployeeTable.from_rows(rows * 100)
+    # Числа: 3 колонки по 8 байт; строки: 4 кода по 4 байта + уникальные значения
+    assert table.nbytes() < 1000 * (3 * 8 + 4 * 4) + 1000
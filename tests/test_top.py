@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты выборки первых строк отчёта (--top / --limit):
+- GroupByReport: top совпадает с началом полного результата, в том числе при равных
+  значениях order_by (порядок первого появления) и со сбросом на диск;
+- отчёт без частичной выборки (только run()) обрезает service;
+- CLI: --top и --limit, некорректное K -> код 2.
+"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Iterable
+
+import pytest
+
+from csv_reports.cli import main as cli_main
+from csv_reports.io import read_csv_table
+from csv_reports.reports.base import Report
+from csv_reports.reports.groupby import GroupByReport
+from csv_reports.service import build_reports, build_reports_from_tables
+
+HEADER = "name,position,completed_tasks,performance,skills,team,experience_years\n"
+
+
+@pytest.fixture
+def ties(tmp_path: Path) -> Path:
+    """Сотни сотрудников с немногими различными значениями: много равных агрегатов."""
+    rng = random.Random(11)
+    lines = [HEADER]
+    for _ in range(800):
+        lines.append(
+            f"Employee {rng.randrange(300)},Developer,{rng.randrange(3)},"
+            f"{rng.choice([4.5, 4.8])},Python,Team {rng.randrange(4)},{rng.randrange(8)}\n"
+        )
+    path = tmp_path / "ties.csv"
+    path.write_text("".join(lines), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "group_by, aggregates, order_by",
+    [
+        ("name", "count", [("count", True)]),
+        ("name", "count,max:completed_tasks", [("max_completed_tasks", False), ("count", True)]),
+        ("team,experience_years", "mean:performance", ()),
+        ("name", "min:performance", [("name", True)]),
+    ],
+)
+@pytest.mark.parametrize("memory_limit", [None, 20_000])
+def test_top_is_prefix_of_full_result(group_by, aggregates, order_by, memory_limit, ties) -> None:
+    report = GroupByReport(group_by, aggregates, order_by=order_by)
+    [(_, _, full)] = build_reports([report], [ties])
+    for k in (1, 7, 50, 10_000):
+        report = GroupByReport(group_by, aggregates, order_by=order_by)
+        [(_, _, data)] = build_reports([report], [ties], memory_limit=memory_limit, top=k)
+        assert isinstance(data, list) and data == full[:k]
+
+
+class _Names(Report):
+    name = "names"
+
+    def headers(self) -> list[str]:
+        return ["name"]
+
+    def run(self, rows: Iterable[Any]) -> list[dict[str, Any]]:
+        return [{"name": row["name"]} for row in rows]
+
+
+def test_top_for_plain_report(sample_csv_1: Path) -> None:
+    [(_, _, data)] = build_reports([_Names()], [sample_csv_1], top=2)
+    assert data == [{"name": "Alex Ivanov"}, {"name": "Maria Petrova"}]
+
+    tables = [read_csv_table([sample_csv_1])]
+    [(_, _, data)] = build_reports_from_tables(["performance"], tables, top=1)
+    assert data == [{"position": "DevOps Engineer", "performance": 4.9}]
+
+
+def test_cli_top(capsys, sample_csv_1: Path, sample_csv_2: Path) -> None:
+    argv = ["--files", str(sample_csv_1), str(sample_csv_2), "--report", "performance"]
+    for option in ("--top", "--limit"):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + [option, "2", "--format", "json"])
+        assert e.value.code == 0
+        data = json.loads(capsys.readouterr().out)
+        assert [row["position"] for row in data] == ["DevOps Engineer", "Backend Developer"]
+
+    for value in ("0", "-1", "many"):
+        with pytest.raises(SystemExit) as e:
+            cli_main(argv + ["--top", value])
+        assert e.value.code == 2
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты режима --watch (watch.TailAggregator):
+- дописанные строки разбираются инкрементально, результат совпадает с полным проходом;
+- незавершённая последняя запись учитывается, пока разбирается, но не фиксируется;
+- усечение и замена файла приводят к полному перечитыванию;
+- CLI --watch печатает отчёт и завершается по Ctrl+C с кодом 0.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from csv_reports.cli import main as cli_main
+from csv_reports.service import build_report
+from csv_reports.watch import TailAggregator
+
+_APPENDED = 'Zed Null,Manager,10,3.9,"Excel, ""Slides""",Ops Team,2\n'
+
+
+def _append(path: Path, text: str) -> None:
+    with path.open("a", encoding="utf-8", newline="") as fh:
+        fh.write(text)
+
+
+def _rows(aggregator: TailAggregator) -> list[dict]:
+    [(_, _, rows)] = aggregator.results()
+    return rows
+
+
+def test_appended_rows_are_parsed_incrementally(sample_csv_1: Path, sample_csv_2: Path) -> None:
+    tail = TailAggregator(["performance"], [sample_csv_1, sample_csv_2])
+    assert tail.poll() is True
+    assert _rows(tail) == build_report("performance", [sample_csv_1, sample_csv_2])[1]
+    assert tail.poll() is False
+
+    offset = tail.cursors[0].offset
+    _append(sample_csv_1, _APPENDED)
+    assert tail.poll() is True
+    assert tail.cursors[0].offset == offset + len(_APPENDED.encode("utf-8"))
+    assert tail.cursors[0].rows == 6 and tail.rescans == 0
+    assert _rows(tail) == build_report("performance", [sample_csv_1, sample_csv_2])[1]
+
+
+def test_unterminated_last_record(sample_csv_1: Path) -> None:
+    tail = TailAggregator(["performance"], [sample_csv_1])
+    tail.poll()
+
+    _append(sample_csv_1, 'Zed Null,Manager,10,3.9,"Excel')  # кавычка не закрыта
+    assert tail.poll() is True
+    assert tail.rows == 5
+
+    _append(sample_csv_1, '",Ops Team,2')  # запись разбирается, но перевода строки ещё нет
+    tail.poll()
+    assert tail.rows == 6 and tail.cursors[0].rows == 5
+    assert "Manager" in {r["position"] for r in _rows(tail)}
+
+    _append(sample_csv_1, "\n")
+    tail.poll()
+    assert tail.cursors[0].rows == 6 and tail.cursors[0].tail_rows == []
+    assert _rows(tail) == build_report("performance", [sample_csv_1])[1]
+
+
+@pytest.mark.parametrize("replace", [False, True], ids=["truncate", "rotate"])
+def test_truncation_and_rotation_trigger_rescan(sample_csv_1: Path, replace: bool) -> None:
+    tail = TailAggregator(["performance"], [sample_csv_1])
+    tail.poll()
+
+    header = sample_csv_1.read_text(encoding="utf-8").splitlines()[0]
+    content = f"{header}\n{_APPENDED}"
+    if replace:
+        rotated = sample_csv_1.with_name("rotated.csv")
+        rotated.write_text(content, encoding="utf-8", newline="")
+        os.replace(rotated, sample_csv_1)
+    else:
+        sample_csv_1.write_text(content, encoding="utf-8", newline="")
+
+    assert tail.poll() is True
+    assert tail.rescans == 1 and tail.rows == 1
+    assert _rows(tail) == [{"position": "Manager", "performance": 3.9}]
+
+
+def test_cli_watch_prints_report_until_interrupted(
+    capsys, sample_csv_1: Path, monkeypatch
+) -> None:
+    def interrupt(_seconds: float) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, "sleep", interrupt)
+    with pytest.raises(SystemExit) as e:
+        cli_main(["--files", str(sample_csv_1), "--report", "performance", "--watch"])
+
+    assert e.value.code == 0
+    captured = capsys.readouterr()
+    assert "| DevOps Engineer" in captured.out
+    assert "строк 5" in captured.err